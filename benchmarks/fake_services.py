@@ -0,0 +1,218 @@
+# benchmarks/fake_services.py
+#
+# Local stand-ins for every network dependency of the recon modules, so the
+# benchmark suite never touches the internet:
+#   StubDNSServer   - UDP DNS server answering A/AAAA/MX/NS/TXT for any name
+#   FakeHTTPServer  - target web pages, ipinfo-style JSON, RDAP and WHOIS JSON
+#   write_fake_nmap - executable that replays nmap XML for the hosts it is given
+# Every service takes a latency in seconds to emulate remote round trips.
+
+import os
+import sys
+import json
+import time
+import stat
+import socket
+import threading
+import socketserver
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import dns.flags
+import dns.message
+import dns.rcode
+import dns.rdatatype
+import dns.rrset
+
+SITE_HTML = """<!DOCTYPE html>
+<html><head><meta name="generator" content="WordPress 6.4">
+<script src="/wp-includes/js/jquery/jquery.min.js"></script>
+<script src="https://www.googletagmanager.com/gtm.js?id=GTM-BENCH"></script>
+</head><body>""" + "<p>benchmark page</p>\n" * 200 + "</body></html>"
+
+DNS_ANSWERS = {
+    dns.rdatatype.A: ["127.0.0.1"],
+    dns.rdatatype.AAAA: ["::1"],
+    dns.rdatatype.MX: ["10 mail.{name}"],
+    dns.rdatatype.NS: ["ns1.{name}", "ns2.{name}"],
+    dns.rdatatype.TXT: ['"v=spf1 -all"'],
+}
+
+
+class _DNSHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        data, sock = self.request
+        try:
+            query = dns.message.from_wire(data)
+        except Exception:
+            return
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        response = dns.message.make_response(query)
+        question = query.question[0]
+        name = question.name.to_text()
+        zone = self.server.zone
+        if name.rstrip(".").endswith(self.server.nxdomain_suffix) or (zone is not None and name.rstrip(".").lower() not in zone):
+            response.set_rcode(dns.rcode.NXDOMAIN)
+        elif question.rdtype == dns.rdatatype.A and name.rstrip(".").lower() in self.server.records:
+            response.answer.append(dns.rrset.from_text_list(
+                question.name, self.server.ttl, "IN", question.rdtype, self.server.records[name.rstrip(".").lower()]
+            ))
+        else:
+            for answer in DNS_ANSWERS.get(question.rdtype, []):
+                response.answer.append(dns.rrset.from_text(
+                    question.name, self.server.ttl, "IN", question.rdtype, answer.format(name=name)
+                ))
+        self.server.queries += 1
+        sock.sendto(response.to_wire(), self.client_address)
+
+
+class StubDNSServer(socketserver.ThreadingMixIn, socketserver.UDPServer):
+    """
+    Answers every name with fixed records; names under nxdomain_suffix get
+    NXDOMAIN. With a zone (set of names) only those names exist, which is
+    what subdomain brute forcing needs; records (name -> A addresses)
+    overrides the answer for some names, e.g. hosts inside a wildcard zone.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 ttl: int = 300, nxdomain_suffix: str = "nx.bench.test", zone=None, records: dict | None = None):
+        super().__init__((host, port), _DNSHandler)
+        self.zone = {n.rstrip(".").lower() for n in zone} if zone is not None else None
+        self.records = {n.rstrip(".").lower(): list(a) for n, a in (records or {}).items()}
+        self.latency = latency
+        self.ttl = ttl
+        self.nxdomain_suffix = nxdomain_suffix
+        self.queries = 0
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+
+class _HTTPHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body: str, content_type: str, headers: dict | None = None):
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(payload)
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        parts = [p for p in self.path.split("?")[0].split("/") if p]
+
+        # ipinfo: /<ip>/json
+        if len(parts) == 2 and parts[1] == "json":
+            ip = parts[0]
+            self._send(200, json.dumps({
+                "ip": ip, "city": "Benchmark City", "region": "Loopback", "country": "ZZ",
+                "loc": "0.0000,0.0000", "org": "AS64512 Bench Networks", "timezone": "UTC",
+            }), "application/json")
+        # RDAP: /rdap/ip/<ip>
+        elif parts[:2] == ["rdap", "ip"] and len(parts) == 3:
+            octets = parts[2].split(".")
+            cidr = ".".join(octets[:2]) + ".0.0/16" if len(octets) == 4 else parts[2] + "/64"
+            self._send(200, json.dumps({
+                "asn": "64512", "asn_description": "BENCH-NET, ZZ", "asn_cidr": cidr,
+                "network": {"name": "BENCH-NET", "country": "ZZ", "cidr": cidr},
+            }), "application/json")
+        # WHOIS: /whois/<domain>
+        elif parts[:1] == ["whois"] and len(parts) == 2:
+            self._send(200, json.dumps({
+                "domain_name": parts[1].upper(), "registrar": "Bench Registrar",
+                "creation_date": "2010-01-01 00:00:00", "expiration_date": "2030-01-01 00:00:00",
+                "name_servers": ["NS1.BENCH.TEST", "NS2.BENCH.TEST"], "emails": ["abuse@bench.test"],
+            }), "application/json")
+        else:
+            self._send(200, SITE_HTML, "text/html; charset=utf-8", {
+                "Server": "nginx/1.25.3", "X-Powered-By": "PHP/8.2",
+                "Set-Cookie": "PHPSESSID=bench; Path=/",
+            })
+
+
+class FakeHTTPServer(ThreadingHTTPServer):
+    """Serves target pages plus ipinfo (/<ip>/json), RDAP (/rdap/ip/<ip>) and WHOIS (/whois/<d>) JSON."""
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, host: str = "", port: int = 0, latency: float = 0.0):
+        super().__init__((host, port), _HTTPHandler)
+        self.latency = latency
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+
+def start_in_thread(server):
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+FAKE_NMAP = r'''#!{python}
+import os, re, sys, time
+args = sys.argv[1:]
+if "-V" in args:
+    print("Nmap version 7.94 ( https://nmap.org )")
+    sys.exit(0)
+time.sleep(float(os.environ.get("FAKE_NMAP_DELAY", "0")))
+ports = "1-1000"
+for i, a in enumerate(args):
+    if a == "-p" and i + 1 < len(args):
+        ports = args[i + 1]
+wanted = set()
+for part in ports.split(","):
+    lo, _, hi = part.partition("-")
+    wanted.update(range(int(lo or 1), int(hi or lo or 65535) + 1))
+hosts = [a for a in args if re.fullmatch(r"[0-9a-fA-F.:]+", a) and ("." in a or ":" in a)]
+out = ['<?xml version="1.0"?>', '<nmaprun scanner="nmap" args="nmap %s" start="0" version="7.94">' % " ".join(args),
+       '<scaninfo type="syn" protocol="tcp" numservices="%d" services="%s"/>' % (len(wanted), ports)]
+for h in hosts:
+    out.append('<host><status state="up" reason="syn-ack"/><address addr="%s" addrtype="ipv4"/><hostnames/><ports>' % h)
+    for port, name, product in ((22, "ssh", "OpenSSH"), (80, "http", "nginx"), (443, "https", "nginx")):
+        if port in wanted:
+            out.append('<port protocol="tcp" portid="%d"><state state="open" reason="syn-ack"/>'
+                       '<service name="%s" product="%s" version="1.0" conf="10"/></port>' % (port, name, product))
+    out.append('</ports><os><osmatch name="Linux 5.X" accuracy="95" line="1">'
+               '<osclass type="general purpose" vendor="Linux" osfamily="Linux" osgen="5.X" accuracy="95"/>'
+               '</osmatch></os><trace><hop ttl="1" ipaddr="%s" rtt="0.10"/></trace></host>' % h)
+    sys.stdout.write("\n".join(out) + "\n")
+    sys.stdout.flush()
+    out = []
+sys.stdout.write('<runstats><finished time="0" timestr="bench" elapsed="0.01" exit="success"/>'
+                 '<hosts up="%d" down="0" total="%d"/></runstats></nmaprun>\n' % (len(hosts), len(hosts)))
+'''
+
+
+def write_fake_nmap(directory: str) -> str:
+    """Writes an executable named `nmap` into directory and returns its path."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, "nmap")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(FAKE_NMAP.replace("{python}", sys.executable, 1))
+    os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return path
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
@@ -0,0 +1,218 @@
+# benchmarks/run.py
+#
+# Offline benchmark suite. Every module runs against the local stand-ins in
+# benchmarks.fake_services, so results are reproducible and nothing leaves
+# the machine.
+#
+#   python -m benchmarks.run                                  # 1, 100, 1000 targets
+#   python -m benchmarks.run --scales 1,100,10000 --latency-ms 50 --concurrency 32
+#   python -m benchmarks.run --only dns,http --json output/bench.json
+#
+# Reported per benchmark and scale: throughput (items/s), p50/p99 latency per
+# item and peak RSS of the process so far.
+
+import os
+import sys
+import json
+import time
+import types
+import argparse
+import tempfile
+import resource
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fake_services import (
+    StubDNSServer, FakeHTTPServer, start_in_thread, write_fake_nmap,
+)
+from utils.metrics import _percentile
+
+BENCHMARKS = ["dns", "dns_bulk", "http", "whois", "geoip", "nmap", "pipeline"]
+DEFAULT_SCALES = "1,100,1000"
+
+
+def _targets(count: int) -> list:
+    """count distinct loopback addresses (127.0.0.0/8 is all local on Linux)."""
+    return [f"127.{(i >> 16) & 255}.{(i >> 8) & 255}.{(i & 255) or 1}" for i in range(1, count + 1)]
+
+
+def _peak_rss_mb() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    return usage / (1024 * 1024) if sys.platform == "darwin" else usage / 1024
+
+
+def _timed_map(func, items: list, concurrency: int) -> tuple:
+    """Runs func over items on a thread pool; returns (elapsed, sorted per-item latencies, errors)."""
+    def call(item):
+        start = time.perf_counter()
+        result = func(item)
+        failed = isinstance(result, dict) and bool(result.get("error"))
+        return time.perf_counter() - start, failed
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(call, items))
+    elapsed = time.perf_counter() - start
+    return elapsed, sorted(latency for latency, _ in outcomes), sum(1 for _, failed in outcomes if failed)
+
+
+def _row(name: str, count: int, elapsed: float, latencies: list, errors: int = 0) -> dict:
+    return {
+        "benchmark": name,
+        "items": count,
+        "elapsed_s": round(elapsed, 4),
+        "items_per_sec": round(count / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(_percentile(latencies, 0.50) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 2),
+        "errors": errors,
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+
+
+def install_whois_fakes(base_url: str) -> None:
+    """
+    Points modules.whois_lookup at the fake HTTP server. python-whois and
+    ipwhois speak port-43 WHOIS and registry RDAP with hard-coded servers,
+    so the benchmark swaps in thin clients that fetch the same shapes over
+    the shared HTTP client instead.
+    """
+    import modules.whois_lookup as whois_lookup
+    from utils.http_client import get_http_client
+
+    def domain_whois(target):
+        data = get_http_client().get(f"{base_url}/whois/{target}").json()
+        return types.SimpleNamespace(**data)
+
+    class BenchIPWhois:
+        def __init__(self, ip_address, timeout=5):
+            self.ip_address = ip_address
+            self.timeout = timeout
+
+        def lookup_rdap(self):
+            return get_http_client().get(f"{base_url}/rdap/ip/{self.ip_address}").json()
+
+    whois_lookup.whois = types.SimpleNamespace(whois=domain_whois)
+    whois_lookup.IPWhois = BenchIPWhois
+
+
+def run_benchmarks(names: list, scales: list, concurrency: int, base_url: str, http_port: int) -> list:
+    from modules.dns_lookup import get_dns_records, resolve_many
+    from modules.http_info import fetch_http_info
+    from modules.whois_lookup import perform_whois_lookup, get_rdap_cache
+    from modules.geoip_lookup import get_geoip_info
+    from modules.port_scan import run_nmap_scan, run_nmap_batch
+    from modules.batch import run_batch
+
+    rows = []
+    for count in scales:
+        ips = _targets(count)
+        domains = [f"host{i}.bench.test" for i in range(count)]
+        for name in names:
+            if name == "dns":
+                elapsed, latencies, errors = _timed_map(get_dns_records, domains, concurrency)
+            elif name == "dns_bulk":
+                start = time.perf_counter()
+                results = resolve_many(domains, concurrency=max(concurrency, 100))
+                elapsed, latencies = time.perf_counter() - start, []
+                errors = sum(1 for r in results.values() if isinstance(r, dict) and r.get("error"))
+            elif name == "http":
+                urls = [f"http://{ip}:{http_port}/" for ip in ips]
+                elapsed, latencies, errors = _timed_map(fetch_http_info, urls, concurrency)
+            elif name == "whois":
+                get_rdap_cache().__init__()
+                elapsed, latencies, errors = _timed_map(
+                    lambda ip: perform_whois_lookup(f"{ip.replace('.', '-')}.bench.test", ip)["ip"],
+                    ips, concurrency)
+            elif name == "geoip":
+                elapsed, latencies, errors = _timed_map(get_geoip_info, ips, concurrency)
+            elif name == "nmap":
+                if count <= 100:
+                    elapsed, latencies, errors = _timed_map(
+                        lambda ip: run_nmap_scan(ip, "1-1000"), ips, concurrency)
+                else:
+                    # One process per host is not what large runs use; time the sharded batch scanner
+                    start = time.perf_counter()
+                    results = run_nmap_batch(ips, "1-1000")
+                    elapsed, latencies, errors = time.perf_counter() - start, [], count - len(results)
+            elif name == "pipeline":
+                latencies, errors = [], 0
+
+                def on_record(record, done):
+                    nonlocal errors
+                    errors += 1 if record.get("error") else 0
+
+                with tempfile.TemporaryDirectory() as tmp:
+                    stats = run_batch(
+                        (f"http://{ip}:{http_port}/" for ip in ips),
+                        ["whois", "dns", "ports", "http", "tech", "geoip"],
+                        os.path.join(tmp, "results.ndjson"), concurrency=concurrency,
+                        on_record=on_record,
+                        scan_options={"mode": "nmap", "ports": "1-1000", "http": {"share_page": True}})
+                elapsed = stats["elapsed"]
+            else:
+                raise ValueError(f"unknown benchmark {name!r}")
+
+            row = _row(name, count, elapsed, latencies, errors)
+            rows.append(row)
+            print(f"{name:<9} n={count:<6} {row['items_per_sec']:>9.1f}/s  "
+                  f"p50={row['p50_ms']:>8.2f}ms  p99={row['p99_ms']:>8.2f}ms  "
+                  f"errors={errors:<5} rss={row['peak_rss_mb']:.1f}MB", flush=True)
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Offline benchmarks against local fake services")
+    parser.add_argument("--scales", default=DEFAULT_SCALES, help=f"Comma-separated target counts (default: {DEFAULT_SCALES})")
+    parser.add_argument("--only", help=f"Comma-separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated service latency per request")
+    parser.add_argument("--concurrency", type=int, default=16, help="Parallel items per benchmark (default: 16)")
+    parser.add_argument("--json", metavar="PATH", help="Also write results as JSON")
+    args = parser.parse_args()
+
+    names = args.only.split(",") if args.only else BENCHMARKS
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+    scales = [int(value) for value in args.scales.split(",")]
+    latency = args.latency_ms / 1000
+
+    dns_server = start_in_thread(StubDNSServer(latency=latency))
+    http_server = start_in_thread(FakeHTTPServer(latency=latency))
+    base_url = f"http://127.0.0.1:{http_server.port}"
+
+    # Route every module to the stand-ins before anything imports them
+    nmap_dir = tempfile.mkdtemp(prefix="recon-bench-")
+    os.environ["NMAP_PATH"] = write_fake_nmap(nmap_dir)
+    os.environ["PATH"] = nmap_dir + os.pathsep + os.environ.get("PATH", "")
+    os.environ["IPINFO_URL"] = base_url
+    os.environ["IPINFO_TOKEN"] = "benchmark"
+    os.environ.setdefault("FAKE_NMAP_DELAY", str(latency))
+
+    from utils.cache import configure_cache
+    from utils.http_client import configure_http_client
+    from modules.dns_lookup import configure_resolver
+    from utils.scheduler import configure_scheduler, ProviderPolicy, DEFAULT_POLICIES
+    configure_cache(enabled=False)
+    # The stand-ins have no quotas: lift the provider rate limits so the modules are measured, not the buckets
+    configure_scheduler({name: ProviderPolicy(rate=0, max_concurrency=args.concurrency) for name in DEFAULT_POLICIES})
+    configure_http_client(per_host=max(args.concurrency, 10), retries=0)
+    configure_resolver(["127.0.0.1"], dns_server.port)
+    install_whois_fakes(base_url)
+
+    print(f"DNS stub on udp/{dns_server.port}, HTTP stand-ins on {base_url}, "
+          f"latency {args.latency_ms:g} ms, concurrency {args.concurrency}")
+    rows = run_benchmarks(names, scales, args.concurrency, base_url, http_server.port)
+
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"latency_ms": args.latency_ms, "concurrency": args.concurrency, "results": rows}, f, indent=4)
+        print(f"Results saved to {args.json}")
+
+    dns_server.shutdown()
+    http_server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
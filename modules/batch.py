@@ -0,0 +1,181 @@
+# modules/batch.py
+
+try:
+    import sys
+    import time
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+    from modules.input_handler import detect_input_type
+    from modules.pipeline import run_modules, build_task_map, DEFAULT_WORKERS
+    from utils.journal import get_journal
+    from modules.json_export import NDJSONWriter
+    from utils.deadline import target_scope, get_run_deadline
+except ImportError as e:
+    from utils.logger import logger
+    logger.error(f"Missing dependency: {e}. Please install required modules.")
+    raise
+from utils.logger import logger
+
+DEFAULT_CONCURRENCY = 8
+
+
+def iter_targets(source: str):
+    """
+    Lazily yields targets from a file, one per line. Blank lines and
+    lines starting with '#' are skipped.
+
+    Args:
+        source (str): Path to the targets file, or '-' for stdin.
+
+    Yields:
+        str: One raw target per line.
+    """
+    handle = sys.stdin if source == "-" else open(source, "r", encoding="utf-8")
+    try:
+        for line in handle:
+            target = line.strip()
+            if target and not target.startswith("#"):
+                yield target
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+
+def scan_target(target: str, selected: list, module_workers: int = DEFAULT_WORKERS,
+                scan_options: dict | None = None) -> dict:
+    """
+    Runs input detection and the selected modules for a single target.
+
+    Args:
+        target (str): Raw target (domain, IP or URL).
+        selected (list): Module keys to run.
+        module_workers (int): Modules run concurrently for this target.
+        scan_options (dict): Keyword arguments for port_scan.scan_ports() (HTTP probe options under "http").
+
+    Returns:
+        dict: Record with target, input_type, ip and results (or error).
+    """
+    input_type, cleaned_input, ip_address = detect_input_type(target)
+    record = {
+        "target": target,
+        "input_type": input_type,
+        "normalized": cleaned_input,
+        "ip": ip_address,
+    }
+    if input_type == "unknown":
+        record["error"] = "Invalid input. Please provide a valid IP, domain, or URL."
+        return record
+
+    task_map = build_task_map(target, cleaned_input, ip_address, scan_options)
+    record["results"] = run_modules(task_map, selected, module_workers,
+                                    journal=get_journal(), journal_key=target)
+    return record
+
+
+def _scan_in_budget(scanner, target: str, *args) -> dict:
+    # Each target gets its own --target-budget, bounded by the run's
+    with target_scope():
+        return scanner(target, *args)
+
+
+def _timed_out(record: dict) -> bool:
+    return any(isinstance(result, dict) and result.get("timed_out")
+               for result in (record.get("results") or {}).values())
+
+
+def run_batch(targets, selected: list, ndjson_path: str, concurrency: int = DEFAULT_CONCURRENCY,
+              module_workers: int = DEFAULT_WORKERS, on_record=None, scan_options: dict | None = None,
+              scanner=None) -> dict:
+    """
+    Scans many targets with bounded parallelism and streams one NDJSON line
+    per target as soon as it finishes. At most `concurrency` targets are held
+    in memory at any time, so the target iterator can be arbitrarily long.
+
+    When the process-wide journal (utils.journal) was resumed, the NDJSON file
+    is rewritten from it first and targets it already finished are skipped.
+    Each target runs under the per-target budget (utils.deadline); once the
+    run budget is spent no new targets are started.
+
+    Args:
+        targets (iterable): Raw targets, typically from iter_targets().
+        selected (list): Module keys to run for every target.
+        ndjson_path (str): Output file; records are appended in completion order.
+        concurrency (int): Maximum number of targets in flight.
+        module_workers (int): Modules run concurrently per target.
+        on_record (callable): Optional hook called as on_record(record, done_count).
+        scan_options (dict): Keyword arguments for port_scan.scan_ports() (HTTP probe options under "http").
+        scanner (callable): Per-target function with scan_target()'s signature
+            (default: scan_target; rescan.rescan_target for incremental runs).
+
+    Returns:
+        dict: Run statistics (targets, invalid, resumed, elapsed, targets_per_sec, out_of_budget);
+        targets_per_sec leaves out the records restored from the journal.
+    """
+
+    concurrency = max(1, concurrency)
+    scanner = scanner or scan_target
+    stats = {"targets": 0, "invalid": 0, "resumed": 0}
+    started = time.perf_counter()
+    targets = iter(targets)
+    journal = get_journal()
+    run_deadline = get_run_deadline()
+
+    def emit(record):
+        if "error" in record:
+            stats["invalid"] += 1
+        stats["targets"] += 1
+        out.write(record)
+        if on_record:
+            on_record(record, stats["targets"])
+
+    with NDJSONWriter(ndjson_path, append=not journal.resumed) as out, \
+            ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for record in journal.iter_records() if journal.resumed else ():
+            stats["resumed"] += 1
+            emit(record)
+
+        pending = set()
+        exhausted = False
+
+        while pending or not exhausted:
+            # Top up the in-flight window without reading ahead of it
+            while not exhausted and len(pending) < concurrency:
+                if run_deadline.expired:
+                    stats["out_of_budget"] = True
+                    logger.warning("[!] Run budget spent; remaining targets were not started "
+                                   "(rerun with --resume to continue)")
+                    exhausted = True
+                    break
+                try:
+                    target = next(targets)
+                except StopIteration:
+                    exhausted = True
+                    break
+                if journal.is_finished(target):
+                    continue
+                pending.add(executor.submit(_scan_in_budget, scanner, target, selected, module_workers,
+                                            scan_options))
+
+            if not pending:
+                break
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    record = future.result()
+                except Exception as e:
+                    logger.error(f"[!] Batch target failed: {e}")
+                    record = {"error": f"Batch target failed: {str(e)}"}
+
+                emit(record)
+                # Modules abandoned at the deadline were not journaled; leave the target for --resume
+                if "target" in record and not _timed_out(record):
+                    journal.finish(record["target"], record)
+
+    stats.setdefault("out_of_budget", False)
+    stats["elapsed"] = time.perf_counter() - started
+    # Records replayed from the journal cost nothing; throughput counts what this run scanned
+    scanned = stats["targets"] - stats["resumed"]
+    stats["targets_per_sec"] = scanned / stats["elapsed"] if stats["elapsed"] else 0.0
+    logger.info(f"[✓] Batch finished: {stats['targets']} targets ({stats['resumed']} from the journal), "
+                f"{stats['targets_per_sec']:.2f} targets/s")
+    return stats
@@ -0,0 +1,276 @@
+# modules/distributed.py
+
+try:
+    import os
+    import time
+    import socket
+    import threading
+    import multiprocessing
+    from collections import OrderedDict, deque
+    from modules.input_handler import detect_input_type
+    from modules.pipeline import build_task_map
+    from utils.job_queue import open_queue, DEFAULT_LEASE
+    from modules.json_export import NDJSONWriter
+    from utils.deadline import deadline_scope, get_target_budget
+    from utils.hedging import get_hedger
+except ImportError as e:
+    from utils.logger import logger
+    logger.error(f"Missing dependency: {e}. Please install required modules.")
+    raise
+from utils.logger import logger
+
+DEFAULT_WORKER_THREADS = 8
+DEFAULT_PREFETCH = 4
+IDLE_SLEEP = 0.5
+# Targets whose task maps a worker keeps, so the http and tech jobs of one
+# target share a single fetch when they land on the same worker
+CONTEXT_CACHE_SIZE = 256
+
+
+class _TargetContexts:
+    """Small LRU of target -> (meta, task_map) inside one worker process."""
+
+    def __init__(self, scan_options: dict, size: int = CONTEXT_CACHE_SIZE):
+        self.scan_options = scan_options
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, target: str) -> tuple:
+        with self._lock:
+            if target in self._entries:
+                self._entries.move_to_end(target)
+                return self._entries[target]
+        input_type, cleaned_input, ip_address = detect_input_type(target)
+        meta = {"input_type": input_type, "normalized": cleaned_input, "ip": ip_address}
+        task_map = None
+        if input_type != "unknown":
+            task_map = build_task_map(target, cleaned_input, ip_address, self.scan_options)
+        with self._lock:
+            self._entries[target] = (meta, task_map)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+        return meta, task_map
+
+
+def run_worker(queue, worker_id: str | None = None, threads: int = DEFAULT_WORKER_THREADS,
+               prefetch: int = DEFAULT_PREFETCH, lease: float = DEFAULT_LEASE) -> int:
+    """
+    Pulls (target, module) jobs from a queue until the coordinator sealed it
+    and nothing is left, running up to `threads` jobs at a time.
+
+    Args:
+        queue: utils.job_queue.JobQueue or RemoteJobQueue.
+        worker_id (str): Unique name; defaults to host:pid.
+        threads (int): Jobs run concurrently in this process.
+        prefetch (int): Jobs reserved per round trip to the queue.
+        lease (float): Seconds a reserved/running job stays ours without a heartbeat.
+
+    Returns:
+        int: Number of jobs this worker completed.
+    """
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    contexts = _TargetContexts(queue.get_setting("scan_options", {}) or {})
+    # Each job is one module of one target, so the per-target budget bounds every job
+    job_budget = queue.get_setting("target_budget")
+    local = deque()
+    local_lock = threading.Lock()
+    stop = threading.Event()
+    completed = 0
+    completed_lock = threading.Lock()
+
+    def heartbeat():
+        while not stop.wait(lease / 3):
+            try:
+                queue.heartbeat(worker_id, lease)
+            except Exception as e:
+                logger.warning(f"Heartbeat from {worker_id} failed: {e}")
+
+    def next_job():
+        with local_lock:
+            if not local:
+                # Own share first; when the queue is dry take jobs others prefetched but have not started
+                local.extend(queue.claim(worker_id, prefetch, lease) or queue.steal(worker_id, prefetch, lease))
+            return local.popleft() if local else None
+
+    def run_job(job: dict) -> None:
+        nonlocal completed
+        try:
+            meta, task_map = contexts.get(job["target"])
+        except Exception as e:
+            # Never leave a started job behind: the heartbeat would keep its lease alive forever
+            logger.error(f"[!] Could not prepare {job['target']}: {e}")
+            meta, task_map = {"input_type": "unknown"}, None
+        if task_map is None:
+            queue.complete(job["id"], worker_id, {"error": "Invalid input. Please provide a valid IP, domain, or URL."},
+                           meta, failed=True)
+        elif job["module"] not in task_map:
+            queue.complete(job["id"], worker_id, {"error": f"Unknown module {job['module']!r} on {worker_id}"},
+                           meta, failed=True)
+        else:
+            try:
+                with deadline_scope(job_budget):
+                    result = task_map[job["module"]][1]()
+                queue.complete(job["id"], worker_id, result, meta)
+            except Exception as e:
+                logger.error(f"[!] {job['module']} failed for {job['target']}: {e}")
+                queue.complete(job["id"], worker_id, {"error": f"{job['module']} module failed: {str(e)}"},
+                               meta, failed=True)
+        with completed_lock:
+            completed += 1
+
+    def loop():
+        while not stop.is_set():
+            try:
+                job = next_job()
+                if job is None:
+                    if queue.drained():
+                        return
+                    time.sleep(IDLE_SLEEP)
+                    continue
+                if queue.start(job["id"], worker_id, lease):
+                    run_job(job)
+            except Exception as e:
+                logger.error(f"[!] Worker {worker_id} error: {e}")
+                time.sleep(IDLE_SLEEP)
+
+    beat = threading.Thread(target=heartbeat, daemon=True)
+    beat.start()
+    runners = [threading.Thread(target=loop, daemon=True) for _ in range(max(1, threads))]
+    for runner in runners:
+        runner.start()
+    for runner in runners:
+        runner.join()
+    stop.set()
+    logger.info(f"[✓] Worker {worker_id} finished {completed} jobs")
+    return completed
+
+
+def worker_process(location: str, threads: int = DEFAULT_WORKER_THREADS, token: str | None = None,
+                   cache_path: str | None = None, geoip_db: str | None = None, rates: list | None = None,
+                   rate_share: float = 1.0) -> None:
+    """
+    Entry point of a worker process, local or on another node: applies the
+    per-process settings the coordinator's process would have, then runs
+    run_worker() against the queue at `location` (path or tcp://host:port).
+    """
+    from utils.cache import configure_cache
+    from modules.geoip_offline import configure_offline_geoip
+    from utils.scheduler import configure_scheduler, parse_rates
+    from utils.hedging import configure_hedging
+    from modules.port_scan import configure_nmap_batching
+    if cache_path:
+        configure_cache(cache_path)
+    configure_offline_geoip(geoip_db)
+    # Local processes split the provider quotas; a worker on another node has its own source IP and full quota
+    configure_scheduler(parse_rates(rates), share=rate_share)
+    # Concurrent port jobs of this worker share nmap runs
+    configure_nmap_batching(batch_size=threads)
+    queue = open_queue(location, token)
+    try:
+        configure_hedging(queue.get_setting("hedge"))
+        run_worker(queue, threads=threads)
+    finally:
+        queue.close()
+
+
+def spawn_workers(location: str, processes: int, threads: int = DEFAULT_WORKER_THREADS,
+                  token: str | None = None, cache_path: str | None = None, geoip_db: str | None = None,
+                  rates: list | None = None) -> list:
+    """Starts local worker processes; each has its own GIL and pulls from the same queue."""
+    # spawn rather than fork: the coordinator already runs threads (progress, broker)
+    context = multiprocessing.get_context("spawn")
+    workers = []
+    for index in range(max(0, processes)):
+        process = context.Process(target=worker_process,
+                                  args=(location, threads, token, cache_path, geoip_db, rates, 1.0 / processes),
+                                  name=f"recon-worker-{index}", daemon=True)
+        process.start()
+        workers.append(process)
+    return workers
+
+
+def configure_queue(queue, scan_options: dict | None = None, resume: bool = False) -> None:
+    """
+    Writes the run settings workers read once at startup (scan options,
+    --target-budget, --hedge) and unseals the queue. Call it before any
+    worker can attach; a resumed queue keeps the settings of its first run.
+    """
+    if resume:
+        return
+    queue.set_setting("sealed", False)
+    queue.set_setting("scan_options", scan_options or {})
+    # Workers apply the coordinator's --target-budget and --hedge
+    hedger = get_hedger()
+    queue.set_setting("target_budget", get_target_budget())
+    queue.set_setting("hedge", hedger.percentile if hedger.enabled else None)
+
+
+def coordinate(queue, targets, selected: list, ndjson_path: str, resume: bool = False,
+               workers: list | None = None, remote: bool = False, on_record=None, poll: float = 1.0) -> dict:
+    """
+    Splits targets into (target, module) jobs, waits for workers to finish
+    them and streams one NDJSON record per target as soon as all of its
+    modules are done, in the same shape as batch.run_batch(). The queue
+    must have been set up with configure_queue() first.
+
+    Args:
+        queue (utils.job_queue.JobQueue): Local queue (the broker serves it to remote workers).
+        targets (iterable): Raw targets.
+        selected (list): Module keys to run for every target.
+        ndjson_path (str): Output file; records are appended.
+        resume (bool): Continue the jobs already in the queue instead of adding targets.
+        workers (list): Local worker processes to watch (optional).
+        remote (bool): Remote workers are attached, so keep waiting even when
+            every local worker has exited.
+        on_record (callable): Optional hook called as on_record(record, done_count).
+        poll (float): Seconds between checks for finished targets.
+
+    Returns:
+        dict: Run statistics (targets, invalid, elapsed, targets_per_sec).
+    """
+    started = time.perf_counter()
+    if resume:
+        requeued = queue.requeue_running()
+        logger.info(f"[✓] Resuming queue {queue.path}: {requeued} interrupted jobs requeued")
+    else:
+        added = queue.put(targets, selected)
+        logger.info(f"[✓] Queued {added} targets x {len(selected)} modules")
+    queue.set_setting("sealed", True)
+
+    stats = {"targets": 0, "invalid": 0}
+
+    drained = False
+    with NDJSONWriter(ndjson_path) as out:
+        while True:
+            finished = queue.pop_finished()
+            for target, meta, results in finished:
+                record = {"target": target, **meta}
+                errors = [r.get("error") for r in results.values() if isinstance(r, dict)]
+                if meta.get("input_type") == "unknown" or not meta:
+                    record["error"] = next((e for e in errors if e), "Target could not be scanned")
+                    stats["invalid"] += 1
+                else:
+                    record["results"] = {key: results[key] for key in selected if key in results}
+                stats["targets"] += 1
+                out.write(record)
+                if on_record:
+                    on_record(record, stats["targets"])
+
+            if not finished:
+                # One more pass after draining picks up jobs completed since the last pop
+                if drained:
+                    break
+                drained = queue.drained()
+                if drained:
+                    continue
+                if workers and not remote and not any(w.is_alive() for w in workers):
+                    logger.error("[!] All local workers exited with jobs left; rerun with --resume")
+                    break
+                time.sleep(poll)
+
+    stats["elapsed"] = time.perf_counter() - started
+    stats["targets_per_sec"] = stats["targets"] / stats["elapsed"] if stats["elapsed"] else 0.0
+    logger.info(f"[✓] Distributed run finished: {stats['targets']} targets, "
+                f"{stats['targets_per_sec']:.2f} targets/s")
+    return stats
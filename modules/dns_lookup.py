@@ -1,40 +1,196 @@
 # modules/dns_lookup.py
 
 try:
+    import asyncio
     import dns.resolver
+    import dns.asyncresolver
     import dns.exception
+    from utils.deadline import budget
+    from utils.hedging import get_hedger
 except ImportError as e:
     from utils.logger import logger
     logger.error(f"Missing dependency: {e}. Please install required modules.")
     raise
 from utils.logger import logger
 
-def get_dns_records(domain: str) -> dict:
+RECORD_TYPES = ['A', 'AAAA', 'MX', 'NS', 'TXT', 'CNAME']
+DEFAULT_TIMEOUT = 5
+DEFAULT_CONCURRENCY = 500
+NEGATIVE_TTL = 300
+
+# Resolvers are configured once per (nameservers, port) and shared across calls
+_resolvers = {}
+_default_nameservers = None
+_default_port = 53
+
+
+def configure_resolver(nameservers: list | None = None, port: int = 53) -> None:
     """
-    Perform DNS lookups for various record types on the provided domain.
+    Sets the nameservers used when callers do not pass their own (e.g. a local
+    stub server for tests and benchmarks). None restores resolv.conf.
+    """
+    global _default_nameservers, _default_port
+    _default_nameservers = list(nameservers) if nameservers else None
+    _default_port = port
+
+
+def get_async_resolver(nameservers: list | None = None, port: int = 53) -> dns.asyncresolver.Resolver:
+    """
+    Returns a shared asyncio resolver, optionally pointed at specific nameservers
+    (e.g. a local stub server in tests). Timeouts are passed per query, so
+    one resolver serves every (deadline-clipped) timeout.
+
+    Args:
+        nameservers (list): Nameserver IPs; the configure_resolver() default
+            (or system resolv.conf) is used when None.
+        port (int): Nameserver port.
+
+    Returns:
+        dns.asyncresolver.Resolver: Configured resolver.
+    """
+    if nameservers is None:
+        nameservers, port = _default_nameservers, _default_port
+    key = (tuple(nameservers or ()), port)
+    resolver = _resolvers.get(key)
+    if resolver is None:
+        resolver = dns.asyncresolver.Resolver(configure=not nameservers)
+        if nameservers:
+            resolver.nameservers = list(nameservers)
+        resolver.port = port
+        _resolvers[key] = resolver
+    return resolver
+
+
+async def _query(resolver, domain: str, rtype: str, timeout: float, semaphore=None, hedge: bool = True) -> tuple:
+    async def _resolve():
+        answers = await resolver.resolve(domain, rtype, lifetime=timeout)
+        return [rdata.to_text().strip() for rdata in answers], answers.rrset.ttl
+
+    async def _lookup():
+        # Queries are idempotent, so a slow one may be raced by a duplicate (utils.hedging)
+        if hedge:
+            return await get_hedger().call_async("dns", _resolve)
+        return await _resolve()
+
+    try:
+        if semaphore is None:
+            return await asyncio.wait_for(_lookup(), timeout)
+        async with semaphore:
+            return await asyncio.wait_for(_lookup(), timeout)
+    except (dns.resolver.NoAnswer, dns.resolver.NXDOMAIN, dns.exception.Timeout,
+            dns.resolver.NoNameservers, asyncio.TimeoutError):
+        return [], None
+    except Exception as e:
+        logger.error(f"[!] Error fetching {rtype} record for {domain}: {e}")
+        return [], None
+
+
+async def lookup_async(domain: str, rtype: str = "A", resolver=None, timeout: float = DEFAULT_TIMEOUT,
+                       semaphore=None) -> list:
+    """
+    Values of a single record type; empty when the name does not exist,
+    has no such record or the query timed out. Never hedged: brute-force
+    callers hold their own query rate.
+    """
+    records, _ = await _query(resolver or get_async_resolver(), domain, rtype, timeout, semaphore,
+                              hedge=False)
+    return records
+
+
+async def get_dns_records_with_ttl_async(domain: str, resolver=None, timeout: float = DEFAULT_TIMEOUT,
+                                         semaphore=None, record_types=RECORD_TYPES, known: tuple | None = None) -> tuple:
+    """
+    Like get_dns_records_async(), but also returns the smallest record TTL
+    (NEGATIVE_TTL when nothing was found) so callers can cache the result.
+
+    record_types limits the query to some types; known is an already
+    resolved (records, ttl) pair (see modules.resolution) whose types are
+    reused instead of queried again.
+    """
+    resolver = resolver or get_async_resolver()
+    known_records, known_ttl = known or ({}, None)
+    missing = [rtype for rtype in record_types if rtype not in known_records]
+    answers = await asyncio.gather(*(
+        _query(resolver, domain, rtype, timeout, semaphore) for rtype in missing
+    ))
+    found = dict(zip(missing, answers))
+    records = {rtype: known_records[rtype] if rtype in known_records else found[rtype][0] for rtype in record_types}
+    ttls = [ttl for _, ttl in answers if ttl is not None]
+    if known_ttl is not None and any(known_records.get(rtype) for rtype in record_types):
+        ttls.append(known_ttl)
+    return records, min(ttls) if ttls else NEGATIVE_TTL
+
+
+async def get_dns_records_async(domain: str, resolver=None, timeout: float = DEFAULT_TIMEOUT,
+                                semaphore=None) -> dict:
+    """
+    Queries every record type for a domain in parallel.
 
     Parameters:
         domain (str): Domain name to query.
+        resolver: Optional dns.asyncresolver.Resolver to use.
+        timeout (float): Deadline per query in seconds.
+        semaphore (asyncio.Semaphore): Optional shared in-flight limit.
 
     Returns:
         dict: Dictionary containing DNS records by type.
     """
-    records = {}
-    resolver = dns.resolver.Resolver()
-    resolver.timeout = 5
-    resolver.lifetime = 5
+    records, _ = await get_dns_records_with_ttl_async(domain, resolver, timeout, semaphore)
+    return records
 
-    record_types = ['A', 'AAAA', 'MX', 'NS', 'TXT', 'CNAME']
 
-    for rtype in record_types:
-        try:
-            answers = resolver.resolve(domain, rtype)
-            records[rtype] = [rdata.to_text().strip() for rdata in answers]
-        except (dns.resolver.NoAnswer, dns.resolver.NXDOMAIN,
-                dns.exception.Timeout, dns.resolver.NoNameservers):
-            records[rtype] = []
-        except Exception as e:
-            logger.error(f"[!] Error fetching {rtype} record for {domain}: {e}")
-            records[rtype] = []
+async def resolve_many_async(domains, concurrency: int = DEFAULT_CONCURRENCY,
+                             timeout: float = DEFAULT_TIMEOUT, nameservers: list | None = None,
+                             port: int = 53) -> dict:
+    """
+    Resolves all record types for many domains with a bounded number of
+    queries in flight.
 
-    return records
+    Parameters:
+        domains (iterable): Domain names to query.
+        concurrency (int): Maximum simultaneous DNS queries.
+        timeout (float): Deadline per query in seconds.
+        nameservers (list): Optional nameserver IPs.
+        port (int): Nameserver port.
+
+    Returns:
+        dict: Domain -> records dict (same shape as get_dns_records).
+    """
+    resolver = get_async_resolver(nameservers, port)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    domains = list(dict.fromkeys(domains))
+    results = await asyncio.gather(*(
+        get_dns_records_async(domain, resolver, timeout, semaphore) for domain in domains
+    ))
+    return dict(zip(domains, results))
+
+
+def resolve_many(domains, concurrency: int = DEFAULT_CONCURRENCY, timeout: float = DEFAULT_TIMEOUT,
+                 nameservers: list | None = None, port: int = 53) -> dict:
+    """
+    Synchronous wrapper around resolve_many_async().
+    """
+    return asyncio.run(resolve_many_async(domains, concurrency, timeout, nameservers, port))
+
+
+def get_dns_records(domain: str, timeout: float = DEFAULT_TIMEOUT) -> dict:
+    """
+    Perform DNS lookups for various record types on the provided domain.
+    All record types are queried in parallel, so a dead nameserver costs
+    one timeout rather than one per record type.
+
+    Parameters:
+        domain (str): Domain name to query.
+        timeout (float): Deadline per query in seconds.
+
+    Returns:
+        dict: Dictionary containing DNS records by type.
+    """
+    return asyncio.run(get_dns_records_async(domain, timeout=budget(timeout)))
+
+
+def get_dns_records_with_ttl(domain: str, timeout: float = DEFAULT_TIMEOUT, known: tuple | None = None) -> tuple:
+    """
+    Synchronous wrapper returning (records, min_ttl) for cache-aware callers.
+    """
+    return asyncio.run(get_dns_records_with_ttl_async(domain, timeout=budget(timeout), known=known))
@@ -4,18 +4,31 @@ try:
     import os
     import requests
     from dotenv import load_dotenv
+    from utils.scheduler import get_scheduler
+    from utils.deadline import budget
+    from modules.geoip_offline import get_offline_index
 except ImportError as e:
     from utils.logger import logger
     logger.error(f"Missing dependency: {e}. Please install required modules.")
     raise
 from utils.logger import logger
 
-# Load environment variables from .env
-load_dotenv()
+_env_loaded = False
+
+
+def _load_env() -> None:
+    # Load environment variables from .env on first use rather than at import
+    global _env_loaded
+    if not _env_loaded:
+        load_dotenv()
+        _env_loaded = True
+
 
 def get_geoip_info(ip_address: str) -> dict:
     """
-    Retrieves GeoIP data for a given IP address using the IPinfo API.
+    Retrieves GeoIP data for a given IP address. The offline database (see
+    modules.geoip_offline) answers first when configured; the IPinfo API is
+    the fallback for addresses it does not cover.
 
     Parameters:
         ip_address (str): The IP address to query.
@@ -23,6 +36,13 @@ def get_geoip_info(ip_address: str) -> dict:
     Returns:
         dict: A dictionary with GeoIP data or error message.
     """
+    index = get_offline_index()
+    if index is not None:
+        record = index.lookup(ip_address)
+        if record is not None:
+            return record
+
+    _load_env()
     token = os.getenv("IPINFO_TOKEN")
     if not token:
         logger.error("Missing IPINFO_TOKEN in your .env file. Example: IPINFO_TOKEN=your_token_here")
@@ -30,11 +50,12 @@ def get_geoip_info(ip_address: str) -> dict:
             "error": "Missing IPINFO_TOKEN in your .env file. Example: IPINFO_TOKEN=your_token_here"
         }
 
-    url = f"https://ipinfo.io/{ip_address}/json?token={token}"
-    headers = {"User-Agent": "ReconTool/1.0"}
+    base_url = os.getenv("IPINFO_URL", "https://ipinfo.io").rstrip("/")
+    url = f"{base_url}/{ip_address}/json?token={token}"
 
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        # Rate limited per provider; concurrent lookups of one IP share a request
+        response = get_scheduler().http("ipinfo", "GET", url, key=ip_address, timeout=budget(10))
         if response.status_code == 200:
             return response.json()
         logger.error(f"GeoIP lookup failed with HTTP {response.status_code} for {ip_address}")
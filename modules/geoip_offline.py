@@ -0,0 +1,219 @@
+# modules/geoip_offline.py
+
+try:
+    import os
+    import csv
+    import json
+    import mmap
+    import struct
+    import ipaddress
+except ImportError as e:
+    from utils.logger import logger
+    logger.error(f"Missing dependency: {e}. Please install required modules.")
+    raise
+from utils.logger import logger
+
+# Compiled index layout (all integers big-endian):
+#   header  : MAGIC, n_v4 (Q), n_v6 (Q)
+#   v4 rows : start (4s) end (4s) record id (I)
+#   v6 rows : start (16s) end (16s) record id (I)
+#   records : JSON list of ipinfo-style dicts
+MAGIC = b"RRGEO1\0\0"
+HEADER = struct.Struct(">8sQQ")
+ROW_V4 = struct.Struct(">4s4sI")
+ROW_V6 = struct.Struct(">16s16sI")
+
+# Columns in a CSV range database that describe the range rather than the data
+RANGE_COLUMNS = {"start", "end", "network"}
+
+
+def _ranges_from_csv(csv_path: str):
+    with open(csv_path, "r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            if row.get("network"):
+                network = ipaddress.ip_network(row["network"].strip(), strict=False)
+                start, end = network.network_address, network.broadcast_address
+            else:
+                start = ipaddress.ip_address(row["start"].strip())
+                end = ipaddress.ip_address(row["end"].strip())
+            record = {k: v for k, v in row.items() if k not in RANGE_COLUMNS and v not in (None, "")}
+            yield start, end, record
+
+
+def compile_csv(csv_path: str, index_path: str | None = None) -> str:
+    """
+    Compiles a CSV IP-range database into the binary index format loaded by
+    GeoIPIndex. The CSV needs either a `network` (CIDR) column or `start`/`end`
+    columns; every other column (city, region, country, loc, org, postal,
+    timezone, ...) becomes part of the returned record.
+
+    Args:
+        csv_path (str): Source CSV file.
+        index_path (str): Output path (default: csv_path with a .idx suffix).
+
+    Returns:
+        str: Path of the compiled index.
+    """
+    index_path = index_path or os.path.splitext(csv_path)[0] + ".idx"
+    records, record_ids = [], {}
+    v4, v6 = [], []
+
+    for start, end, record in _ranges_from_csv(csv_path):
+        key = json.dumps(record, sort_keys=True)
+        if key not in record_ids:
+            record_ids[key] = len(records)
+            records.append(record)
+        rows = v4 if start.version == 4 else v6
+        rows.append((start.packed, end.packed, record_ids[key]))
+
+    v4.sort()
+    v6.sort()
+    with open(index_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(v4), len(v6)))
+        for row in v4:
+            f.write(ROW_V4.pack(*row))
+        for row in v6:
+            f.write(ROW_V6.pack(*row))
+        f.write(json.dumps(records, ensure_ascii=False).encode("utf-8"))
+
+    logger.info(f"[✓] Compiled {len(v4) + len(v6)} ranges into {index_path}")
+    return index_path
+
+
+class GeoIPIndex:
+    """
+    Memory-mapped, sorted range index answering IPv4/IPv6 lookups by binary
+    search. Opening is O(1) apart from the deduplicated record table, so even
+    multi-million-range databases start instantly.
+    """
+
+    def __init__(self, index_path: str):
+        self._file = open(index_path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.n_v4, self.n_v6 = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{index_path} is not a compiled GeoIP index")
+        self._v4_offset = HEADER.size
+        self._v6_offset = self._v4_offset + self.n_v4 * ROW_V4.size
+        records_offset = self._v6_offset + self.n_v6 * ROW_V6.size
+        self.records = json.loads(self._map[records_offset:].decode("utf-8"))
+
+    def _search(self, packed: bytes, offset: int, count: int, row: struct.Struct):
+        # Rightmost range whose start <= address; fixed-width big-endian
+        # bytes compare in the same order as the integers they encode
+        width = len(packed)
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = offset + mid * row.size
+            if self._map[start:start + width] <= packed:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == 0:
+            return None
+        _, end, record_id = row.unpack_from(self._map, offset + (lo - 1) * row.size)
+        return self.records[record_id] if packed <= end else None
+
+    def lookup(self, ip_address: str) -> dict | None:
+        """Returns the ipinfo-style dict for an address, or None if not covered."""
+        try:
+            address = ipaddress.ip_address(ip_address)
+        except ValueError:
+            return None
+        if address.version == 4:
+            record = self._search(address.packed, self._v4_offset, self.n_v4, ROW_V4)
+        else:
+            record = self._search(address.packed, self._v6_offset, self.n_v6, ROW_V6)
+        return {"ip": str(address), **record} if record is not None else None
+
+    def lookup_many(self, ip_addresses) -> dict:
+        """Bulk lookup: ip -> ipinfo-style dict (None for uncovered addresses)."""
+        return {ip: self.lookup(ip) for ip in ip_addresses}
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+
+class MMDBIndex:
+    """
+    Adapter exposing a MaxMind (GeoLite2 City/ASN) database with the same
+    lookup()/lookup_many() interface and ipinfo-style keys.
+    """
+
+    def __init__(self, mmdb_path: str):
+        try:
+            import maxminddb  # optional: only needed for .mmdb databases
+        except ImportError:
+            raise ImportError("maxminddb is required for .mmdb databases (pip install maxminddb)")
+        self._reader = maxminddb.open_database(mmdb_path, maxminddb.MODE_MMAP)
+
+    def lookup(self, ip_address: str) -> dict | None:
+        try:
+            data = self._reader.get(ip_address)
+        except ValueError:
+            return None
+        if not data:
+            return None
+
+        result = {"ip": ip_address}
+        if "city" in data:
+            result["city"] = data["city"].get("names", {}).get("en")
+        if data.get("subdivisions"):
+            result["region"] = data["subdivisions"][0].get("names", {}).get("en")
+        if "country" in data:
+            result["country"] = data["country"].get("iso_code")
+        location = data.get("location", {})
+        if "latitude" in location and "longitude" in location:
+            result["loc"] = f"{location['latitude']},{location['longitude']}"
+        if "time_zone" in location:
+            result["timezone"] = location["time_zone"]
+        if "postal" in data:
+            result["postal"] = data["postal"].get("code")
+        if "autonomous_system_number" in data:
+            result["org"] = f"AS{data['autonomous_system_number']} {data.get('autonomous_system_organization', '')}".strip()
+        return {k: v for k, v in result.items() if v is not None}
+
+    def lookup_many(self, ip_addresses) -> dict:
+        return {ip: self.lookup(ip) for ip in ip_addresses}
+
+    def close(self) -> None:
+        self._reader.close()
+
+
+_index = None
+
+
+def open_index(path: str):
+    """
+    Opens an offline GeoIP database: .mmdb via maxminddb, .csv (compiled to
+    a sibling .idx on first use or when the CSV is newer) or a compiled .idx.
+    """
+    if path.endswith(".mmdb"):
+        return MMDBIndex(path)
+    if path.endswith(".csv"):
+        index_path = os.path.splitext(path)[0] + ".idx"
+        if not os.path.exists(index_path) or os.path.getmtime(index_path) < os.path.getmtime(path):
+            compile_csv(path, index_path)
+        path = index_path
+    return GeoIPIndex(path)
+
+
+def configure_offline_geoip(path: str | None):
+    """Sets the process-wide offline database used by get_geoip_info()."""
+    global _index
+    if _index is not None:
+        _index.close()
+        _index = None
+    if path:
+        try:
+            _index = open_index(path)
+            logger.info(f"[✓] Offline GeoIP database loaded from {path}")
+        except (OSError, ValueError, ImportError) as e:
+            logger.error(f"[!] Offline GeoIP database unavailable, using ipinfo.io: {e}")
+    return _index
+
+
+def get_offline_index():
+    return _index
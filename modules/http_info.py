@@ -1,40 +1,256 @@
 # modules/http_info.py
 
 try:
+    import time
+    import threading
+    import contextvars
     import requests
-    from urllib.parse import urlparse
+    from concurrent.futures import ThreadPoolExecutor
+    from urllib.parse import urlparse, urljoin
+    from utils.http_client import get_http_client
+    from utils.deadline import budget
+    from utils.metrics import count as count_metric
 except ImportError as e:
     from utils.logger import logger
     logger.error(f"Missing dependency: {e}. Please install required modules.")
     raise
 from utils.logger import logger
 
-def fetch_http_info(url: str) -> dict:
+# Bodies are only read for fingerprinting; anything past the cap is never downloaded
+DEFAULT_MAX_BYTES = 256 * 1024
+DEFAULT_MAX_REDIRECTS = 5
+DEFAULT_PROBE_TIMEOUT = 10
+DEFAULT_PROBE_WORKERS = 8
+CHUNK_SIZE = 16 * 1024
+REDIRECT_CODES = frozenset({301, 302, 303, 307, 308})
+# HEAD answers that usually mean "this server does not do HEAD properly"; retried as GET
+HEAD_FALLBACK_CODES = frozenset({400, 403, 405, 501})
+# Ports that only make sense with one scheme when fanning out over alternate ports
+SCHEME_PORTS = {80: "http", 443: "https"}
+
+
+def _read_capped(response: requests.Response, max_bytes: int, deadline: float) -> tuple:
+    """Reads at most max_bytes of a streamed body, stopping early at the deadline."""
+    chunks = []
+    size = 0
+    truncated = False
+    for chunk in response.iter_content(CHUNK_SIZE):
+        chunks.append(chunk)
+        size += len(chunk)
+        if size > max_bytes or time.monotonic() > deadline:
+            # A slow endless stream would otherwise trickle in until every read times out
+            truncated = True
+            break
+    # What was actually downloaded, not the advertised Content-Length
+    count_metric("bytes", size)
+    return b"".join(chunks)[:max_bytes], truncated
+
+
+def fetch_bounded(url: str, method: str = "GET", max_bytes: int = DEFAULT_MAX_BYTES,
+                  max_redirects: int = DEFAULT_MAX_REDIRECTS, timeout: float = DEFAULT_PROBE_TIMEOUT) -> tuple:
+    """
+    Sends a request and follows redirects by hand, so every hop is recorded
+    and the hop limit is ours, and reads at most max_bytes of the final body.
+
+    Args:
+        url (str): Absolute URL.
+        method (str): "GET" or "HEAD".
+        max_bytes (int): Body bytes kept; the rest is never read.
+        max_redirects (int): Redirects followed before giving up.
+        timeout (float): Connect/read timeout and overall body read deadline.
+
+    Returns:
+        tuple: (response, redirects, truncated). The response is closed and
+        its content is the capped body; redirects lists {status_code, url} hops.
+
+    Raises:
+        requests.RequestException: Network errors and too many redirects.
+    """
+    client = get_http_client()
+    redirects = []
+    for _ in range(max_redirects + 1):
+        response = client.request(method, url, timeout=timeout, allow_redirects=False, stream=True)
+        location = response.headers.get("Location")
+        if response.status_code in REDIRECT_CODES and location:
+            response.close()
+            redirects.append({"status_code": response.status_code, "url": url})
+            url = urljoin(url, location)
+            continue
+        truncated = False
+        body = b""
+        if method != "HEAD":
+            body, truncated = _read_capped(response, max_bytes, time.monotonic() + timeout)
+        # Closing drops a partially read connection instead of draining the rest of the body
+        response.close()
+        response._content = body
+        response._content_consumed = True
+        return response, redirects, truncated
+    raise requests.TooManyRedirects(f"Exceeded {max_redirects} redirects", response=response)
+
+
+class SharedResponse:
+    """
+    Fetches a URL at most once and hands the same response (or exception) to
+    every caller, so the HTTP info and tech stack modules share one request.
+    The body is streamed and capped at max_bytes.
+    """
+
+    def __init__(self, url: str, max_bytes: int = DEFAULT_MAX_BYTES,
+                 max_redirects: int = DEFAULT_MAX_REDIRECTS, timeout: float = DEFAULT_PROBE_TIMEOUT):
+        self.url = url
+        self.max_bytes = max_bytes
+        self.max_redirects = max_redirects
+        self.timeout = timeout
+        self.redirects = []
+        self.truncated = False
+        self._lock = threading.Lock()
+        self._done = False
+        self._response = None
+        self._error = None
+
+    @property
+    def fetched(self) -> bool:
+        return self._done
+
+    def get(self) -> requests.Response:
+        with self._lock:
+            if not self._done:
+                try:
+                    self._response, self.redirects, self.truncated = fetch_bounded(
+                        self.url, "GET", self.max_bytes, self.max_redirects, budget(self.timeout))
+                except requests.RequestException as e:
+                    self._error = e
+                self._done = True
+        if self._error is not None:
+            raise self._error
+        return self._response
+
+
+def _summary(response: requests.Response, redirects: list, method: str, truncated: bool = False) -> dict:
+    info = {
+        "status_code": response.status_code,
+        "headers": dict(response.headers),
+        "final_url": response.url,
+        "redirects": redirects,
+        "method": method,
+    }
+    if method != "HEAD":
+        info["body_bytes"] = len(response.content)
+        info["truncated"] = truncated
+    return info
+
+
+def probe_url(url: str, max_bytes: int = DEFAULT_MAX_BYTES, max_redirects: int = DEFAULT_MAX_REDIRECTS,
+              timeout: float = DEFAULT_PROBE_TIMEOUT) -> dict:
+    """
+    Status, headers and redirect chain of a URL for the cost of a HEAD
+    request; servers that reject or mishandle HEAD get a capped, streamed GET.
+
+    Returns:
+        dict: status_code, headers, final_url, redirects and method (plus
+        body_bytes and truncated after a GET fallback).
+
+    Raises:
+        requests.RequestException: The host could not be reached.
+    """
+    try:
+        response, redirects, _ = fetch_bounded(url, "HEAD", max_bytes, max_redirects, timeout)
+        if response.status_code not in HEAD_FALLBACK_CODES:
+            return _summary(response, redirects, "HEAD")
+    except (requests.ConnectionError, requests.Timeout, requests.TooManyRedirects):
+        # A GET would fail the same way
+        raise
+    except requests.RequestException as e:
+        logger.debug(f"HEAD {url} failed ({e}); retrying with GET")
+    response, redirects, truncated = fetch_bounded(url, "GET", max_bytes, max_redirects, timeout)
+    return _summary(response, redirects, "GET", truncated)
+
+
+def probe_urls(host: str, ports=None) -> list:
+    """
+    http:// and https:// URLs of host on its default ports and on each
+    alternate port (80 and 443 only with their own scheme).
+    """
+    if ":" in host:
+        host = f"[{host}]"
+    urls = [f"https://{host}", f"http://{host}"]
+    for port in ports or []:
+        port = int(port)
+        for scheme in (SCHEME_PORTS.get(port),) if port in SCHEME_PORTS else ("https", "http"):
+            url = f"{scheme}://{host}" if SCHEME_PORTS.get(port) == scheme else f"{scheme}://{host}:{port}"
+            if url not in urls:
+                urls.append(url)
+    return urls
+
+
+def probe_many(urls: list, workers: int = DEFAULT_PROBE_WORKERS, **options) -> dict:
+    """
+    Probes URLs concurrently (see probe_url for options).
+
+    Returns:
+        dict: URL -> probe result or {"error": ...}, in the order given.
+    """
+    def probe(url):
+        try:
+            return probe_url(url, **options)
+        except requests.RequestException as e:
+            return {"error": f"HTTP request failed: {str(e)}"}
+
+    if not urls:
+        return {}
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(urls)))) as executor:
+        # Each probe runs in a copy of the caller's context: deadline and metrics counters
+        futures = [executor.submit(contextvars.copy_context().run, probe, url) for url in urls]
+        return {url: future.result() for url, future in zip(urls, futures)}
+
+
+def fetch_http_info(url: str, page: SharedResponse | None = None, ports=None,
+                    max_bytes: int = DEFAULT_MAX_BYTES, max_redirects: int = DEFAULT_MAX_REDIRECTS,
+                    timeout: float = DEFAULT_PROBE_TIMEOUT, workers: int = DEFAULT_PROBE_WORKERS,
+                    share_page: bool = False) -> dict:
     """
     Fetches HTTP status and headers for the given URL.
 
     Parameters:
         url (str): The target URL.
+        page (SharedResponse): Optional shared fetch; reused when another
+            module (tech) already downloaded the page.
+        share_page (bool): Read the URL's status and headers from page's
+            capped GET instead of a HEAD, because tech will fetch it anyway.
+        ports (list): Alternate ports; when given, http:// and https:// on the
+            default and these ports are probed concurrently as well.
+        max_bytes (int): Body read cap when a GET is needed.
+        max_redirects (int): Redirect hop limit.
+        timeout (float): Per-request timeout in seconds.
+        workers (int): Concurrent probes per host.
 
     Returns:
-        dict: Dictionary containing status code, headers, final redirected URL, or error.
+        dict: Dictionary containing status code, headers, final redirected URL,
+        redirect chain and the other probed URLs (under "probes"), or error.
     """
-    headers = {
-        "User-Agent": "ReconTool/1.0"
-    }
-
     # Normalize URL: add scheme if missing
     parsed = urlparse(url)
     if not parsed.scheme:
         url = f"https://{url}"
+        parsed = urlparse(url)
+    options = {"max_bytes": max_bytes, "max_redirects": max_redirects, "timeout": budget(timeout)}
 
     try:
-        response = requests.get(url, headers=headers, timeout=10, allow_redirects=True)
-        return {
-            "status_code": response.status_code,
-            "headers": dict(response.headers),
-            "final_url": response.url
-        }
+        if page is not None and (share_page or page.fetched):
+            response = page.get()
+            info = _summary(response, page.redirects, "GET", page.truncated)
+            probes = probe_many([u for u in probe_urls(parsed.hostname, ports) if u != url], workers, **options) \
+                if ports else {}
+        elif ports:
+            probes = probe_many([url] + [u for u in probe_urls(parsed.hostname, ports) if u != url], workers, **options)
+            info = probes.pop(url)
+            if "error" in info:
+                logger.error(f"HTTP request failed for {url}: {info['error']}")
+        else:
+            info, probes = probe_url(url, **options), {}
+        if probes:
+            info["probes"] = probes
+        return info
     except requests.RequestException as e:
         logger.error(f"HTTP request failed for {url}: {e}")
         return {"error": f"HTTP request failed: {str(e)}"}
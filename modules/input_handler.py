@@ -1,7 +1,6 @@
 # modules/input_handler.py
 
 try:
-    import socket
     from urllib.parse import urlparse
     import validators
 except ImportError as e:
@@ -27,7 +26,8 @@ def detect_input_type(user_input: str) -> tuple[str, str, str | None]:
     # URL detection
     if validators.url(cleaned_input):
         parsed = urlparse(cleaned_input)
-        domain = parsed.netloc or parsed.path
+        # hostname drops any :port so URLs with explicit ports still resolve
+        domain = parsed.hostname or parsed.netloc or parsed.path
         input_type = "url"
     
     # Domain detection
@@ -44,11 +44,14 @@ def detect_input_type(user_input: str) -> tuple[str, str, str | None]:
     else:
         return ("unknown", cleaned_input, None)
 
-    # Resolve domain to IP
-    try:
-        resolved_ip = domain if input_type == "ip" else socket.getaddrinfo(domain, None)[0][4][0]
-    except (socket.gaierror, IndexError) as e:
-        logger.error(f"Failed to resolve IP for {domain}: {e}")
-        resolved_ip = None
+    # Resolve domain to IP once per process; the DNS module reuses the answer
+    if input_type == "ip":
+        resolved_ip = domain
+    else:
+        from modules.resolution import get_host_resolver
+        addresses = get_host_resolver().addresses(domain)
+        resolved_ip = addresses[0] if addresses else None
+        if resolved_ip is None:
+            logger.error(f"Failed to resolve IP for {domain}")
 
     return (input_type, domain, resolved_ip)
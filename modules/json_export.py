@@ -1,29 +1,268 @@
 # modules/json_export.py
 
 try:
-    import json
+    import io
     import os
+    import csv
+    import gzip
+    import json
 except ImportError as e:
     from utils.logger import logger
     logger.error(f"Missing dependency: {e}. Please install required modules.")
     raise
 from utils.logger import logger
 
-def export_json(data: dict, filename: str) -> None:
+# Flattened tables written by export_tables(); one row per port / DNS value
+PORT_COLUMNS = ["target", "ip", "protocol", "port", "state", "service", "product", "version"]
+DNS_COLUMNS = ["target", "ip", "type", "value"]
+TABLE_FORMATS = ("csv", "arrow")
+# Records between flushes of a compressed NDJSON stream
+COMPRESSED_FLUSH_EVERY = 64
+# Rows buffered per Arrow record batch
+ARROW_BATCH_ROWS = 10000
+
+
+def _load_orjson():
+    # orjson is optional: several times faster than json and always compact
+    try:
+        import orjson
+        return orjson
+    except ImportError:
+        return None
+
+
+_orjson = _load_orjson()
+
+
+def dumps(value, indent: int | None = None) -> str:
+    """
+    Serializes to JSON with orjson when it is installed and the standard
+    library otherwise. Non-JSON values (dates, sets) become strings.
+    """
+    if _orjson is not None and indent in (None, 2):
+        option = _orjson.OPT_NON_STR_KEYS | (_orjson.OPT_INDENT_2 if indent else 0)
+        try:
+            return _orjson.dumps(value, default=str, option=option).decode("utf-8")
+        except TypeError:
+            # e.g. integers beyond 64 bits; the standard library copes
+            pass
+    return json.dumps(value, indent=indent, ensure_ascii=False, default=str)
+
+
+def loads(text):
+    return _orjson.loads(text) if _orjson is not None else json.loads(text)
+
+
+def open_text(path: str, mode: str = "r"):
+    """
+    Opens a text file, compressing or decompressing transparently by
+    extension: .gz (gzip) and .zst (zstandard, optional dependency).
+    Appending works for both; each append adds a member/frame that readers
+    decode as one stream.
+
+    Args:
+        path (str): File path.
+        mode (str): "r", "w" or "a".
+
+    Returns:
+        Text file object.
+    """
+    if mode != "r":
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    # The csv module writes its own line endings
+    newline = "" if ".csv" in os.path.basename(path) else None
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8", newline=newline)
+    if path.endswith(".zst"):
+        try:
+            import zstandard  # optional: only needed for .zst files
+        except ImportError:
+            raise ImportError("zstandard is required for .zst files (pip install zstandard)")
+        if mode == "r":
+            return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(
+                open(path, "rb"), read_across_frames=True, closefd=True), encoding="utf-8", newline=newline)
+        return zstandard.open(path, mode + "t", encoding="utf-8", newline=newline)
+    return open(path, mode, encoding="utf-8", newline=newline)
+
+
+class NDJSONWriter:
+    """
+    Appends one JSON document per line, flushing after every record (every
+    COMPRESSED_FLUSH_EVERY records when compressed) so readers can follow
+    the file while it grows. Use as a context manager.
+    """
+
+    def __init__(self, path: str, append: bool = True):
+        self.path = path
+        self.count = 0
+        self._file = open_text(path, "a" if append else "w")
+        # Every flush ends a compressed block; batching them keeps the ratio
+        self._flush_every = COMPRESSED_FLUSH_EVERY if path.endswith((".gz", ".zst")) else 1
+
+    def write(self, record: dict) -> None:
+        self._file.write(dumps(record) + "\n")
+        self.count += 1
+        if self.count % self._flush_every == 0:
+            self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_ndjson(path: str):
+    """Yields one record per line of a (possibly compressed) NDJSON file."""
+    with open_text(path, "r") as f:
+        for line in f:
+            if line.strip():
+                yield loads(line)
+
+
+def export_ndjson(records, filename: str, append: bool = False) -> int:
+    """
+    Streams records to an NDJSON file (.gz/.zst compressed by extension).
+
+    Returns:
+        int: Number of records written.
+    """
+    with NDJSONWriter(filename, append=append) as writer:
+        for record in records:
+            writer.write(record)
+    logger.info(f"[✓] {writer.count} NDJSON records saved to {filename}")
+    return writer.count
+
+
+# --- Columnar tables -----------------------------------------------------------
+
+def port_rows(record: dict):
+    """One row per port in a record's ports result (see PORT_COLUMNS)."""
+    ports = (record.get("results") or {}).get("ports") or {}
+    for proto, entries in (ports.get("open_ports") or {}).items():
+        for port, info in (entries or {}).items():
+            info = info or {}
+            yield [record.get("target"), record.get("ip"), proto, int(port), info.get("state"),
+                   info.get("service"), info.get("product"), info.get("version")]
+
+
+def dns_rows(record: dict):
+    """One row per DNS record value (see DNS_COLUMNS)."""
+    dns = (record.get("results") or {}).get("dns") or {}
+    for rtype, values in dns.items():
+        if isinstance(values, list):
+            for value in values:
+                yield [record.get("target"), record.get("ip"), rtype, value]
+
+
+TABLES = {
+    "ports": (PORT_COLUMNS, port_rows),
+    "dns": (DNS_COLUMNS, dns_rows),
+}
+
+
+class _CSVTable:
+    def __init__(self, path: str, columns: list):
+        self._file = open_text(path, "w")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(columns)
+
+    def write(self, row: list) -> None:
+        self._writer.writerow(row)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class _ArrowTable:
+    """Arrow IPC file written in record batches, so memory stays bounded."""
+
+    def __init__(self, path: str, columns: list):
+        try:
+            import pyarrow  # optional: only needed for Arrow tables
+            import pyarrow.ipc
+        except ImportError:
+            raise ImportError("pyarrow is required for Arrow tables (pip install pyarrow)")
+        self._pa = pyarrow
+        types = {"port": pyarrow.int32()}
+        self._schema = pyarrow.schema([(name, types.get(name, pyarrow.string())) for name in columns])
+        self._writer = pyarrow.ipc.new_file(path, self._schema)
+        self._rows = []
+
+    def write(self, row: list) -> None:
+        self._rows.append(row)
+        if len(self._rows) >= ARROW_BATCH_ROWS:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._rows:
+            columns = list(zip(*self._rows))
+            arrays = [self._pa.array([None if v is None else (v if field.name == "port" else str(v)) for v in values],
+                                     type=field.type)
+                      for field, values in zip(self._schema, columns)]
+            self._writer.write_batch(self._pa.record_batch(arrays, schema=self._schema))
+            self._rows = []
+
+    def close(self) -> None:
+        self._flush()
+        self._writer.close()
+
+
+def export_tables(records, directory: str, fmt: str = "csv", compress: str | None = None) -> dict:
+    """
+    Flattens the high-cardinality sections of many records (ports, DNS)
+    into one table each, streaming: records are read once and never held.
+
+    Args:
+        records (iterable): Batch records, e.g. iter_ndjson(path).
+        directory (str): Output directory (ports.csv, dns.csv or .arrow).
+        fmt (str): "csv" or "arrow" (Arrow IPC file, needs pyarrow).
+        compress (str): Optional "gz" or "zst" suffix for CSV tables.
+
+    Returns:
+        dict: Table name -> rows written.
+    """
+    if fmt not in TABLE_FORMATS:
+        raise ValueError(f"unknown table format {fmt!r}; choose from {', '.join(TABLE_FORMATS)}")
+    os.makedirs(directory, exist_ok=True)
+    tables = {}
+    counts = {name: 0 for name in TABLES}
+    try:
+        for name, (columns, _) in TABLES.items():
+            if fmt == "arrow":
+                tables[name] = _ArrowTable(os.path.join(directory, f"{name}.arrow"), columns)
+            else:
+                suffix = f".{compress}" if compress else ""
+                tables[name] = _CSVTable(os.path.join(directory, f"{name}.csv{suffix}"), columns)
+        for record in records:
+            for name, (_, rows) in TABLES.items():
+                for row in rows(record):
+                    tables[name].write(row)
+                    counts[name] += 1
+    finally:
+        for table in tables.values():
+            table.close()
+    logger.info(f"[✓] Tables saved to {directory}: "
+                + ", ".join(f"{name} {count} rows" for name, count in counts.items()))
+    return counts
+
+
+def export_json(data: dict, filename: str, indent: int | None = 4) -> None:
     """
     Exports the given data to a JSON file.
 
     Parameters:
         data (dict): Data to write to JSON.
-        filename (str): Output file path.
+        filename (str): Output file path (.gz/.zst compress it).
+        indent (int): Pretty-print indent; None writes one compact line.
     """
     try:
-        directory = os.path.dirname(os.path.abspath(filename))
-        os.makedirs(directory, exist_ok=True)
-
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
+        with open_text(filename, "w") as f:
+            f.write(dumps(data, indent=indent))
 
-        logger.info(f"[\u2713] JSON report saved to {filename}")
+        logger.info(f"[✓] JSON report saved to {filename}")
     except Exception as e:
         logger.error(f"[!] Failed to export JSON: {e}")
@@ -0,0 +1,216 @@
+# modules/pipeline.py
+
+try:
+    import threading
+    import contextvars
+    from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+    from urllib.parse import urlparse
+    from modules.registry import get_plugins
+    from utils.cache import get_cache
+    from utils.metrics import get_metrics
+    from utils.deadline import current_deadline
+except ImportError as e:
+    from utils.logger import logger
+    logger.error(f"Missing dependency: {e}. Please install required modules.")
+    raise
+from utils.logger import logger
+
+DEFAULT_WORKERS = 6
+
+
+def normalize_url(url):
+    parsed = urlparse(url)
+    return url if parsed.scheme else "https://" + url
+
+
+def scan_options_from_args(args) -> dict:
+    """
+    Collects the port scan CLI flags into scan_ports() keyword arguments and
+    the HTTP probe flags into fetch_http_info() ones (under "http").
+    """
+    selected = select_modules(args)
+    return {
+        "mode": args.scan_mode,
+        "ports": args.ports,
+        "concurrency": args.scan_concurrency,
+        "timeout": args.scan_timeout,
+        "http": {
+            "ports": [int(p) for p in args.http_ports.split(",") if p.strip()] if args.http_ports else None,
+            "max_bytes": args.http_max_bytes,
+            "max_redirects": args.http_max_redirects,
+            # tech downloads the page anyway; http reads its headers from that one request
+            "share_page": bool(selected.get("http") and selected.get("tech")),
+        },
+    }
+
+
+def select_modules(args) -> dict:
+    """
+    Maps CLI flags to the modules that should run.
+
+    Args:
+        args: Parsed argparse namespace from recon.py.
+
+    Returns:
+        dict: Module key -> enabled flag, in report order.
+    """
+    extra = set(getattr(args, "modules", None) or [])
+    selected = {
+        "whois": not args.skip_whois and (args.all or not any([
+            args.scan_ports, args.dns, args.http_info, args.tech_stack, args.geoip, extra
+        ])),
+        "dns": args.all or args.dns,
+        "ports": args.all or args.scan_ports,
+        "http": args.all or args.http_info,
+        "tech": args.all or args.tech_stack,
+        "geoip": args.all or args.geoip,
+    }
+    for key in get_plugins():
+        if key not in selected:
+            selected[key] = key in extra
+    return selected
+
+
+class TargetContext:
+    """
+    Everything a scanner plugin needs to know about one target. The shared
+    HTTP fetch is created on first access so runs without HTTP modules never
+    import the HTTP stack.
+    """
+
+    def __init__(self, target: str, cleaned_input: str, ip_address: str | None,
+                 scan_options: dict | None = None, cache=None):
+        self.target = target
+        self.cleaned_input = cleaned_input
+        self.ip_address = ip_address
+        self.url = normalize_url(target)
+        self.scan_options = scan_options or {}
+        self.cache = cache or get_cache()
+        self._page = None
+        self._lock = threading.Lock()
+
+    @property
+    def http_options(self) -> dict:
+        """fetch_http_info() keyword arguments from scan_options["http"]."""
+        return {k: v for k, v in (self.scan_options.get("http") or {}).items() if v is not None}
+
+    @property
+    def port_options(self) -> dict:
+        """scan_ports() keyword arguments."""
+        return {k: v for k, v in self.scan_options.items() if k != "http"}
+
+    @property
+    def page(self):
+        with self._lock:
+            if self._page is None:
+                from modules.http_info import SharedResponse
+                options = self.http_options
+                self._page = SharedResponse(self.url, **{k: options[k] for k in ("max_bytes", "max_redirects")
+                                                         if options.get(k) is not None})
+        return self._page
+
+
+def build_task_map(target: str, cleaned_input: str, ip_address: str | None,
+                   scan_options: dict | None = None) -> dict:
+    """
+    Builds the module key -> (description, callable) map for one target from
+    the plugin registry. Nothing is imported until a task is actually run.
+
+    Args:
+        target (str): The raw target as supplied by the user.
+        cleaned_input (str): Normalized domain/IP from detect_input_type.
+        ip_address (str): Resolved IP address, or None.
+        scan_options (dict): Keyword arguments for port_scan.scan_ports(), with
+            fetch_http_info() options under "http".
+
+    Returns:
+        dict: Task map consumed by run_modules.
+    """
+    ctx = TargetContext(target, cleaned_input, ip_address, scan_options)
+    metrics = get_metrics()
+    return {
+        key: (plugin.description, metrics.instrument(cleaned_input, key, lambda plugin=plugin: plugin.run(ctx)))
+        for key, plugin in get_plugins().items()
+    }
+
+
+def run_modules(task_map: dict, selected: list, workers: int = DEFAULT_WORKERS,
+                on_start=None, on_done=None, journal=None, journal_key: str | None = None) -> dict:
+    """
+    Runs the selected task_map entries concurrently on a thread pool.
+
+    Args:
+        task_map (dict): Mapping of module key -> (description, callable).
+        selected (list): Module keys to run, in the order results should appear.
+        workers (int): Maximum number of modules running at the same time.
+        on_start (callable): Optional hook called as on_start(key, description) before submission.
+        on_done (callable): Optional hook called as on_done(key, result, error) when a module finishes.
+        journal (utils.journal.Journal): Optional; modules it already holds for
+            journal_key are not run again and new results are appended to it.
+        journal_key (str): Target the journal entries belong to.
+
+    Returns:
+        dict: Results of the modules that completed, ordered like `selected`.
+        Modules still running when the current deadline (utils.deadline)
+        expires are abandoned and reported as {"error": ..., "timed_out": True}.
+    """
+    finished = {}
+    if journal is not None and journal.enabled:
+        finished.update((key, res) for key, res in journal.completed(journal_key).items() if key in selected)
+    remaining = [key for key in selected if key not in finished]
+    if not remaining:
+        return {key: finished[key] for key in selected if key in finished}
+
+    deadline = current_deadline()
+    executor = ThreadPoolExecutor(max_workers=max(1, min(workers, len(remaining))))
+    futures = {}
+    collected = set()
+
+    def collect(future):
+        key = futures[future]
+        collected.add(future)
+        try:
+            res = future.result()
+            finished[key] = res
+            error = None
+            if journal is not None:
+                journal.record_module(journal_key, key, res)
+        except Exception as e:
+            if not on_done:
+                logger.error(f"[!] {key} module failed: {e}")
+            error = e
+            res = None
+        if on_done:
+            on_done(key, res, error)
+
+    try:
+        for key in remaining:
+            task_desc, task_func = task_map[key]
+            if on_start:
+                on_start(key, task_desc)
+            # Each module sees the caller's deadline scope
+            futures[executor.submit(contextvars.copy_context().run, task_func)] = key
+
+        try:
+            for future in as_completed(futures, timeout=deadline.remaining()):
+                collect(future)
+        except FuturesTimeout:
+            for future, key in futures.items():
+                if future in collected:
+                    continue
+                if future.done():
+                    # Finished just before the deadline but not yielded by as_completed yet
+                    collect(future)
+                    continue
+                # Queued modules never start; running ones finish in the background and are ignored
+                future.cancel()
+                res = finished[key] = {"error": f"Deadline exceeded before {key} finished", "timed_out": True}
+                logger.warning(f"[!] {key} abandoned: deadline exceeded")
+                if on_done:
+                    on_done(key, res, None)
+    finally:
+        # Do not wait for abandoned modules
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    # Keep the same ordering the sequential loop used to produce
+    return {key: finished[key] for key in selected if key in finished}
@@ -1,14 +1,114 @@
 # modules/port_scan.py
 
 try:
-    import nmap
+    import os
+    import time
+    import errno
+    import queue
+    import socket
+    import asyncio
+    import ipaddress
+    import threading
+    import subprocess
+    import xml.etree.ElementTree as ET
+    from concurrent.futures import Future, TimeoutError as FuturesTimeout
+    from utils.deadline import current_deadline, budget
 except ImportError as e:
     from utils.logger import logger
     logger.error(f"Missing dependency: {e}. Please install required modules.")
     raise
 from utils.logger import logger
 
-def run_nmap_scan(ip_address: str, ports: str = "1-1000") -> dict:
+
+def _load_nmap():
+    # python-nmap is only needed by the nmap engines; import it on first use
+    try:
+        import nmap
+        return nmap
+    except ImportError:
+        return None
+
+
+def _descriptor_cap(wanted: int) -> int:
+    # Every probe holds a socket; leave half the descriptor limit to everything else
+    try:
+        import resource
+        soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    except (ImportError, ValueError, OSError):
+        return wanted
+    if soft == resource.RLIM_INFINITY:
+        return wanted
+    return max(16, min(wanted, soft // 2))
+
+
+DEFAULT_PORTS = "1-1000"
+DEFAULT_CONCURRENCY = _descriptor_cap(1000)
+DEFAULT_TIMEOUT = 1.0
+DEFAULT_SHARDS = 4
+DEFAULT_BATCH_ARGS = "-sS -T4 -sV"
+# Options of the single-host full scan, reused when batch mode groups those scans
+FULL_SCAN_ARGS = "-sS -sC -T4 -O -A"
+# Batch mode: longest a host waits for others to join its nmap run
+DEFAULT_LINGER = 0.5
+# Connect scan: pause before retrying a probe that found no free file descriptor, and how often
+EXHAUSTED_DELAY = 0.05
+EXHAUSTED_RETRIES = 100
+
+
+def _collect_host(host_data, results: dict) -> None:
+    """
+    Copies ports, services, OS matches and traceroute hops for one host out of
+    an nmap.PortScanner entry into the results dict (merging into any ports
+    already present).
+    """
+    # Collect open ports and services
+    for proto in host_data.all_protocols():
+        results["open_ports"].setdefault(proto, {})
+        ports_list = host_data[proto].keys()
+        for port in sorted(ports_list):
+            port_data = host_data[proto][port]
+            service = port_data.get('name', 'unknown')
+            state = port_data.get('state', 'unknown')
+            product = port_data.get('product', '')
+            version = port_data.get('version', '')
+            results["open_ports"][proto][port] = {
+                "state": state,
+                "service": service,
+                "product": product,
+                "version": version
+            }
+
+    # OS detection
+    if 'osmatch' in host_data:
+        os_matches = host_data['osmatch']
+        results["os_detection"] = [
+            {
+                "name": match.get('name', ''),
+                "accuracy": match.get('accuracy', ''),
+                "osclass": match.get('osclass', [])
+            }
+            for match in os_matches
+        ]
+
+    # Traceroute data
+    if 'traceroute' in host_data:
+        trace = host_data['traceroute']
+        hops = trace.get('hops', [])
+        for hop in hops:
+            results["traceroute"].append({
+                "ttl": hop.get('ttl'),
+                "ip": hop.get('ipaddr'),
+                "rtt": hop.get('rtt')
+            })
+
+
+def _host_timeout_args() -> str:
+    # nmap gives up on a host after --host-timeout, so a scan ends with the target's budget
+    remaining = current_deadline().remaining()
+    return "" if remaining is None else f" --host-timeout {max(1, int(remaining))}s"
+
+
+def run_nmap_scan(ip_address: str, ports: str = DEFAULT_PORTS) -> dict:
     """
     Runs a comprehensive Nmap scan with advanced options:
     -sS (SYN scan), -sC (default scripts), -T4 (aggressive timing),
@@ -28,6 +128,11 @@ def run_nmap_scan(ip_address: str, ports: str = "1-1000") -> dict:
         "error": None
     }
 
+    nmap = _load_nmap()
+    if nmap is None:
+        logger.error("python-nmap is not installed. Use --scan-mode connect or pip install python-nmap.")
+        return {"error": "python-nmap is not installed. Use --scan-mode connect or pip install python-nmap."}
+
     try:
         scanner = nmap.PortScanner()
     except nmap.PortScannerError as e:
@@ -39,55 +144,579 @@ def run_nmap_scan(ip_address: str, ports: str = "1-1000") -> dict:
 
     try:
         # Build full command string
-        scan_args = f"-sS -sC -T4 -O -A -p {ports}"
+        scan_args = f"{FULL_SCAN_ARGS} -p {ports}" + _host_timeout_args()
         scanner.scan(ip_address, arguments=scan_args)
 
         if ip_address not in scanner.all_hosts():
             logger.error("No response from target or host is down.")
             return {"error": "No response from target or host is down."}
 
-        # Collect open ports and services
-        for proto in scanner[ip_address].all_protocols():
-            results["open_ports"][proto] = {}
-            ports_list = scanner[ip_address][proto].keys()
-            for port in sorted(ports_list):
-                port_data = scanner[ip_address][proto][port]
-                service = port_data.get('name', 'unknown')
-                state = port_data.get('state', 'unknown')
-                product = port_data.get('product', '')
-                version = port_data.get('version', '')
-                results["open_ports"][proto][port] = {
-                    "state": state,
-                    "service": service,
-                    "product": product,
-                    "version": version
-                }
+        _collect_host(scanner[ip_address], results)
 
-        # OS detection
-        if 'osmatch' in scanner[ip_address]:
-            os_matches = scanner[ip_address]['osmatch']
-            results["os_detection"] = [
-                {
-                    "name": match.get('name', ''),
-                    "accuracy": match.get('accuracy', ''),
-                    "osclass": match.get('osclass', [])
-                }
-                for match in os_matches
-            ]
-
-        # Traceroute data
-        if 'traceroute' in scanner[ip_address]:
-            trace = scanner[ip_address]['traceroute']
-            hops = trace.get('hops', [])
-            for hop in hops:
-                results["traceroute"].append({
-                    "ttl": hop.get('ttl'),
-                    "ip": hop.get('ipaddr'),
-                    "rtt": hop.get('rtt')
-                })
+    except Exception as e:
+        logger.error(f"Port scan failed: {str(e)}")
+        results["error"] = f"Port scan failed: {str(e)}"
+
+    return results
+
+
+
+def run_tiered_scan(ip_address: str, ports: str = DEFAULT_PORTS) -> dict:
+    """
+    Two-phase Nmap scan: a lightweight SYN sweep finds open ports first, then
+    version detection, default scripts, OS detection and traceroute run only
+    against the ports that answered. On mostly-closed hosts this skips the
+    expensive probes for every closed port.
+
+    Args:
+        ip_address (str): Target IP address.
+        ports (str): Port range for the discovery sweep (default is 1-1000).
+
+    Returns:
+        dict: Scan results in the same shape as run_nmap_scan().
+    """
+    results = {
+        "open_ports": {},
+        "os_detection": {},
+        "traceroute": [],
+        "error": None
+    }
+
+    nmap = _load_nmap()
+    if nmap is None:
+        logger.error("python-nmap is not installed. Use --scan-mode connect or pip install python-nmap.")
+        return {"error": "python-nmap is not installed. Use --scan-mode connect or pip install python-nmap."}
+
+    try:
+        scanner = nmap.PortScanner()
+    except nmap.PortScannerError as e:
+        logger.error(f"Nmap not found or error initializing scanner: {str(e)}")
+        return {"error": f"Nmap not found or error initializing scanner: {str(e)}"}
+    except Exception as e:
+        logger.error(f"Unexpected error initializing Nmap: {str(e)}")
+        return {"error": f"Unexpected error initializing Nmap: {str(e)}"}
+
+    try:
+        # Phase 1: discovery only, no service/OS/script probes
+        scanner.scan(ip_address, arguments=f"-sS -T4 -n --open -p {ports}" + _host_timeout_args())
+        if ip_address not in scanner.all_hosts():
+            logger.error("No response from target or host is down.")
+            return {"error": "No response from target or host is down."}
+
+        open_tcp = sorted(
+            port for port, data in scanner[ip_address].get('tcp', {}).items()
+            if data.get('state') == 'open'
+        )
+        if not open_tcp:
+            return results
+
+        # Phase 2: detailed detection restricted to the open ports
+        port_list = ",".join(str(port) for port in open_tcp)
+        scanner.scan(ip_address, arguments=f"-sS -sV -sC -O --traceroute -T4 -p {port_list}" + _host_timeout_args())
+        if ip_address in scanner.all_hosts():
+            _collect_host(scanner[ip_address], results)
+        else:
+            # Host stopped answering between phases; keep what discovery found
+            results["open_ports"]["tcp"] = {
+                port: {"state": "open", "service": "unknown", "product": "", "version": ""}
+                for port in open_tcp
+            }
 
     except Exception as e:
         logger.error(f"Port scan failed: {str(e)}")
         results["error"] = f"Port scan failed: {str(e)}"
 
     return results
+
+def parse_ports(spec: str) -> list:
+    """
+    Expands a port specification such as "22,80,8000-8100" into a sorted list.
+
+    Args:
+        spec (str): Comma-separated ports and ranges (1-65535).
+
+    Returns:
+        list: Sorted unique port numbers.
+    """
+    ports = set()
+    for part in str(spec).split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            start, end = part.split("-", 1)
+            start, end = int(start or 1), int(end or 65535)
+        else:
+            start = end = int(part)
+        if not 1 <= start <= end <= 65535:
+            raise ValueError(f"Invalid port range: {part}")
+        ports.update(range(start, end + 1))
+    return sorted(ports)
+
+
+def _service_name(port: int) -> str:
+    try:
+        return socket.getservbyport(port, "tcp")
+    except OSError:
+        return "unknown"
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency window for connect scans: grows by one slot per
+    successful probe and halves when a batch of probes times out, so
+    congested paths or rate-limiting firewalls are backed off automatically.
+    Running out of file descriptors halves it too, past the minimum.
+    """
+
+    def __init__(self, maximum: int, minimum: int = 16):
+        self.maximum = max(1, maximum)
+        self.minimum = min(minimum, self.maximum)
+        self.window = self.maximum
+        self.in_flight = 0
+        self.timeouts = 0
+        self._condition = asyncio.Condition()
+        self._last_backoff = 0.0
+        self._last_exhausted = 0.0
+
+    async def acquire(self) -> None:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.window)
+            self.in_flight += 1
+
+    async def release(self, timed_out: bool, exhausted: bool = False) -> None:
+        async with self._condition:
+            self.in_flight -= 1
+            if exhausted:
+                # The descriptor limit is shared with the rest of the process, so the minimum does not apply
+                now = time.monotonic()
+                if now - self._last_exhausted > EXHAUSTED_DELAY:
+                    self.window = max(1, self.window // 2)
+                    self._last_exhausted = now
+            elif timed_out:
+                self.timeouts += 1
+                now = time.monotonic()
+                # Back off at most once per timeout interval, and only when
+                # timeouts dominate the window (closed-port filtering is normal)
+                if self.timeouts > self.window // 2 and now - self._last_backoff > 1.0:
+                    self.window = max(self.minimum, self.window // 2)
+                    self.timeouts = 0
+                    self._last_backoff = now
+            elif self.window < self.maximum:
+                self.window += 1
+            self._condition.notify(max(1, self.window - self.in_flight))
+
+
+async def _probe(host: str, port: int, timeout: float, limiter: AdaptiveLimiter):
+    for _ in range(EXHAUSTED_RETRIES):
+        await limiter.acquire()
+        timed_out = exhausted = False
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+            return host, port, True
+        except asyncio.TimeoutError:
+            timed_out = True
+            return host, port, False
+        except OSError as e:
+            # Out of descriptors says nothing about the port; shrink the window and probe again
+            if e.errno not in (errno.EMFILE, errno.ENFILE):
+                return host, port, False
+            exhausted = True
+        finally:
+            await limiter.release(timed_out, exhausted)
+        await asyncio.sleep(EXHAUSTED_DELAY)
+    raise OSError(errno.EMFILE, f"no free file descriptor to probe {host}:{port}")
+
+
+async def connect_scan_async(hosts: list, ports: str = DEFAULT_PORTS, concurrency: int = DEFAULT_CONCURRENCY,
+                             timeout: float = DEFAULT_TIMEOUT) -> dict:
+    """
+    TCP connect scan of many hosts at once using asyncio. Needs no root and
+    no nmap binary; it only reports which ports accept a connection.
+
+    Args:
+        hosts (list): Target IP addresses.
+        ports (str): Port specification (e.g. "1-65535" or "22,80,443").
+        concurrency (int): Maximum simultaneous connection attempts.
+        timeout (float): Per-connection timeout in seconds.
+
+    Returns:
+        dict: Host -> results in the same shape as run_nmap_scan(), with
+        "partial": True when the deadline stopped the scan early.
+    """
+    deadline = current_deadline()
+    timeout = budget(timeout)
+    port_list = parse_ports(ports)
+    limiter = AdaptiveLimiter(concurrency)
+    results = {
+        host: {"open_ports": {"tcp": {}}, "os_detection": {}, "traceroute": [], "error": None}
+        for host in hosts
+    }
+
+    # Feed probes through a bounded queue so 65535 x N hosts never exist as tasks at once
+    queue = asyncio.Queue(maxsize=concurrency * 2)
+
+    stopped = False
+
+    async def producer():
+        nonlocal stopped
+        for port in port_list:
+            if deadline.expired:
+                # Out of time: keep what was found instead of probing the rest
+                stopped = True
+                break
+            for host in hosts:
+                await queue.put((host, port))
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    async def worker():
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            host, port, is_open = await _probe(item[0], item[1], timeout, limiter)
+            if is_open:
+                results[host]["open_ports"]["tcp"][port] = {
+                    "state": "open",
+                    "service": _service_name(port),
+                    "product": "",
+                    "version": ""
+                }
+
+    await asyncio.gather(producer(), *(worker() for _ in range(concurrency)))
+
+    for host_result in results.values():
+        host_result["open_ports"]["tcp"] = dict(sorted(host_result["open_ports"]["tcp"].items()))
+        if stopped:
+            host_result["partial"] = True
+    if stopped:
+        logger.warning("[!] Connect scan stopped at the deadline; results are partial")
+    return results
+
+
+def run_connect_scan(ip_address: str, ports: str = DEFAULT_PORTS, concurrency: int = DEFAULT_CONCURRENCY,
+                     timeout: float = DEFAULT_TIMEOUT) -> dict:
+    """
+    Fast-path alternative to run_nmap_scan() for a single host.
+
+    Args:
+        ip_address (str): Target IP address.
+        ports (str): Port specification.
+        concurrency (int): Maximum simultaneous connection attempts.
+        timeout (float): Per-connection timeout in seconds.
+
+    Returns:
+        dict: Scan results with the same open_ports structure as run_nmap_scan().
+    """
+    try:
+        return asyncio.run(connect_scan_async([ip_address], ports, concurrency, timeout))[ip_address]
+    except Exception as e:
+        logger.error(f"Connect scan failed: {str(e)}")
+        return {"error": f"Connect scan failed: {str(e)}"}
+
+
+def scan_ports(ip_address: str, mode: str = "nmap", ports: str = DEFAULT_PORTS,
+               concurrency: int = DEFAULT_CONCURRENCY, timeout: float = DEFAULT_TIMEOUT) -> dict:
+    """
+    Dispatches to the configured port scanning engine.
+
+    Args:
+        ip_address (str): Target IP address.
+        mode (str): "nmap" for the full nmap scan, "tiered" for the two-phase
+            nmap scan, "connect" for the asyncio connect scan.
+        ports (str): Port specification.
+        concurrency (int): Connect scan concurrency.
+        timeout (float): Connect scan per-connection timeout.
+
+    Returns:
+        dict: Scan results.
+    """
+    if mode == "connect":
+        return run_connect_scan(ip_address, ports, concurrency, timeout)
+    if mode == "tiered":
+        return run_tiered_scan(ip_address, ports)
+    return get_nmap_batcher().scan(ip_address, ports)
+
+
+def expand_hosts(hosts) -> list:
+    """
+    Flattens a list of IPs, hostnames and CIDR blocks into individual targets.
+    Hostnames and anything ipaddress cannot parse are passed through for nmap.
+
+    Args:
+        hosts (iterable): IPs, CIDRs or hostnames.
+
+    Returns:
+        list: Unique targets in input order.
+    """
+    expanded = []
+    for host in hosts:
+        host = str(host).strip()
+        if not host:
+            continue
+        if "/" in host:
+            try:
+                network = ipaddress.ip_network(host, strict=False)
+                expanded.extend(str(ip) for ip in (network.hosts() if network.num_addresses > 2 else network))
+                continue
+            except ValueError:
+                pass
+        expanded.append(host)
+    return list(dict.fromkeys(expanded))
+
+
+def _host_from_xml(host_elem) -> tuple:
+    """Converts one <host> element of nmap XML output into (ip, results)."""
+    address = None
+    for addr in host_elem.findall("address"):
+        if addr.get("addrtype") in ("ipv4", "ipv6"):
+            address = addr.get("addr")
+            break
+
+    results = {
+        "open_ports": {},
+        "os_detection": {},
+        "traceroute": [],
+        "error": None
+    }
+
+    status = host_elem.find("status")
+    if status is not None and status.get("state") != "up":
+        results["error"] = "No response from target or host is down."
+        return address, results
+
+    for port in host_elem.findall("ports/port"):
+        state = port.find("state")
+        service = port.find("service")
+        service = service.attrib if service is not None else {}
+        proto = port.get("protocol", "tcp")
+        results["open_ports"].setdefault(proto, {})[int(port.get("portid"))] = {
+            "state": state.get("state", "unknown") if state is not None else "unknown",
+            "service": service.get("name", "unknown"),
+            "product": service.get("product", ""),
+            "version": service.get("version", "")
+        }
+
+    os_matches = host_elem.findall("os/osmatch")
+    if os_matches:
+        results["os_detection"] = [
+            {
+                "name": match.get("name", ""),
+                "accuracy": match.get("accuracy", ""),
+                "osclass": [dict(osclass.attrib) for osclass in match.findall("osclass")]
+            }
+            for match in os_matches
+        ]
+
+    for hop in host_elem.findall("trace/hop"):
+        results["traceroute"].append({
+            "ttl": hop.get("ttl"),
+            "ip": hop.get("ipaddr"),
+            "rtt": hop.get("rtt")
+        })
+
+    return address, results
+
+
+def _run_nmap_shard(hosts: list, arguments: str, nmap_path: str, out: queue.Queue) -> None:
+    """
+    Runs one nmap process and pushes each host onto `out` as soon as its XML
+    closes, then ("done", (hosts, error)) with error None unless nmap failed.
+    """
+    command = [nmap_path, *arguments.split(), "-oX", "-", *hosts]
+    try:
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except OSError as e:
+        logger.error(f"Nmap not found or error initializing scanner: {str(e)}")
+        out.put(("done", (hosts, f"Nmap not found or error initializing scanner: {str(e)}")))
+        return
+
+    # Drain stderr in the background so a chatty nmap cannot block on a full pipe
+    stderr_chunks = []
+    drain = threading.Thread(target=lambda: stderr_chunks.append(process.stderr.read()), daemon=True)
+    drain.start()
+
+    # Feed whatever bytes are available into a pull parser; a blocking
+    # iterparse() would wait for a full read buffer before emitting hosts
+    parser = ET.XMLPullParser(events=("end",))
+    error = None
+    try:
+        while True:
+            chunk = os.read(process.stdout.fileno(), 65536)
+            if not chunk:
+                break
+            parser.feed(chunk)
+            for _, elem in parser.read_events():
+                if elem.tag == "host":
+                    out.put(("host", _host_from_xml(elem)))
+                    elem.clear()
+    except ET.ParseError as e:
+        logger.error(f"Failed to parse nmap XML output: {e}")
+        error = f"Failed to parse nmap XML output: {e}"
+        # Nobody reads stdout any more; a blocked nmap would never exit
+        process.kill()
+    finally:
+        process.wait()
+        drain.join()
+        if process.returncode and error is None:
+            message = b"".join(stderr_chunks).decode(errors="replace").strip()
+            logger.error(f"Nmap exited with {process.returncode}: {message}")
+            error = f"Port scan failed: nmap exited with {process.returncode}: {message}"
+        out.put(("done", (hosts, error)))
+
+
+def iter_nmap_batch(hosts, ports: str = DEFAULT_PORTS, arguments: str = DEFAULT_BATCH_ARGS,
+                    shards: int = DEFAULT_SHARDS, nmap_path: str | None = None):
+    """
+    Scans many hosts/CIDRs with a few parallel nmap processes and yields
+    per-host results as soon as nmap finishes each host, instead of waiting
+    for the slowest one. Each process calibrates its timing once for its whole
+    shard rather than once per host.
+
+    Args:
+        hosts (iterable): IPs, hostnames or CIDR blocks.
+        ports (str): Port specification passed to -p.
+        arguments (str): Extra nmap arguments.
+        shards (int): Number of nmap processes to run in parallel.
+        nmap_path (str): nmap executable (default: $NMAP_PATH or "nmap").
+
+    Yields:
+        tuple: (ip, results) with results shaped like run_nmap_scan(); hosts
+        of a shard whose nmap failed come last as (host, {"error": ...}).
+    """
+    targets = expand_hosts(hosts)
+    if not targets:
+        return
+    nmap_path = nmap_path or os.getenv("NMAP_PATH", "nmap")
+    shards = max(1, min(shards, len(targets)))
+    out = queue.Queue()
+
+    workers = []
+    for index in range(shards):
+        shard = targets[index::shards]
+        worker = threading.Thread(target=_run_nmap_shard,
+                                  args=(shard, f"{arguments} -p {ports}", nmap_path, out), daemon=True)
+        worker.start()
+        workers.append(worker)
+
+    running = len(workers)
+    reported = set()
+    while running:
+        kind, payload = out.get()
+        if kind == "done":
+            running -= 1
+            shard, error = payload
+            if error:
+                # Report why nmap failed instead of letting its hosts look down
+                for host in shard:
+                    if host not in reported:
+                        yield host, {"error": error}
+        elif kind == "host" and payload[0]:
+            reported.add(payload[0])
+            yield payload
+
+
+def run_nmap_batch(hosts, ports: str = DEFAULT_PORTS, arguments: str = DEFAULT_BATCH_ARGS,
+                   shards: int = DEFAULT_SHARDS, nmap_path: str | None = None) -> dict:
+    """
+    Collects iter_nmap_batch() into a dict of ip -> results.
+    """
+    return dict(iter_nmap_batch(hosts, ports, arguments, shards, nmap_path))
+
+
+class NmapBatcher:
+    """
+    Groups the single-host full nmap scans that batch mode requests at about
+    the same time into one sharded iter_nmap_batch() run, so many targets
+    cost a few nmap processes instead of one each. A group starts when it
+    holds batch_size hosts or linger seconds after its first host arrived;
+    every caller still gets just its own host's result. Disabled instances
+    run run_nmap_scan() directly.
+    """
+
+    def __init__(self, batch_size: int = 64, linger: float = DEFAULT_LINGER, shards: int = DEFAULT_SHARDS,
+                 arguments: str = FULL_SCAN_ARGS, enabled: bool = True):
+        self.batch_size = max(1, batch_size)
+        self.linger = linger
+        self.shards = shards
+        self.arguments = arguments
+        self.enabled = enabled
+        self.stats = {"hosts": 0, "runs": 0}
+        self._groups = {}
+        self._lock = threading.Lock()
+
+    def scan(self, ip_address: str, ports: str = DEFAULT_PORTS) -> dict:
+        if not self.enabled:
+            return run_nmap_scan(ip_address, ports)
+        future = Future()
+        remaining = current_deadline().remaining()
+        with self._lock:
+            self.stats["hosts"] += 1
+            group = self._groups.get(ports)
+            if group is None:
+                group = self._groups[ports] = {"hosts": [], "remaining": remaining}
+                timer = threading.Timer(self.linger, self._flush, args=(ports, group))
+                timer.daemon = True
+                timer.start()
+            group["hosts"].append((ip_address, future))
+            # The group's nmap may run as long as its most patient member allows
+            if group["remaining"] is not None:
+                group["remaining"] = None if remaining is None else max(group["remaining"], remaining)
+            if len(group["hosts"]) >= self.batch_size:
+                self._start(ports, group)
+        try:
+            return future.result(timeout=budget(None))
+        except FuturesTimeout:
+            return {"error": "Port scan did not finish before the deadline"}
+
+    def _flush(self, ports: str, group: dict) -> None:
+        with self._lock:
+            if self._groups.get(ports) is group:
+                self._start(ports, group)
+
+    def _start(self, ports: str, group: dict) -> None:
+        # Called with the lock held
+        del self._groups[ports]
+        self.stats["runs"] += 1
+        threading.Thread(target=self._run, args=(ports, group), name="nmap-batch", daemon=True).start()
+
+    def _run(self, ports: str, group: dict) -> None:
+        waiting = {}
+        for ip_address, future in group["hosts"]:
+            waiting.setdefault(ip_address, []).append(future)
+        arguments = self.arguments
+        if group["remaining"] is not None:
+            arguments += f" --host-timeout {max(1, int(group['remaining']))}s"
+        # Hosts nmap scanned but did not report are down
+        error = "No response from target or host is down."
+        try:
+            for ip_address, results in iter_nmap_batch(list(waiting), ports, arguments, self.shards):
+                for future in waiting.pop(ip_address, ()):
+                    future.set_result(results)
+        except Exception as e:
+            logger.error(f"Batched port scan failed: {str(e)}")
+            error = f"Port scan failed: {str(e)}"
+        for futures in waiting.values():
+            for future in futures:
+                future.set_result({"error": error})
+
+
+_batcher = NmapBatcher(enabled=False)
+
+
+def configure_nmap_batching(batch_size: int = 64, linger: float = DEFAULT_LINGER, shards: int = DEFAULT_SHARDS,
+                            enabled: bool = True) -> NmapBatcher:
+    """Replaces the process-wide batcher scan_ports() sends full nmap scans through."""
+    global _batcher
+    _batcher = NmapBatcher(batch_size, linger, shards, enabled=enabled)
+    return _batcher
+
+
+def get_nmap_batcher() -> NmapBatcher:
+    return _batcher
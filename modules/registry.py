@@ -0,0 +1,147 @@
+# modules/registry.py
+
+try:
+    import importlib
+    from utils.cache import normalize_key
+    from utils.shared_work import get_shared_work
+except ImportError as e:
+    from utils.logger import logger
+    logger.error(f"Missing dependency: {e}. Please install required modules.")
+    raise
+from utils.logger import logger
+
+# Third-party scanners register under this entry point group, e.g. in pyproject.toml:
+#   [project.entry-points."rapid_recon.scanners"]
+#   shodan = "recon_shodan:run"
+# The callable receives a TargetContext (see modules.pipeline) and returns a dict.
+ENTRY_POINT_GROUP = "rapid_recon.scanners"
+
+
+class Plugin:
+    """
+    A scanner registered under a module key. `runner` is either a callable
+    taking a TargetContext or a "package.module:function" string that is only
+    imported the first time the plugin actually runs.
+    """
+
+    def __init__(self, key: str, description: str, runner, requires_ip: bool = False):
+        self.key = key
+        self.description = description
+        self.requires_ip = requires_ip
+        self._runner = runner
+
+    def resolve(self):
+        if isinstance(self._runner, str):
+            module_name, _, attr = self._runner.partition(":")
+            self._runner = getattr(importlib.import_module(module_name), attr)
+        return self._runner
+
+    def run(self, ctx):
+        if self.requires_ip and not ctx.ip_address:
+            return None
+        return self.resolve()(ctx)
+
+
+_plugins = {}
+_entry_points_loaded = False
+
+
+def register(key: str, description: str, runner, requires_ip: bool = False) -> Plugin:
+    """Adds (or replaces) a scanner in the registry; registration order is report order."""
+    plugin = Plugin(key, description, runner, requires_ip)
+    _plugins[key] = plugin
+    return plugin
+
+
+def load_entry_points() -> None:
+    """Registers third-party scanners advertised through ENTRY_POINT_GROUP (once)."""
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+    try:
+        from importlib.metadata import entry_points
+        discovered = entry_points(group=ENTRY_POINT_GROUP)
+    except Exception as e:
+        logger.error(f"[!] Could not read scanner entry points: {e}")
+        return
+    for ep in discovered:
+        if ep.name in _plugins:
+            logger.warning(f"Entry point scanner '{ep.name}' shadows a built-in module; ignored.")
+            continue
+        # Store the "module:attr" string so the plugin is imported only when selected
+        register(ep.name, f"🧩 Running {ep.name}", ep.value)
+
+
+def get_plugins() -> dict:
+    load_entry_points()
+    return _plugins
+
+
+# --- Built-in scanners -------------------------------------------------------
+# Each adapter imports its module on first call, so a run only pays for the
+# third-party dependencies of the scanners it selected.
+
+def run_whois(ctx):
+    from modules.whois_lookup import perform_whois_lookup
+    return ctx.cache.cached(
+        "whois", normalize_key(ctx.cleaned_input, ctx.ip_address),
+        lambda: perform_whois_lookup(ctx.cleaned_input, ctx.ip_address))
+
+
+def run_dns(ctx):
+    from modules.dns_lookup import get_dns_records_with_ttl
+    from modules.resolution import get_host_resolver
+    # A/AAAA were already resolved for input detection
+    return ctx.cache.cached(
+        "dns", normalize_key(ctx.cleaned_input),
+        lambda: get_dns_records_with_ttl(ctx.cleaned_input, known=get_host_resolver().peek(ctx.cleaned_input)),
+        ttl_func=lambda res: res)
+
+
+# IP-level scanners run once per address and share the result with every
+# hostname that resolves to it (see utils.shared_work).
+
+def run_ports(ctx):
+    from modules.port_scan import scan_ports
+    options = ctx.port_options
+    key = normalize_key(ctx.ip_address, options.get("mode"), options.get("ports"))
+    return get_shared_work().run("ports", key, lambda: ctx.cache.cached(
+        "ports", key, lambda: scan_ports(ctx.ip_address, **options)))
+
+
+def run_http(ctx):
+    from modules.http_info import fetch_http_info
+    options = ctx.http_options
+    return ctx.cache.cached(
+        "http", normalize_key(ctx.url, *(options.get("ports") or [])),
+        lambda: fetch_http_info(ctx.url, ctx.page, **options))
+
+
+def run_tech(ctx):
+    from modules.tech_stack import detect_tech_stack
+    return ctx.cache.cached(
+        "tech", normalize_key(ctx.url), lambda: detect_tech_stack(ctx.url, ctx.page))
+
+
+def run_builtwith(ctx):
+    from modules.tech_stack import detect_tech_stack_builtwith
+    return ctx.cache.cached(
+        "builtwith", normalize_key(ctx.url), lambda: detect_tech_stack_builtwith(ctx.url))
+
+
+def run_geoip(ctx):
+    from modules.geoip_lookup import get_geoip_info
+    key = normalize_key(ctx.ip_address)
+    return get_shared_work().run("geoip", key, lambda: ctx.cache.cached(
+        "geoip", key, lambda: get_geoip_info(ctx.ip_address)))
+
+
+register("whois", "🔍 Performing WHOIS Lookup", run_whois)
+register("dns", "🌐 Fetching DNS Records", run_dns)
+register("ports", "🚪 Scanning Ports", run_ports, requires_ip=True)
+register("http", "📡 Fetching HTTP Info", run_http)
+register("tech", "🧠 Detecting Technology Stack", run_tech)
+register("geoip", "🌍 Retrieving Geolocation", run_geoip, requires_ip=True)
+# Opt-in only (--module builtwith): tech already fingerprints the page locally
+register("builtwith", "🧱 Querying BuiltWith", run_builtwith)
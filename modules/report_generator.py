@@ -2,7 +2,10 @@
 
 import os
 try:
+    import io
+    import re
     import html
+    from string import Template
     from datetime import datetime
 except ImportError as e:
     from utils.logger import logger
@@ -10,96 +13,80 @@ except ImportError as e:
     raise
 from utils.logger import logger
 
-
-def generate_html_report(target: str, results: dict, output_path: str) -> None:
-    """
-    Generates an HTML report from the scan results.
-    Args:
-        target (str): The scan target.
-        results (dict): The results dictionary.
-        output_path (str): Path to save the HTML report.
-    """
-    try:
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-
-        html_content = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <title>Recon Report - {html.escape(target)}</title>
-    <meta name="viewport" content="width=device-width, initial-scale=1">
-    <style>
-        body {{
+# Page template pieces are built once at import; each report only substitutes
+# the target and timestamp and then streams its sections straight to disk.
+_STYLE = """    <style>
+        body {
             font-family: 'Segoe UI', sans-serif;
             background: #f4f6f8;
             margin: 0;
             padding: 0;
             color: #333;
-        }}
-        header {{
+        }
+        header {
             background: linear-gradient(to right, #283e51, #485563);
             color: #fff;
             text-align: center;
             padding: 2rem;
             box-shadow: 0 4px 10px rgba(0, 0, 0, 0.1);
-        }}
-        h1 {{
+        }
+        h1 {
             margin: 0;
             font-size: 2.5rem;
-        }}
-        h2 {{
+        }
+        h2 {
             font-size: 1.4rem;
             margin-top: 1rem;
             color: #1f3c88;
-        }}
-        .section {{
+        }
+        .section {
             background: #fff;
             margin: 2rem auto;
             padding: 1.5rem;
             max-width: 1000px;
             border-radius: 12px;
             box-shadow: 0 4px 15px rgba(0,0,0,0.05);
-        }}
-        .summary-table, .kv-table {{
+        }
+        .summary-table, .kv-table {
             width: 100%;
             border-collapse: collapse;
             margin-top: 1rem;
-        }}
+        }
         .summary-table th, .summary-table td,
-        .kv-table th, .kv-table td {{
+        .kv-table th, .kv-table td {
             padding: 0.8rem;
             border: 1px solid #ddd;
             text-align: left;
-        }}
-        .summary-table th {{
+        }
+        .summary-table th {
             background: #f0f4f8;
-        }}
-        .badge {{
+        }
+        .badge {
             display: inline-block;
             padding: 0.3rem 0.7rem;
             border-radius: 999px;
             font-size: 0.9rem;
             font-weight: bold;
-        }}
-        .badge.success {{
+        }
+        .badge.success {
             background: #d4edda;
             color: #155724;
-        }}
-        .badge.fail {{
+        }
+        .badge.fail {
             background: #f8d7da;
             color: #721c24;
-        }}
-        .card {{
+        }
+        .card {
             background: #f9fbfd;
             border: 1px solid #e1e5ea;
             border-radius: 6px;
             padding: 0.8rem 1rem;
             margin-bottom: 0.7rem;
-        }}
-        .card strong {{
+        }
+        .card strong {
             color: #2c3e50;
-        }}
-        .code-block {{
+        }
+        .code-block {
             background: #f4f4f4;
             border-radius: 6px;
             padding: 1rem;
@@ -107,78 +94,203 @@ def generate_html_report(target: str, results: dict, output_path: str) -> None:
             white-space: pre-wrap;
             word-wrap: break-word;
             margin-top: 0.5rem;
-        }}
-        .footer {{
+        }
+        .footer {
             text-align: center;
             font-size: 0.9rem;
             color: #888;
             padding: 2rem 0;
-        }}
+        }
     </style>
-</head>
+"""
+
+_PAGE_HEAD = Template("""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <title>$title</title>
+    <meta name="viewport" content="width=device-width, initial-scale=1">
+""" + _STYLE + """</head>
 <body>
 
 <header>
-    <h1>🛡️ Recon Report</h1>
-    <p>Target: <strong>{html.escape(target)}</strong><br>
-    Generated on: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}</p>
+    <h1>$heading</h1>
+    <p>$subtitle</p>
 </header>
+""")
+
+_PAGE_FOOT = Template("""<div class="footer">
+    &copy; $year Recon Tool | Generated for <strong>$target</strong>
+</div>
+
+</body>
+</html>""")
+
+_WRITE_BUFFER = 1024 * 1024
 
+
+def _write_page_head(write, title: str, heading: str, subtitle: str) -> None:
+    write(_PAGE_HEAD.substitute(title=html.escape(title), heading=heading, subtitle=subtitle))
+
+
+def _write_page_foot(write, target: str) -> None:
+    write(_PAGE_FOOT.substitute(year=datetime.now().year, target=html.escape(target)))
+
+
+def _write_results(write, target: str, results: dict) -> None:
+    """Writes the summary table and one section per module."""
+    write("""
 <div class="section">
     <h2>📋 Summary</h2>
     <table class="summary-table">
-        <tr><th>Section</th><th>Status</th></tr>"""
+        <tr><th>Section</th><th>Status</th></tr>""")
 
-        for section in results:
-            readable = section.replace("_", " ").title()
-            status = "✔️ Collected" if results[section] else "⚠️ Missing"
-            badge_class = "success" if results[section] else "fail"
-            html_content += f"<tr><td>{html.escape(readable)}</td><td><span class='badge {badge_class}'>{status}</span></td></tr>"
+    for section in results:
+        readable = section.replace("_", " ").title()
+        status = "✔️ Collected" if results[section] else "⚠️ Missing"
+        badge_class = "success" if results[section] else "fail"
+        write(f"<tr><td>{html.escape(readable)}</td><td><span class='badge {badge_class}'>{status}</span></td></tr>")
 
-        html_content += "</table></div>"
+    write("</table></div>")
 
-        for section, content in results.items():
-            html_content += f"""<div class="section">
+    for section, content in results.items():
+        write(f"""<div class="section">
     <h2>📂 {html.escape(section.replace('_', ' ').title())}</h2>
-    {format_content_as_html(content)}
-</div>"""
+    """)
+        write_content_as_html(write, content)
+        write("""
+</div>""")
 
-        html_content += f"""<div class="footer">
-    &copy; {datetime.now().year} Recon Tool | Generated for <strong>{html.escape(target)}</strong>
-</div>
 
-</body>
-</html>"""
+def _render_report(target: str, results: dict, output_path: str) -> None:
+    with open(output_path, "w", encoding="utf-8", buffering=_WRITE_BUFFER) as f:
+        write = f.write
+        _write_page_head(
+            write,
+            title=f"Recon Report - {target}",
+            heading="🛡️ Recon Report",
+            subtitle=f"Target: <strong>{html.escape(target)}</strong><br>\n"
+                     f"    Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+        )
+        _write_results(write, target, results)
+        _write_page_foot(write, target)
 
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(html_content)
 
+def generate_html_report(target: str, results: dict, output_path: str) -> None:
+    """
+    Generates an HTML report from the scan results. Sections are streamed to
+    the file while the results are walked, so the page is never held in memory.
+    Args:
+        target (str): The scan target.
+        results (dict): The results dictionary.
+        output_path (str): Path to save the HTML report.
+    """
+    try:
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        _render_report(target, results, output_path)
         logger.info(f"[\u2713] HTML report saved to {output_path}")
     except Exception as e:
         logger.error(f"[!] Failed to generate HTML report: {e}")
 
 
-def format_content_as_html(content):
+def _page_name(index: int, target: str) -> str:
+    slug = re.sub(r"[^a-z0-9.-]+", "_", str(target).lower()).strip("_")[:80] or "target"
+    return f"{index:06d}-{slug}.html"
+
+
+def generate_multi_target_report(records, output_dir: str) -> int:
+    """
+    Renders a multi-target report: one page per target under
+    output_dir/targets/ plus an index page linking to them. Records are
+    consumed one at a time, so memory stays bounded for any batch size.
+
+    Args:
+        records (iterable): Dicts with "target" and "results" (batch NDJSON records).
+        output_dir (str): Directory receiving index.html and targets/.
+
+    Returns:
+        int: Number of target pages written.
+    """
+    pages_dir = os.path.join(output_dir, "targets")
+    os.makedirs(pages_dir, exist_ok=True)
+    index_path = os.path.join(output_dir, "index.html")
+    count = 0
+
+    with open(index_path, "w", encoding="utf-8", buffering=_WRITE_BUFFER) as index:
+        write = index.write
+        _write_page_head(
+            write,
+            title="Recon Report - Index",
+            heading="🛡️ Recon Report Index",
+            subtitle=f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+        )
+        write("""
+<div class="section">
+    <h2>🎯 Targets</h2>
+    <table class="summary-table">
+        <tr><th>Target</th><th>IP</th><th>Sections</th><th>Status</th></tr>""")
+
+        for record in records:
+            count += 1
+            target = str(record.get("target") or record.get("normalized") or f"target {count}")
+            results = record.get("results") or {}
+            page = _page_name(count, target)
+
+            if record.get("error"):
+                results = dict(results, error=record["error"])
+            try:
+                _render_report(target, results, os.path.join(pages_dir, page))
+            except Exception as e:
+                logger.error(f"[!] Failed to render report page for {target}: {e}")
+
+            ok = bool(record.get("results")) and not record.get("error")
+            badge = "<span class='badge success'>✔️ Collected</span>" if ok else "<span class='badge fail'>⚠️ Failed</span>"
+            write(f"<tr><td><a href='targets/{html.escape(page)}'>{html.escape(target)}</a></td>"
+                  f"<td>{html.escape(str(record.get('ip') or ''))}</td>"
+                  f"<td>{html.escape(', '.join(record.get('results') or {}))}</td><td>{badge}</td></tr>")
+
+        write("</table></div>")
+        _write_page_foot(write, f"{count} targets")
+
+    logger.info(f"[\u2713] Multi-target HTML report saved to {index_path}")
+    return count
+
+
+def iter_ndjson_records(ndjson_path: str):
+    """Yields one record per line of a batch NDJSON file (.gz/.zst included)."""
+    from modules.json_export import iter_ndjson
+    yield from iter_ndjson(ndjson_path)
+
+
+def write_content_as_html(write, content) -> None:
+    """Streams the HTML rendering of a result value through `write`."""
     if isinstance(content, dict):
-        output = "<table class='kv-table'>"
-        output += "<tr><th>Key</th><th>Value</th></tr>"
+        write("<table class='kv-table'>")
+        write("<tr><th>Key</th><th>Value</th></tr>")
         for k, v in content.items():
-            value = format_content_as_html(v)
-            output += f"<tr><td>{html.escape(str(k))}</td><td>{value}</td></tr>"
-        output += "</table>"
-        return output
+            write(f"<tr><td>{html.escape(str(k))}</td><td>")
+            write_content_as_html(write, v)
+            write("</td></tr>")
+        write("</table>")
     elif isinstance(content, list):
         if all(isinstance(item, dict) for item in content):
-            output = ""
             for item in content:
-                output += "<div class='card'>"
+                write("<div class='card'>")
                 for k, v in item.items():
-                    output += f"<strong>{html.escape(str(k))}</strong>: {html.escape(str(v))}<br>"
-                output += "</div>"
-            return output
+                    write(f"<strong>{html.escape(str(k))}</strong>: {html.escape(str(v))}<br>")
+                write("</div>")
         else:
-            return "<ul>" + "".join(f"<li>{html.escape(str(item))}</li>" for item in content) + "</ul>"
+            write("<ul>")
+            for item in content:
+                write(f"<li>{html.escape(str(item))}</li>")
+            write("</ul>")
     elif content is None:
-        return "<span class='badge fail'>No Data</span>"
+        write("<span class='badge fail'>No Data</span>")
     else:
-        return html.escape(str(content))
+        write(html.escape(str(content)))
+
+
+def format_content_as_html(content):
+    buffer = io.StringIO()
+    write_content_as_html(buffer.write, content)
+    return buffer.getvalue()
@@ -0,0 +1,227 @@
+# modules/rescan.py
+
+try:
+    import time
+    from modules.input_handler import detect_input_type
+    from modules.pipeline import run_modules, build_task_map, DEFAULT_WORKERS
+    from utils.cache import is_cacheable, refreshing
+    from utils.snapshots import get_snapshots
+    from utils.journal import get_journal
+except ImportError as e:
+    from utils.logger import logger
+    logger.error(f"Missing dependency: {e}. Please install required modules.")
+    raise
+from utils.logger import logger
+
+HOUR = 3600
+
+# Seconds a module's snapshot is trusted before a rescan runs it again. The
+# defaults suit a nightly job: fast-moving data is refreshed every run,
+# registration and geolocation data only weekly or monthly.
+DEFAULT_MAX_AGES = {
+    "dns": 6 * HOUR,
+    "ports": 20 * HOUR,
+    "http": 20 * HOUR,
+    "tech": 3 * 24 * HOUR,
+    "builtwith": 3 * 24 * HOUR,
+    "whois": 7 * 24 * HOUR,
+    "geoip": 30 * 24 * HOUR,
+}
+# Plugin scanners without an entry above
+DEFAULT_MAX_AGE = 20 * HOUR
+
+
+def parse_max_ages(values) -> dict:
+    """
+    Parses repeated MODULE=HOURS overrides (e.g. ["ports=12", "whois=48"]).
+
+    Returns:
+        dict: Module -> max age in seconds, merged over DEFAULT_MAX_AGES.
+    """
+    max_ages = dict(DEFAULT_MAX_AGES)
+    for value in values or []:
+        module, sep, hours = value.partition("=")
+        if not sep or not module.strip():
+            raise ValueError(f"expected MODULE=HOURS, got {value!r}")
+        max_ages[module.strip()] = float(hours) * HOUR
+    return max_ages
+
+
+def stale_modules(snapshot: dict, selected: list, max_ages: dict | None = None, now: float | None = None) -> list:
+    """Selected modules without a snapshot, or whose snapshot is older than its max age."""
+    max_ages = max_ages or DEFAULT_MAX_AGES
+    now = time.time() if now is None else now
+    return [
+        key for key in selected
+        if key not in snapshot or now - snapshot[key]["taken_at"] >= max_ages.get(key, DEFAULT_MAX_AGE)
+    ]
+
+
+# --- Change detection --------------------------------------------------------
+# Each differ compares two successful results of one module and returns a
+# list of compact change dicts; modules without a differ are not compared.
+
+def _open_ports(result: dict) -> dict:
+    ports = {}
+    for proto, entries in (result.get("open_ports") or {}).items():
+        for port, info in entries.items():
+            if (info or {}).get("state", "open") == "open":
+                ports[f"{proto}/{port}"] = (info or {}).get("service", "")
+    return ports
+
+
+def _diff_ports(old: dict, new: dict) -> list:
+    before, after = _open_ports(old), _open_ports(new)
+    changes = [{"module": "ports", "change": "opened", "value": port, "service": after[port]}
+               for port in after if port not in before]
+    changes += [{"module": "ports", "change": "closed", "value": port, "service": before[port]}
+                for port in before if port not in after]
+    return changes
+
+
+def _diff_dns(old: dict, new: dict) -> list:
+    changes = []
+    for rtype in dict.fromkeys(list(old) + list(new)):
+        before, after = set(old.get(rtype) or []), set(new.get(rtype) or [])
+        changes += [{"module": "dns", "change": "added", "type": rtype, "value": value}
+                    for value in sorted(after - before)]
+        changes += [{"module": "dns", "change": "removed", "type": rtype, "value": value}
+                    for value in sorted(before - after)]
+    return changes
+
+
+def _technologies(result: dict) -> set:
+    return {(category, name) for category, names in result.items() if isinstance(names, list) for name in names}
+
+
+def _diff_tech(old: dict, new: dict) -> list:
+    before, after = _technologies(old), _technologies(new)
+    changes = [{"module": "tech", "change": "added", "category": category, "value": name}
+               for category, name in sorted(after - before)]
+    changes += [{"module": "tech", "change": "removed", "category": category, "value": name}
+                for category, name in sorted(before - after)]
+    return changes
+
+
+WHOIS_FIELDS = ("registrar", "expiration_date", "name_servers")
+
+
+def _diff_whois(old: dict, new: dict) -> list:
+    before, after = old.get("domain") or {}, new.get("domain") or {}
+    if before.get("error") or after.get("error"):
+        return []
+    changes = []
+    for field in WHOIS_FIELDS:
+        old_value, new_value = before.get(field), after.get(field)
+        if isinstance(old_value, list) or isinstance(new_value, list):
+            # Registries vary case and order between queries
+            same = sorted(str(v).lower() for v in old_value or []) == sorted(str(v).lower() for v in new_value or [])
+        else:
+            same = old_value == new_value
+        if not same:
+            changes.append({"module": "whois", "change": "modified", "field": field, "old": old_value, "new": new_value})
+    return changes
+
+
+DIFFERS = {
+    "ports": _diff_ports,
+    "dns": _diff_dns,
+    "tech": _diff_tech,
+    "whois": _diff_whois,
+}
+
+
+def diff_results(previous: dict, current: dict) -> list:
+    """
+    Compares freshly run modules against their previous results.
+
+    Args:
+        previous (dict): Module -> result from the last snapshot.
+        current (dict): Module -> result from this run.
+
+    Returns:
+        list: Change dicts, each with at least "module", "change" and "value" or "field".
+    """
+    changes = []
+    for module, result in current.items():
+        differ = DIFFERS.get(module)
+        if differ is None or module not in previous:
+            continue
+        if not (is_cacheable(result) and is_cacheable(previous[module])):
+            continue
+        try:
+            changes.extend(differ(previous[module], result))
+        except Exception as e:
+            logger.error(f"[!] Could not diff {module} results: {e}")
+    return changes
+
+
+def format_change(change: dict) -> str:
+    """One-line human readable form of a change dict."""
+    module = change["module"]
+    if change["change"] == "modified":
+        return f"{module}: {change['field']} changed from {change['old']} to {change['new']}"
+    label = change.get("type") or change.get("category") or ""
+    service = f" ({change['service']})" if change.get("service") else ""
+    return f"{module}: {change['change']} {label + ' ' if label else ''}{change['value']}{service}"
+
+
+# --- Rescanning --------------------------------------------------------------
+
+def rescan_modules(target: str, cleaned_input: str, ip_address: str | None, selected: list,
+                   module_workers: int = DEFAULT_WORKERS, scan_options: dict | None = None,
+                   max_ages: dict | None = None, store=None, on_start=None, on_done=None) -> tuple:
+    """
+    Runs only the selected modules whose snapshot is stale, diffs them
+    against the snapshot and stores the fresh results.
+
+    Returns:
+        tuple: (results, rescanned, changes). results holds every selected
+        module, fresh where it was rerun and from the snapshot otherwise.
+    """
+    store = store or get_snapshots()
+    snapshot = store.load(target)
+    previous = {module: entry["value"] for module, entry in snapshot.items()}
+    stale = stale_modules(snapshot, selected, max_ages)
+
+    task_map = build_task_map(target, cleaned_input, ip_address, scan_options)
+    # A cached result can be older than the max age that made the module stale
+    with refreshing():
+        fresh = run_modules(task_map, stale, module_workers, on_start, on_done,
+                            journal=get_journal(), journal_key=target)
+    changes = diff_results(previous, fresh)
+    store.save(target, fresh)
+
+    results = {}
+    for key in selected:
+        # A failed rerun falls back to the last good result
+        if key in fresh and (is_cacheable(fresh[key]) or key not in previous):
+            results[key] = fresh[key]
+        elif key in previous:
+            results[key] = previous[key]
+    return results, stale, changes
+
+
+def rescan_target(target: str, selected: list, module_workers: int = DEFAULT_WORKERS,
+                  scan_options: dict | None = None, max_ages: dict | None = None) -> dict:
+    """
+    Batch counterpart of batch.scan_target() for incremental runs.
+
+    Returns:
+        dict: Record with target, input_type, ip, results, rescanned and changes (or error).
+    """
+    input_type, cleaned_input, ip_address = detect_input_type(target)
+    record = {
+        "target": target,
+        "input_type": input_type,
+        "normalized": cleaned_input,
+        "ip": ip_address,
+    }
+    if input_type == "unknown":
+        record["error"] = "Invalid input. Please provide a valid IP, domain, or URL."
+        return record
+
+    results, rescanned, changes = rescan_modules(
+        target, cleaned_input, ip_address, selected, module_workers, scan_options, max_ages)
+    record.update(results=results, rescanned=rescanned, changes=changes)
+    return record
@@ -0,0 +1,126 @@
+# modules/resolution.py
+
+try:
+    import time
+    import socket
+    import asyncio
+    import threading
+    from collections import OrderedDict
+    from concurrent.futures import TimeoutError as FuturesTimeout
+    from utils.deadline import budget
+    from modules.dns_lookup import get_dns_records_with_ttl_async, DEFAULT_TIMEOUT
+except ImportError as e:
+    from utils.logger import logger
+    logger.error(f"Missing dependency: {e}. Please install required modules.")
+    raise
+from utils.logger import logger
+
+ADDRESS_TYPES = ("A", "AAAA")
+DEFAULT_SIZE = 65536
+
+
+class HostResolver:
+    """
+    Resolves each hostname's A and AAAA records once and shares the answer:
+    input detection takes its address from it and the DNS module reuses the
+    two record sets instead of querying them again.
+
+    Queries run on one background asyncio loop, so any number of scanning
+    threads can have names in flight at the same time without a thread per
+    lookup. Concurrent requests for the same name share one query, and
+    answers are kept (bounded LRU) until their TTL expires.
+    """
+
+    def __init__(self, timeout: float = DEFAULT_TIMEOUT, size: int = DEFAULT_SIZE):
+        self.timeout = timeout
+        self.size = size
+        self.stats = {"queries": 0, "shared": 0}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._loop = None
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="host-resolver", daemon=True).start()
+            return self._loop
+
+    async def _resolve(self, name: str) -> dict:
+        records, ttl = await get_dns_records_with_ttl_async(name, timeout=self.timeout, record_types=ADDRESS_TYPES)
+        return {"records": records, "ttl": ttl}
+
+    def _lookup(self, name: str):
+        name = name.strip().lower().rstrip(".")
+        loop = self._ensure_loop()
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and (not entry[1].done() or entry[0] > time.monotonic()):
+                self._entries.move_to_end(name)
+                self.stats["shared"] += 1
+                return entry[1]
+            self.stats["queries"] += 1
+            future = asyncio.run_coroutine_threadsafe(self._resolve(name), loop)
+            # Expiry is fixed once the answer (and its TTL) arrives
+            entry = self._entries[name] = [float("inf"), future]
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+        future.add_done_callback(lambda f, entry=entry: self._expire_at(entry, f))
+        return future
+
+    @staticmethod
+    def _expire_at(entry: list, future) -> None:
+        ttl = future.result()["ttl"] if not future.exception() else 0
+        entry[0] = time.monotonic() + ttl
+
+    def records(self, name: str) -> dict:
+        """A and AAAA values of name (empty lists when it does not resolve in time)."""
+        try:
+            return self._lookup(name).result(timeout=budget(None))["records"]
+        except FuturesTimeout:
+            return {rtype: [] for rtype in ADDRESS_TYPES}
+
+    def peek(self, name: str) -> tuple | None:
+        """(records, ttl) if name was already resolved and is still fresh, without querying."""
+        with self._lock:
+            entry = self._entries.get(name.strip().lower().rstrip("."))
+        if entry is None or not entry[1].done() or entry[1].exception() or entry[0] <= time.monotonic():
+            return None
+        answer = entry[1].result()
+        return answer["records"], answer["ttl"]
+
+    def addresses(self, name: str) -> list:
+        """
+        IPv4 then IPv6 addresses of name. Falls back to the system resolver
+        for names only it knows (e.g. /etc/hosts entries).
+        """
+        records = self.records(name)
+        found = records.get("A", []) + records.get("AAAA", [])
+        if found:
+            return found
+        try:
+            return list(dict.fromkeys(info[4][0] for info in socket.getaddrinfo(name, None)))
+        except (socket.gaierror, UnicodeError):
+            return []
+
+
+_resolver = None
+_resolver_lock = threading.Lock()
+
+
+def configure_host_resolver(timeout: float = DEFAULT_TIMEOUT, size: int = DEFAULT_SIZE) -> HostResolver:
+    """Replaces the process-wide resolver, dropping every cached answer."""
+    global _resolver
+    with _resolver_lock:
+        _resolver = HostResolver(timeout, size)
+    return _resolver
+
+
+def get_host_resolver() -> HostResolver:
+    """Returns the process-wide resolver, creating it on first use."""
+    global _resolver
+    if _resolver is None:
+        with _resolver_lock:
+            if _resolver is None:
+                _resolver = HostResolver()
+    return _resolver
@@ -0,0 +1,195 @@
+# modules/subdomains.py
+
+try:
+    import time
+    import uuid
+    import queue
+    import asyncio
+    import threading
+except ImportError as e:
+    from utils.logger import logger
+    logger.error(f"Missing dependency: {e}. Please install required modules.")
+    raise
+from utils.logger import logger
+
+# dnspython is only imported once enumeration starts, so recon.py can read these defaults cheaply
+DEFAULT_CONCURRENCY = 1000
+DEFAULT_QPS = 500
+DEFAULT_SUB_TIMEOUT = 2.0
+WILDCARD_PROBES = 3
+
+
+def iter_wordlist(path: str):
+    """
+    Lazily yields unique, lower-cased labels from a wordlist file. Blank
+    lines and lines starting with '#' are skipped.
+    """
+    seen = set()
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        for line in f:
+            word = line.strip().lower().strip(".")
+            if word and not word.startswith("#") and word not in seen:
+                seen.add(word)
+                yield word
+
+
+class QueryRateLimiter:
+    """
+    Hands out evenly spaced query slots so enumeration holds a steady
+    queries-per-second rate instead of bursting the resolver.
+    """
+
+    def __init__(self, qps: float):
+        self.interval = 1.0 / qps if qps > 0 else 0.0
+        self._next = 0.0
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        now = time.monotonic()
+        slot = max(now, self._next)
+        self._next = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+async def detect_wildcard(domain: str, resolver, timeout: float = DEFAULT_SUB_TIMEOUT,
+                          probes: int = WILDCARD_PROBES) -> set:
+    """
+    Resolves a few random labels under domain. Any answer means the zone
+    has wildcard records; the returned addresses are the wildcard targets
+    that brute-force hits must not be reported for.
+    """
+    from modules.dns_lookup import lookup_async
+    answers = set()
+    for _ in range(probes):
+        label = uuid.uuid4().hex[:16]
+        for rtype in ("A", "AAAA"):
+            answers.update(await lookup_async(f"{label}.{domain}", rtype, resolver, timeout))
+    return answers
+
+
+async def enumerate_subdomains_async(domain: str, words, on_found, concurrency: int = DEFAULT_CONCURRENCY,
+                                     qps: float = DEFAULT_QPS, timeout: float = DEFAULT_SUB_TIMEOUT,
+                                     nameservers: list | None = None, port: int = 53, stop=None) -> dict:
+    """
+    Brute-forces <word>.<domain> A records with up to `concurrency` queries in
+    flight and at most `qps` queries per second, calling on_found(host, addresses)
+    for every name that resolves to something other than the wildcard answers.
+
+    Args:
+        domain (str): Apex domain to enumerate.
+        words (iterable): Labels to try; consumed lazily.
+        on_found (callable): Called once per discovered host.
+        concurrency (int): Maximum simultaneous queries.
+        qps (float): Query rate ceiling (0 = unlimited).
+        timeout (float): Per-query deadline in seconds.
+        nameservers (list): Resolver IPs (default: configure_resolver()/resolv.conf).
+        port (int): Resolver port.
+        stop (threading.Event): Optional; set it to abandon the run early.
+
+    Returns:
+        dict: Statistics (queried, found, wildcard, filtered, elapsed, qps).
+    """
+    from modules.dns_lookup import get_async_resolver, lookup_async
+    domain = domain.strip().lower().rstrip(".")
+    resolver = get_async_resolver(nameservers, port)
+    limiter = QueryRateLimiter(qps)
+    stats = {"queried": 0, "found": 0, "filtered": 0}
+    started = time.perf_counter()
+
+    wildcard = await detect_wildcard(domain, resolver, timeout)
+    stats["wildcard"] = bool(wildcard)
+    if wildcard:
+        logger.warning(f"Wildcard DNS on *.{domain} -> {', '.join(sorted(wildcard))}; filtering those answers")
+
+    # A bounded queue feeds the workers, so huge wordlists never become millions of tasks
+    candidates = asyncio.Queue(maxsize=concurrency * 2)
+    seen = set()
+
+    async def producer():
+        for word in words:
+            if stop is not None and stop.is_set():
+                break
+            host = f"{word}.{domain}"
+            if host in seen:
+                continue
+            seen.add(host)
+            await candidates.put(host)
+        for _ in range(concurrency):
+            await candidates.put(None)
+
+    async def worker():
+        while True:
+            host = await candidates.get()
+            if host is None:
+                return
+            await limiter.wait()
+            stats["queried"] += 1
+            addresses = await lookup_async(host, "A", resolver, timeout)
+            if not addresses:
+                continue
+            if wildcard and set(addresses) <= wildcard:
+                stats["filtered"] += 1
+                continue
+            stats["found"] += 1
+            on_found(host, addresses)
+
+    await asyncio.gather(producer(), *(worker() for _ in range(max(1, concurrency))))
+    stats["elapsed"] = time.perf_counter() - started
+    stats["qps"] = stats["queried"] / stats["elapsed"] if stats["elapsed"] else 0.0
+    logger.info(f"[✓] {domain}: {stats['found']} subdomains from {stats['queried']} queries "
+                f"({stats['qps']:.0f} q/s)")
+    return stats
+
+
+def iter_subdomains(domains, words_factory, include_apex: bool = True, stats: dict | None = None, **options):
+    """
+    Enumerates subdomains of each domain on a background event loop and
+    yields hostnames as soon as they are discovered, so the caller (e.g.
+    batch.run_batch) can start scanning them while enumeration continues.
+
+    Args:
+        domains (iterable): Apex domains.
+        words_factory (callable): Returns a fresh word iterable per domain,
+            e.g. lambda: iter_wordlist(path).
+        include_apex (bool): Also yield each apex domain itself, first.
+        stats (dict): Optional; filled with per-domain statistics.
+        **options: Passed to enumerate_subdomains_async().
+
+    Yields:
+        str: Discovered hostnames, each once.
+    """
+    found = queue.Queue()
+    stop = threading.Event()
+    done = object()
+
+    def run():
+        try:
+            for domain in domains:
+                if stop.is_set():
+                    break
+                if include_apex:
+                    found.put(domain.strip().lower().rstrip("."))
+                result = asyncio.run(enumerate_subdomains_async(
+                    domain, words_factory(), lambda host, _: found.put(host), stop=stop, **options))
+                if stats is not None:
+                    stats[domain] = result
+        except Exception as e:
+            logger.error(f"[!] Subdomain enumeration failed: {e}")
+        finally:
+            found.put(done)
+
+    thread = threading.Thread(target=run, name="subdomain-enum", daemon=True)
+    thread.start()
+    emitted = set()
+    try:
+        while True:
+            host = found.get()
+            if host is done:
+                return
+            if host not in emitted:
+                emitted.add(host)
+                yield host
+    finally:
+        stop.set()
@@ -0,0 +1,79 @@
+# modules/tech_signatures.py
+#
+# Signature set for the local technology fingerprinting engine in
+# modules/tech_stack.py. Each entry is (category, technology, source, pattern):
+#   source "header:<name>" matches the value of that response header,
+#   "cookie" matches cookie names, "body" matches the HTML body.
+# Patterns are written in lowercase and matched against lowercased text;
+# they must not contain capture groups.
+# Categories follow BuiltWith's naming so results keep the same shape.
+
+SIGNATURES = [
+    # Web servers
+    ("web-servers", "Nginx", "header:server", r"nginx"),
+    ("web-servers", "Apache", "header:server", r"apache"),
+    ("web-servers", "IIS", "header:server", r"microsoft-iis"),
+    ("web-servers", "LiteSpeed", "header:server", r"litespeed"),
+    ("web-servers", "Caddy", "header:server", r"caddy"),
+    ("web-servers", "OpenResty", "header:server", r"openresty"),
+    ("web-servers", "Gunicorn", "header:server", r"gunicorn"),
+    ("web-servers", "Envoy", "header:server", r"envoy"),
+
+    # CDN / edge
+    ("cdn", "Cloudflare", "header:server", r"cloudflare"),
+    ("cdn", "Cloudflare", "header:cf-ray", r"."),
+    ("cdn", "Amazon CloudFront", "header:via", r"cloudfront"),
+    ("cdn", "Amazon CloudFront", "header:x-amz-cf-id", r"."),
+    ("cdn", "Fastly", "header:x-served-by", r"cache-"),
+    ("cdn", "Akamai", "header:server", r"akamai"),
+    ("cdn", "Varnish", "header:via", r"varnish"),
+    ("cdn", "Varnish", "header:x-varnish", r"."),
+
+    # Programming languages / runtimes
+    ("programming-languages", "PHP", "header:x-powered-by", r"php"),
+    ("programming-languages", "PHP", "cookie", r"phpsessid"),
+    ("programming-languages", "Java", "cookie", r"jsessionid"),
+    ("programming-languages", "Python", "header:server", r"python|gunicorn|uvicorn"),
+    ("programming-languages", "Node.js", "header:x-powered-by", r"express|next\.js"),
+
+    # Web frameworks
+    ("web-frameworks", "ASP.NET", "header:x-powered-by", r"asp\.net"),
+    ("web-frameworks", "ASP.NET", "header:x-aspnet-version", r"."),
+    ("web-frameworks", "ASP.NET", "cookie", r"asp\.net_sessionid"),
+    ("web-frameworks", "Express", "header:x-powered-by", r"express"),
+    ("web-frameworks", "Next.js", "header:x-powered-by", r"next\.js"),
+    ("web-frameworks", "Laravel", "cookie", r"laravel_session"),
+    ("web-frameworks", "Django", "cookie", r"csrftoken|django_language"),
+    ("web-frameworks", "Ruby on Rails", "cookie", r"_rails_session|_session_id"),
+    ("web-frameworks", "Ruby on Rails", "body", r"<meta[^>]+csrf-param[^>]+authenticity_token"),
+    ("web-frameworks", "Twitter Bootstrap", "body", r"bootstrap(?:\.min)?\.(?:css|js)"),
+
+    # CMS
+    ("cms", "WordPress", "body", r"/wp-content/|/wp-includes/"),
+    ("cms", "WordPress", "body", r"<meta[^>]+generator[^>]+wordpress"),
+    ("cms", "Drupal", "header:x-generator", r"drupal"),
+    ("cms", "Drupal", "body", r"drupal-settings-json|/sites/default/files/"),
+    ("cms", "Joomla", "body", r"<meta[^>]+generator[^>]+joomla"),
+    ("cms", "Shopify", "header:x-shopid", r"."),
+    ("cms", "Shopify", "body", r"cdn\.shopify\.com"),
+    ("cms", "Wix", "body", r"static\.wixstatic\.com"),
+    ("cms", "Squarespace", "body", r"static1\.squarespace\.com"),
+    ("cms", "Ghost", "body", r"<meta[^>]+generator[^>]+ghost"),
+
+    # JavaScript frameworks / libraries
+    ("javascript-frameworks", "jQuery", "body", r"jquery(?:[.-]\d[\w.]*)?(?:\.min)?\.js"),
+    ("javascript-frameworks", "React", "body", r"data-reactroot|react(?:-dom)?(?:\.production)?(?:\.min)?\.js"),
+    ("javascript-frameworks", "Vue.js", "body", r"vue(?:\.runtime)?(?:\.min)?\.js|data-v-[0-9a-f]{8}"),
+    ("javascript-frameworks", "Angular", "body", r"ng-version=|angular(?:\.min)?\.js"),
+    ("javascript-frameworks", "Next.js", "body", r"/_next/static/|__next_data__"),
+    ("javascript-frameworks", "Nuxt.js", "body", r"/_nuxt/|window\.__nuxt__"),
+
+    # Analytics / tag managers
+    ("analytics", "Google Analytics", "body", r"google-analytics\.com/|gtag\(|googletagmanager\.com/gtag"),
+    ("analytics", "Google Tag Manager", "body", r"googletagmanager\.com/gtm\.js"),
+    ("analytics", "Hotjar", "body", r"static\.hotjar\.com"),
+
+    # Security
+    ("security", "reCAPTCHA", "body", r"google\.com/recaptcha|gstatic\.com/recaptcha"),
+    ("security", "HSTS", "header:strict-transport-security", r"."),
+]
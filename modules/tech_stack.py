@@ -1,20 +1,92 @@
 # modules/tech_stack.py
 
 try:
+    import re
+    import threading
     from urllib.parse import urlparse
-    import builtwith
+    from utils.http_client import get_http_client
+    from utils.scheduler import get_scheduler
+    from modules.tech_signatures import SIGNATURES
 except ImportError as e:
     from utils.logger import logger
     logger.error(f"Missing dependency: {e}. Please install required modules.")
     raise
 from utils.logger import logger
 
-def detect_tech_stack(url: str) -> dict:
+_matcher = None
+_matcher_lock = threading.Lock()
+
+
+class TechMatcher:
+    """
+    Signature set compiled into one alternation regex per evidence source
+    (each header, cookie names, body). Every source is scanned once no matter
+    how many signatures it has; only the positions where the union matched
+    are re-checked against the individual signatures to name the technology.
+    """
+
+    def __init__(self, signatures):
+        grouped = {}
+        for category, name, source, pattern in signatures:
+            grouped.setdefault(source.lower(), []).append((category, name, re.compile(pattern)))
+
+        # Non-capturing union over lowercased text lets sre use its fast
+        # paths; named groups per signature make the scan several times slower
+        self.sources = {
+            source: (re.compile("|".join(f"(?:{entry[2].pattern})" for entry in entries)), entries)
+            for source, entries in grouped.items()
+        }
+
+    def _scan(self, source: str, text: str, found: dict) -> None:
+        compiled = self.sources.get(source)
+        if compiled is None or not text:
+            return
+        union, entries = compiled
+        text = text.lower()
+        for match in union.finditer(text):
+            for category, name, regex in entries:
+                if regex.match(text, match.start()):
+                    names = found.setdefault(category, [])
+                    if name not in names:
+                        names.append(name)
+
+    def match(self, headers: dict, cookies, body: str) -> dict:
+        """
+        Args:
+            headers (dict): Response headers.
+            cookies (iterable): Cookie names set by the response.
+            body (str): Response body text.
+
+        Returns:
+            dict: Category -> list of technologies (BuiltWith-style).
+        """
+        found = {}
+        for name, value in (headers or {}).items():
+            self._scan(f"header:{name.lower()}", str(value), found)
+        self._scan("cookie", "\n".join(cookies or []), found)
+        self._scan("body", body or "", found)
+        return found
+
+
+def get_matcher() -> TechMatcher:
+    """Returns the process-wide matcher, compiling the signature set on first use."""
+    global _matcher
+    if _matcher is None:
+        with _matcher_lock:
+            if _matcher is None:
+                _matcher = TechMatcher(SIGNATURES)
+    return _matcher
+
+
+def detect_tech_stack(url: str, page=None) -> dict:
     """
-    Detects the technology stack used by a given website using BuiltWith.
+    Detects the technology stack used by a given website by matching the
+    response headers, cookies and body against the local signature set.
 
     Args:
         url (str): The website URL (e.g., https://example.com)
+        page (SharedResponse): Optional shared fetch (see http_info) to
+            fingerprint instead of fetching the page again.
 
     Returns:
         dict: Dictionary of detected technologies categorized by type, or error message.
@@ -27,15 +99,42 @@ def detect_tech_stack(url: str) -> dict:
         if not parsed.scheme:
             url = 'https://' + url
 
-        tech = builtwith.parse(url)
+        if page is not None:
+            response = page.get()
+        else:
+            response = get_http_client().get(url, timeout=10, allow_redirects=True)
+
+        tech = get_matcher().match(dict(response.headers), response.cookies.keys(), response.text)
 
         if not tech or len(tech.keys()) == 0:
             result["info"] = "No technologies detected or the site may be unreachable."
         else:
             result = tech
 
+    except Exception as e:
+        logger.error(f"Technology detection failed for {url}: {e}")
+        result["error"] = f"Technology detection failed: {str(e)}"
+
+    return result
+
+
+def detect_tech_stack_builtwith(url: str) -> dict:
+    """
+    Detects the technology stack using the BuiltWith library (a second fetch
+    through the "builtwith" provider limits; opt in with --module builtwith).
+    """
+    result = {}
+    try:
+        import builtwith
+        parsed = urlparse(url)
+        if not parsed.scheme:
+            url = 'https://' + url
+        tech = get_scheduler().call("builtwith", lambda: builtwith.parse(url), key=url)
+        if not tech or len(tech.keys()) == 0:
+            result["info"] = "No technologies detected or the site may be unreachable."
+        else:
+            result = tech
     except Exception as e:
         logger.error(f"BuiltWith detection failed for {url}: {e}")
         result["error"] = f"BuiltWith detection failed: {str(e)}"
-
     return result
@@ -1,9 +1,15 @@
 # modules/whois_lookup.py
 
 try:
+    import threading
+    import ipaddress
     import whois  # from python-whois
     from ipwhois import IPWhois
-    from ipwhois.exceptions import IPDefinedError
+    from ipwhois.exceptions import IPDefinedError, HTTPRateLimitError
+    from utils.scheduler import get_scheduler
+    from utils.shared_work import get_shared_work
+    from utils.deadline import budget, check_deadline
+    from utils.hedging import get_hedger
 except ImportError as e:
     from utils.logger import logger
     logger.error(f"Missing dependency: {e}. Please install required modules.")
@@ -11,6 +17,95 @@ except ImportError as e:
 from utils.logger import logger
 
 
+class PrefixCache:
+    """
+    Longest-prefix-match cache of RDAP network data. Entries are stored per
+    (IP version, prefix length) in a dict keyed by the network address, so a
+    lookup is one hash probe per distinct prefix length seen so far.
+    """
+
+    def __init__(self):
+        self._tables = {}
+        self._lengths = {4: [], 6: []}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def add(self, cidr: str, data: dict) -> None:
+        network = ipaddress.ip_network(cidr.strip(), strict=False)
+        key = (network.version, network.prefixlen)
+        with self._lock:
+            if key not in self._tables:
+                self._tables[key] = {}
+                lengths = self._lengths[network.version]
+                lengths.append(network.prefixlen)
+                lengths.sort(reverse=True)
+            self._tables[key][int(network.network_address)] = data
+
+    def lookup(self, ip_address: str) -> dict | None:
+        address = ipaddress.ip_address(ip_address)
+        bits = address.max_prefixlen
+        value = int(address)
+        with self._lock:
+            for prefixlen in self._lengths[address.version]:
+                mask = ((1 << prefixlen) - 1) << (bits - prefixlen) if prefixlen else 0
+                data = self._tables[(address.version, prefixlen)].get(value & mask)
+                if data is not None:
+                    self.hits += 1
+                    return data
+            self.misses += 1
+        return None
+
+
+_rdap_cache = PrefixCache()
+RDAP_TIMEOUT = 5
+
+
+def get_rdap_cache() -> PrefixCache:
+    return _rdap_cache
+
+
+def lookup_ip_rdap(ip_address: str) -> dict:
+    """
+    RDAP lookup for an IP, answered locally when the address falls inside a
+    network an earlier lookup already returned. The kept fields describe the
+    allocated network, so every address in it shares one registry query.
+
+    Args:
+        ip_address (str): IP address to look up.
+
+    Returns:
+        dict: asn, asn_description, network_name and country for the network.
+    """
+    cached = _rdap_cache.lookup(ip_address)
+    if cached is not None:
+        return cached
+
+    # RDAP is idempotent, so a slow query may be hedged. Each attempt goes
+    # through the scheduler on its own and takes its own token. No coalescing
+    # key: it would fold the duplicate into the first attempt, and
+    # utils.shared_work already shares one lookup per IP.
+    ip_data = get_hedger().call("rdap", lambda: get_scheduler().call(
+        "rdap", lambda: IPWhois(ip_address, timeout=budget(RDAP_TIMEOUT)).lookup_rdap(),
+        throttle_on=(HTTPRateLimitError,)))
+    network = ip_data.get('network') or {}
+    data = {
+        'asn': ip_data.get('asn'),
+        'asn_description': ip_data.get('asn_description'),
+        'network_name': network.get('name'),
+        'country': network.get('country'),
+    }
+
+    # Registries may return several CIDRs for one allocation ("a/24, b/23")
+    for cidr in (network.get('cidr') or ip_data.get('asn_cidr') or '').split(','):
+        if cidr.strip():
+            try:
+                _rdap_cache.add(cidr, data)
+            except ValueError:
+                logger.debug(f"Ignoring unparsable RDAP CIDR {cidr!r}")
+    return data
+
+
 def perform_whois_lookup(target: str, ip_address: str) -> dict:
     """
     Performs WHOIS lookup for both domain and IP address.
@@ -29,7 +124,11 @@ def perform_whois_lookup(target: str, ip_address: str) -> dict:
 
     # --- Domain WHOIS Lookup ---
     try:
-        w = whois.whois(target)
+        # WHOIS servers are per TLD, so each TLD gets its own rate limit
+        tld = target.rstrip(".").rsplit(".", 1)[-1].lower()
+        # python-whois takes no timeout; at least do not start once the budget is spent
+        check_deadline("WHOIS")
+        w = get_scheduler().call(f"whois:{tld}", lambda: whois.whois(target), key=target.lower())
 
         # Normalize date fields
         def get_date(d):
@@ -50,16 +149,9 @@ def perform_whois_lookup(target: str, ip_address: str) -> dict:
     # --- IP WHOIS Lookup ---
     try:
         if ip_address:
-            ip_info = IPWhois(ip_address)
-            ip_data = ip_info.lookup_rdap()
-
-            results['ip'] = {
-                'asn': ip_data.get('asn'),
-                'asn_description': ip_data.get('asn_description'),
-                'network_name': ip_data.get('network', {}).get('name'),
-                'country': ip_data.get('network', {}).get('country'),
-                'ip_address': ip_address
-            }
+            # Once per address, however many hostnames share it
+            rdap = get_shared_work().run("rdap", ip_address, lambda: lookup_ip_rdap(ip_address))
+            results['ip'] = dict(rdap, ip_address=ip_address)
         else:
             logger.warning("No IP address provided for WHOIS lookup.")
             results['ip'] = {"error": "No IP address provided for lookup."}
@@ -1,20 +1,42 @@
 # recon.py (minimal console with cool progress)
 import os
+import sys
+import json
+import time
+import sqlite3
 import argparse
-from urllib.parse import urlparse
+import tempfile
+from functools import partial
 from rich.console import Console
 from rich.panel import Panel
 from rich.progress import Progress, SpinnerColumn, BarColumn, TextColumn, TimeElapsedColumn
 
 from modules.input_handler import detect_input_type
-from modules.whois_lookup import perform_whois_lookup
-from modules.dns_lookup import get_dns_records
-from modules.port_scan import run_nmap_scan
-from modules.http_info import fetch_http_info
-from modules.tech_stack import detect_tech_stack
-from modules.geoip_lookup import get_geoip_info
-from modules.report_generator import generate_html_report
-from modules.json_export import export_json
+from modules.report_generator import generate_html_report, generate_multi_target_report, iter_ndjson_records
+from modules.json_export import export_json, export_tables, NDJSONWriter, TABLE_FORMATS
+from modules.pipeline import run_modules, select_modules, build_task_map, scan_options_from_args, DEFAULT_WORKERS
+from modules.batch import iter_targets, run_batch, DEFAULT_CONCURRENCY
+from modules.port_scan import DEFAULT_PORTS, configure_nmap_batching, get_nmap_batcher
+from modules.port_scan import DEFAULT_CONCURRENCY as DEFAULT_SCAN_CONCURRENCY, DEFAULT_TIMEOUT as DEFAULT_SCAN_TIMEOUT
+from modules.geoip_offline import configure_offline_geoip
+from modules.rescan import rescan_modules, rescan_target, parse_max_ages, format_change
+from modules.subdomains import DEFAULT_QPS as DEFAULT_SUB_QPS, DEFAULT_CONCURRENCY as DEFAULT_SUB_CONCURRENCY
+from utils.cache import configure_cache, DEFAULT_CACHE_PATH
+from utils.metrics import configure_metrics, get_metrics
+from utils.snapshots import configure_snapshots, DEFAULT_SNAPSHOT_PATH
+from utils.journal import configure_journal, DEFAULT_JOURNAL_PATH
+from utils.scheduler import configure_scheduler, parse_rates
+from utils.shared_work import get_shared_work
+from utils.results_store import configure_results_store, get_results_store, DEFAULT_RESULTS_PATH
+from utils.deadline import configure_budgets, target_scope, get_run_deadline
+from utils.hedging import configure_hedging
+
+# Mirrors modules.http_info, which imports requests
+DEFAULT_HTTP_MAX_BYTES = 256 * 1024
+DEFAULT_HTTP_MAX_REDIRECTS = 5
+
+# Modules that go through utils.http_client; the HTTP stack is only imported when one is selected
+HTTP_MODULES = {"http", "tech", "geoip", "builtwith"}
 
 console = Console()
 
@@ -26,52 +48,399 @@ def banner():
 
 def parse_arguments():
     parser = argparse.ArgumentParser(description="Rapid-Recon: Domain/IP/URL Info Gathering Tool")
-    parser.add_argument("target", help="Target domain, IP address, or URL")
+    parser.add_argument("target", nargs="?", help="Target domain, IP address, or URL")
+    parser.add_argument("--targets", type=str, help="Batch mode: file with one target per line ('-' reads stdin)")
     parser.add_argument("--scan-ports", action="store_true", help="Run Nmap port scan")
+    parser.add_argument("--scan-mode", choices=["nmap", "tiered", "connect"], default="nmap", help="Port scan engine: full nmap scan, two-phase nmap scan (discovery then detection on open ports) or fast asyncio TCP connect scan (default: nmap)")
+    parser.add_argument("--ports", type=str, default=DEFAULT_PORTS, help=f"Ports to scan, e.g. 22,80,8000-8100 or 1-65535 (default: {DEFAULT_PORTS})")
+    parser.add_argument("--scan-concurrency", type=int, default=DEFAULT_SCAN_CONCURRENCY, help=f"Connect scan: simultaneous connection attempts (default: {DEFAULT_SCAN_CONCURRENCY})")
+    parser.add_argument("--scan-timeout", type=float, default=DEFAULT_SCAN_TIMEOUT, help=f"Connect scan: per-connection timeout in seconds (default: {DEFAULT_SCAN_TIMEOUT})")
     parser.add_argument("--skip-whois", action="store_true", help="Skip WHOIS lookups")
     parser.add_argument("--dns", action="store_true", help="Fetch DNS records")
     parser.add_argument("--http-info", action="store_true", help="Fetch HTTP headers/status")
-    parser.add_argument("--tech-stack", action="store_true", help="Detect web technologies using BuiltWith")
+    parser.add_argument("--http-ports", type=str, help="HTTP info: also probe http:// and https:// on the default and these alternate ports concurrently, e.g. 8080,8443")
+    parser.add_argument("--http-max-bytes", type=int, default=DEFAULT_HTTP_MAX_BYTES, help=f"HTTP: stop reading a response body after this many bytes (default: {DEFAULT_HTTP_MAX_BYTES})")
+    parser.add_argument("--http-max-redirects", type=int, default=DEFAULT_HTTP_MAX_REDIRECTS, help=f"HTTP: redirect hops followed before giving up (default: {DEFAULT_HTTP_MAX_REDIRECTS})")
+    parser.add_argument("--tech-stack", action="store_true", help="Detect web technologies from the HTTP response")
     parser.add_argument("--geoip", action="store_true", help="Get geolocation from IPInfo")
     parser.add_argument("--all", action="store_true", help="Run all scans")
+    parser.add_argument("--module", dest="modules", action="append", metavar="NAME", help="Also run a registered plugin scanner (repeatable)")
     parser.add_argument("--output", type=str, default="output/report.html", help="HTML output path (default: output/report.html)")
     parser.add_argument("--json", action="store_true", help="Also save raw data as JSON")
-    return parser.parse_args()
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help=f"Number of modules to run concurrently (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--ndjson", type=str, default="output/results.ndjson", help="Batch mode NDJSON output path; a .gz or .zst suffix compresses it (default: output/results.ndjson)")
+    parser.add_argument("--tables", type=str, metavar="DIR", help="Batch mode: also flatten open ports and DNS records into one table each (ports/dns) in this directory")
+    parser.add_argument("--table-format", choices=TABLE_FORMATS, default="csv", help="Format of --tables: CSV (compressed like --ndjson) or Arrow IPC files, which need pyarrow (default: csv)")
+    parser.add_argument("--batch-report", type=str, help="Batch mode: render an index page plus one HTML page per target into this directory")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help=f"Batch mode: targets scanned in parallel (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--cache-path", type=str, default=DEFAULT_CACHE_PATH, help=f"Result cache database (default: {DEFAULT_CACHE_PATH})")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the result cache entirely")
+    parser.add_argument("--refresh", action="store_true", help="Ignore cached results but store fresh ones")
+    parser.add_argument("--http-retries", type=int, default=2, help="Retries with backoff for HTTP lookups (default: 2)")
+    parser.add_argument("--http-per-host", type=int, default=10, help="Maximum pooled connections per HTTP host (default: 10)")
+    parser.add_argument("--geoip-db", type=str, default=os.getenv("GEOIP_DB"), help="Offline GeoIP/ASN database (.mmdb, .csv ranges or compiled .idx); ipinfo.io is only used as fallback (default: $GEOIP_DB)")
+    parser.add_argument("--metrics", type=str, help="Write per-module timing/resource metrics as JSON to this path")
+    parser.add_argument("--prometheus", type=str, help="Write per-module metrics in Prometheus text format to this path")
+    parser.add_argument("--profile", type=str, help="Profile the whole run with cProfile and save stats to this path")
+    parser.add_argument("--rescan", action="store_true", help="Incremental mode: only rerun modules whose snapshot is older than its max age and report what changed")
+    parser.add_argument("--snapshots", type=str, default=DEFAULT_SNAPSHOT_PATH, help=f"Rescan snapshot database (default: {DEFAULT_SNAPSHOT_PATH})")
+    parser.add_argument("--max-age", dest="max_age", action="append", metavar="MODULE=HOURS", help="Rescan: override a module's snapshot max age, e.g. ports=12 (repeatable)")
+    parser.add_argument("--changes", type=str, default="output/changes.ndjson", help="Rescan: append one change set line per changed target to this file (default: output/changes.ndjson)")
+    parser.add_argument("--journal", type=str, default=DEFAULT_JOURNAL_PATH, help=f"Write-ahead journal of finished (target, module) results (default: {DEFAULT_JOURNAL_PATH})")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted run from --journal: skip finished work and rebuild the outputs")
+    parser.add_argument("--no-journal", action="store_true", help="Do not keep a journal (runs cannot be resumed)")
+    parser.add_argument("--rate", dest="rates", action="append", metavar="PROVIDER=RPS[:BURST]", help="Override a provider's request rate, e.g. ipinfo=50:100 or rdap=1 (repeatable; providers: ipinfo, rdap, whois, builtwith)")
+    parser.add_argument("--queue", type=str, help="Batch mode: run through a SQLite job queue at this path with worker processes instead of threads in one process")
+    parser.add_argument("--procs", type=int, default=os.cpu_count() or 1, help="Queue mode: local worker processes (default: CPU count; 0 = remote workers only)")
+    parser.add_argument("--worker-threads", type=int, default=8, help="Queue mode: jobs each worker process runs concurrently (default: 8)")
+    parser.add_argument("--broker", type=str, metavar="HOST:PORT", help="Queue mode: also serve the queue over TCP so workers on other machines can join; any address but loopback needs --broker-token")
+    parser.add_argument("--broker-token", type=str, default=os.getenv("RECON_BROKER_TOKEN"), help="Shared secret between broker and remote workers (default: $RECON_BROKER_TOKEN)")
+    parser.add_argument("--store", type=str, default=DEFAULT_RESULTS_PATH, help=f"Indexed results database every run writes into; search it with 'recon.py query' (default: {DEFAULT_RESULTS_PATH})")
+    parser.add_argument("--no-store", action="store_true", help="Do not write results into --store")
+    parser.add_argument("--worker", type=str, metavar="QUEUE", help="Run only as a worker for a queue path or tcp://host:port broker, then exit")
+    parser.add_argument("--subdomains", type=str, metavar="WORDLIST", help="Brute-force subdomains of the target domain(s) from this wordlist and scan every host found as it is discovered (batch mode)")
+    parser.add_argument("--sub-qps", type=float, default=DEFAULT_SUB_QPS, help=f"Subdomains: DNS queries per second (default: {DEFAULT_SUB_QPS})")
+    parser.add_argument("--sub-concurrency", type=int, default=DEFAULT_SUB_CONCURRENCY, help=f"Subdomains: DNS queries in flight (default: {DEFAULT_SUB_CONCURRENCY})")
+    parser.add_argument("--target-budget", type=float, metavar="SECONDS", help="Time budget per target: module timeouts are clipped to what is left and unfinished modules are reported as timed out (default: unlimited)")
+    parser.add_argument("--run-budget", type=float, metavar="SECONDS", help="Time budget for the whole run: no new targets start once it is spent; --resume continues later (default: unlimited)")
+    parser.add_argument("--hedge", type=float, nargs="?", const=95.0, metavar="PCT", help="Send a duplicate DNS/RDAP lookup when one is slower than this latency percentile of recent lookups and keep the first answer (default: off; PCT defaults to 95)")
+    args = parser.parse_args()
+    if not args.target and not args.targets and not args.worker:
+        parser.error("a target or --targets is required")
+    if args.queue and args.rescan:
+        parser.error("--rescan is not supported together with --queue")
+    if args.broker:
+        from utils.job_queue import is_loopback
+        host = args.broker.rpartition(":")[0] or "0.0.0.0"
+        if not args.broker_token and not is_loopback(host):
+            parser.error(f"--broker on {host} needs --broker-token (or $RECON_BROKER_TOKEN); "
+                         "without one anyone who can reach the port can claim and complete jobs")
+    if args.hedge is not None and not 0 < args.hedge < 100:
+        parser.error("--hedge: percentile must be between 0 and 100")
+    try:
+        args.max_ages = parse_max_ages(args.max_age)
+    except ValueError as e:
+        parser.error(f"--max-age: {e}")
+    try:
+        args.policies = parse_rates(args.rates)
+    except ValueError as e:
+        parser.error(f"--rate: {e}")
+    return args
+
+def print_cache_stats(cache):
+    if not cache.enabled or not cache.stats:
+        return
+    summary = ", ".join(f"{module} {c['hits']}/{c['hits'] + c['misses']}" for module, c in cache.stats.items())
+    console.print(f"[bold cyan]🗃️  Cache hits:[/bold cyan] {summary}")
+
+def print_scheduler_stats(scheduler):
+    stats = {name: s for name, s in scheduler.stats().items() if s["calls"]}
+    if not stats:
+        return
+    summary = ", ".join(
+        f"{name} {s['calls']} calls/{s['throttled']} throttled/{s['coalesced']} coalesced (window {s['window']})"
+        for name, s in stats.items())
+    console.print(f"[bold cyan]🚦 Providers:[/bold cyan] {summary}")
+
+def print_shared_stats(shared):
+    stats = {module: s for module, s in shared.stats.items() if s["shared"]}
+    if not stats:
+        return
+    summary = ", ".join(f"{module} {s['runs']} runs/{s['shared']} shared" for module, s in stats.items())
+    console.print(f"[bold cyan]🧬 Per-IP work reused:[/bold cyan] {summary}")
+
+def print_nmap_stats(batcher):
+    if batcher.stats["runs"]:
+        console.print(f"[bold cyan]🛰️  Nmap batches:[/bold cyan] {batcher.stats['hosts']} hosts in "
+                      f"{batcher.stats['runs']} runs")
+
+def print_hedge_stats(hedger):
+    stats = {op: s for op, s in hedger.stats.items() if s["hedged"]}
+    if not stats:
+        return
+    summary = ", ".join(f"{op} {s['hedged']}/{s['calls']} hedged ({s['hedge_won']} won)" for op, s in stats.items())
+    console.print(f"[bold cyan]🏁 Hedged lookups:[/bold cyan] {summary}")
+
+def print_http_stats(client):
+    if client is None:
+        return
+    stats = client.stats()
+    if stats["requests"]:
+        console.print(f"[bold cyan]🔌 HTTP connections:[/bold cyan] {stats['requests']} requests over "
+                      f"{stats['connections']} connections ({stats['reused']} reused)")
+
+def change_set_line(target, ip_address, rescanned, changes):
+    return json.dumps({"target": target, "ip": ip_address, "rescanned": rescanned, "changes": changes},
+                      ensure_ascii=False, default=str) + "\n"
+
+def print_changes(changes):
+    if not changes:
+        console.print("[bold green]🟰 No changes since the last snapshot[/bold green]")
+        return
+    console.print(f"[bold magenta]🔀 {len(changes)} change(s) since the last snapshot:[/bold magenta]")
+    for change in changes:
+        console.print(f"  • {format_change(change)}")
+
+def iter_scan_targets(args):
+    """Batch targets: --targets as given or, with --subdomains, each domain followed by its discovered hosts."""
+    if not args.subdomains:
+        return iter_targets(args.targets)
+    from modules.subdomains import iter_subdomains, iter_wordlist
+    domains = iter_targets(args.targets) if args.targets else [args.target]
+    return iter_subdomains(domains, lambda: iter_wordlist(args.subdomains),
+                           qps=args.sub_qps, concurrency=args.sub_concurrency)
+
+def run_distributed(args, enabled, on_record):
+    from modules.distributed import configure_queue, coordinate, spawn_workers
+    from utils.job_queue import JobQueue, BrokerServer
+
+    resume = args.resume and os.path.exists(args.queue)
+    if not resume:
+        # A fresh run starts from an empty queue
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(args.queue + suffix):
+                os.remove(args.queue + suffix)
+    queue = JobQueue(args.queue)
+    # Workers read the run settings once when they start, so they go in before any worker exists
+    configure_queue(queue, scan_options_from_args(args), resume=resume)
+    broker = None
+    if args.broker:
+        host, _, port = args.broker.rpartition(":")
+        broker = BrokerServer(queue, host or "0.0.0.0", int(port), args.broker_token).start()
+        console.print(f"[bold cyan]🛰️  Broker listening on {args.broker}; join with:[/bold cyan] "
+                      f"python recon.py --worker tcp://<this-host>:{port}")
+
+    workers = spawn_workers(args.queue, args.procs, args.worker_threads,
+                            cache_path=None if args.no_cache else args.cache_path, geoip_db=args.geoip_db,
+                            rates=args.rates)
+    try:
+        return coordinate(queue, iter_scan_targets(args), enabled, args.ndjson, resume=resume,
+                          workers=workers, remote=broker is not None, on_record=on_record)
+    finally:
+        if broker:
+            broker.shutdown()
+        for worker in workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+        queue.close()
+
+def batch_main(args):
+    enabled = [key for key, on in select_modules(args).items() if on]
+    console.print(f"[bold yellow]📦 Batch mode:[/bold yellow] {', '.join(enabled)} → {args.ndjson}")
+
+    # args.ndjson keeps the records of earlier runs; --tables and --batch-report read this run's from a spill file
+    run_records = None
+    if args.tables or args.batch_report:
+        directory = os.path.dirname(os.path.abspath(args.ndjson))
+        os.makedirs(directory, exist_ok=True)
+        fd, run_records_path = tempfile.mkstemp(prefix=".run-", suffix=".ndjson", dir=directory)
+        os.close(fd)
+        run_records = NDJSONWriter(run_records_path, append=False)
+    try:
+        stats = scan_batch(args, enabled, run_records)
+    finally:
+        if run_records:
+            run_records.close()
+
+    console.print(f"[bold green]✅ {stats['targets']} targets in {stats['elapsed']:.1f}s "
+                  f"({stats['targets_per_sec']:.2f} targets/s, {stats['invalid']} invalid)[/bold green]")
+    if stats.get("resumed"):
+        console.print(f"[bold cyan]⏯️  {stats['resumed']} targets restored from the journal[/bold cyan]")
+    console.print(f"[bold blue]📁 NDJSON results saved to:[/bold blue] {args.ndjson}")
+
+    try:
+        if args.tables:
+            try:
+                compress = next((ext for ext in ("gz", "zst") if args.ndjson.endswith("." + ext)), None)
+                counts = export_tables(iter_ndjson_records(run_records.path), args.tables, args.table_format, compress)
+                console.print(f"[bold blue]📊 Tables ({', '.join(f'{name} {rows} rows' for name, rows in counts.items())}) "
+                              f"saved to:[/bold blue] {args.tables}")
+            except Exception as e:
+                console.print(f"[red]❌ Failed to export tables: {e}[/red]")
+
+        if args.batch_report:
+            try:
+                console.print("\n[bold yellow]📄 Generating multi-target HTML report...[/bold yellow]")
+                pages = generate_multi_target_report(iter_ndjson_records(run_records.path), args.batch_report)
+                console.print(f"[bold green]✅ {pages} target pages + index saved to:[/bold green] {args.batch_report}")
+            except Exception as e:
+                console.print(f"[red]❌ Failed to generate multi-target report: {e}[/red]")
+    finally:
+        if run_records:
+            os.remove(run_records.path)
+
+def scan_batch(args, enabled, run_records=None):
+    """Runs the batch with a progress spinner; every record is also written to run_records when given."""
+
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[bold blue]{task.description}"),
+        TimeElapsedColumn(),
+        transient=True
+    ) as progress:
+        task_id = progress.add_task("🎯 Scanning targets (0 done)", total=None)
+        changed = 0
+        changes_out = None
+        if args.rescan:
+            os.makedirs(os.path.dirname(os.path.abspath(args.changes)), exist_ok=True)
+            changes_out = open(args.changes, "a", encoding="utf-8")
+
+        def on_record(record, done):
+            nonlocal changed
+            get_results_store().add(record)
+            if changes_out and record.get("changes"):
+                changed += 1
+                changes_out.write(change_set_line(record["target"], record.get("ip"),
+                                                  record["rescanned"], record["changes"]))
+                changes_out.flush()
+            if run_records:
+                run_records.write(record)
+            progress.update(task_id, description=f"🎯 Scanning targets ({done} done)")
+
+        try:
+            if args.queue:
+                stats = run_distributed(args, enabled, on_record)
+            else:
+                stats = run_batch(iter_scan_targets(args), enabled, args.ndjson,
+                                  concurrency=args.concurrency, module_workers=args.workers,
+                                  on_record=on_record, scan_options=scan_options_from_args(args),
+                                  scanner=partial(rescan_target, max_ages=args.max_ages) if args.rescan else None)
+        finally:
+            if changes_out:
+                changes_out.close()
+
+    if args.rescan:
+        console.print(f"[bold magenta]🔀 {changed} target(s) changed since the last snapshot →[/bold magenta] {args.changes}")
+    return stats
+
+def export_metrics(args, metrics):
+    try:
+        if args.metrics:
+            metrics.export_json(args.metrics)
+            console.print(f"[bold blue]📈 Metrics saved to:[/bold blue] {args.metrics}")
+        if args.prometheus:
+            metrics.export_prometheus(args.prometheus)
+            console.print(f"[bold blue]📈 Prometheus metrics saved to:[/bold blue] {args.prometheus}")
+    except Exception as e:
+        console.print(f"[red]❌ Failed to export metrics: {e}[/red]")
+
+def query_main(argv):
+    from utils.results_store import query_targets, run_query
+    parser = argparse.ArgumentParser(prog="recon.py query", description="Search the indexed results store")
+    parser.add_argument("--store", type=str, default=DEFAULT_RESULTS_PATH, help=f"Results database (default: {DEFAULT_RESULTS_PATH})")
+    parser.add_argument("--port", type=int, help="Targets with this port open, e.g. 3389")
+    parser.add_argument("--service", type=str, help="Targets with an open port running this service, e.g. ssh")
+    parser.add_argument("--tech", type=str, help="Targets running this technology, e.g. WordPress")
+    parser.add_argument("--asn", type=str, help="Targets in this autonomous system, e.g. AS13335 or 13335")
+    parser.add_argument("--country", type=str, help="Targets geolocated to this country code, e.g. DE")
+    parser.add_argument("--dns", type=str, help="Targets with this DNS record value, e.g. an IP or mail host")
+    parser.add_argument("--registrar", type=str, help="Domains whose registrar name contains this text")
+    parser.add_argument("--expires-before", type=str, metavar="YYYY-MM-DD", help="Domains whose registration expires before this date")
+    parser.add_argument("--sql", type=str, help="Run this read-only SQL statement instead (tables: targets, ports, dns, tech, network, whois)")
+    parser.add_argument("--limit", type=int, help="Maximum rows printed")
+    parser.add_argument("--json", action="store_true", help="Print one JSON object per row instead of tab-separated columns")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    try:
+        if args.sql:
+            rows = run_query(args.store, args.sql)
+            rows = rows[:args.limit] if args.limit else rows
+            columns = None
+        else:
+            rows = query_targets(args.store, limit=args.limit, port=args.port, service=args.service, tech=args.tech,
+                                 asn=args.asn, country=args.country, dns=args.dns, registrar=args.registrar,
+                                 expires_before=args.expires_before)
+            columns = ("target", "ip", "scanned_at")
+    except (FileNotFoundError, ValueError, sqlite3.Error) as e:
+        console.print(f"[red]❌ Query failed: {e}[/red]", highlight=False)
+        sys.exit(1)
+    elapsed_ms = (time.perf_counter() - started) * 1000
 
-def normalize_url(url):
-    parsed = urlparse(url)
-    return url if parsed.scheme else "https://" + url
+    for row in rows:
+        if args.json:
+            print(json.dumps(dict(zip(columns, row)) if columns else list(row), ensure_ascii=False, default=str))
+        else:
+            print("\t".join("" if value is None else str(value) for value in row))
+    # Summary on stderr keeps stdout pipeable
+    Console(stderr=True).print(f"[bold cyan]🔎 {len(rows)} row(s) in {elapsed_ms:.1f} ms[/bold cyan]")
 
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "query":
+        query_main(sys.argv[2:])
+        return
     banner()
     args = parse_arguments()
+
+    if args.profile:
+        import cProfile
+        import pstats
+        profiler = cProfile.Profile()
+        try:
+            profiler.runcall(run, args)
+        finally:
+            # Merge the main-thread profile with the per-module worker profiles
+            stats = pstats.Stats(profiler)
+            for worker_profile in get_metrics().profiles:
+                stats.add(worker_profile)
+            stats.dump_stats(args.profile)
+            stats.sort_stats("cumulative").print_stats(15)
+            console.print(f"[bold blue]🔬 Profile saved to:[/bold blue] {args.profile}")
+    else:
+        run(args)
+    # Writes whatever the store still has queued
+    get_results_store().close()
+
+def run(args):
     os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    cache = configure_cache(args.cache_path, enabled=not args.no_cache, refresh=args.refresh)
+    metrics = configure_metrics(enabled=bool(args.metrics or args.prometheus), profile=bool(args.profile))
+    http_client = None
+    if HTTP_MODULES & {key for key, on in select_modules(args).items() if on}:
+        from utils.http_client import configure_http_client
+        http_client = configure_http_client(retries=args.http_retries, per_host=args.http_per_host)
+    configure_offline_geoip(args.geoip_db)
+    scheduler = configure_scheduler(args.policies)
+    configure_budgets(args.target_budget, args.run_budget)
+    hedger = configure_hedging(args.hedge)
+    if args.worker:
+        from modules.distributed import worker_process
+        console.print(f"[bold yellow]🛠️  Worker for {args.worker} ({args.worker_threads} threads)[/bold yellow]")
+        worker_process(args.worker, args.worker_threads, args.broker_token,
+                       cache_path=None if args.no_cache else args.cache_path, geoip_db=args.geoip_db,
+                       rates=args.rates)
+        return
+    if args.rescan:
+        configure_snapshots(args.snapshots)
+    store = configure_results_store(args.store, enabled=not args.no_store)
+    journal = configure_journal(args.journal, resume=args.resume, enabled=not args.no_journal)
+    if args.resume and not journal.resumed:
+        console.print(f"[yellow]⚠️  No journal at {args.journal}; starting from scratch[/yellow]")
+
+    if args.targets or args.subdomains:
+        if not args.queue:
+            # Targets in flight share nmap runs instead of starting one process each
+            configure_nmap_batching(batch_size=args.concurrency)
+        batch_main(args)
+        print_nmap_stats(get_nmap_batcher())
+        print_cache_stats(cache)
+        print_scheduler_stats(scheduler)
+        print_shared_stats(get_shared_work())
+        print_hedge_stats(hedger)
+        print_http_stats(http_client)
+        export_metrics(args, metrics)
+        if get_run_deadline().expired:
+            console.print("[yellow]⚠️  Run budget spent; rerun with --resume to scan the remaining targets[/yellow]")
+        return
 
     input_type, cleaned_input, ip_address = detect_input_type(args.target)
     if input_type == "unknown":
         console.print("[bold red]❌ Invalid input. Please provide a valid IP, domain, or URL.[/bold red]")
         return
 
-    results = {}
-    selected_modules = {
-        "whois": not args.skip_whois and (args.all or not any([
-            args.scan_ports, args.dns, args.http_info, args.tech_stack, args.geoip
-        ])),
-        "dns": args.all or args.dns,
-        "ports": args.all or args.scan_ports,
-        "http": args.all or args.http_info,
-        "tech": args.all or args.tech_stack,
-        "geoip": args.all or args.geoip,
-    }
-
-    task_map = {
-        "whois": ("🔍 Performing WHOIS Lookup", lambda: perform_whois_lookup(cleaned_input, ip_address)),
-        "dns": ("🌐 Fetching DNS Records", lambda: get_dns_records(cleaned_input)),
-        "ports": ("🚪 Scanning Ports", lambda: run_nmap_scan(ip_address) if ip_address else None),
-        "http": ("📡 Fetching HTTP Info", lambda: fetch_http_info(normalize_url(args.target))),
-        "tech": ("🧠 Detecting Technology Stack", lambda: detect_tech_stack(normalize_url(args.target))),
-        "geoip": ("🌍 Retrieving Geolocation", lambda: get_geoip_info(ip_address) if ip_address else None),
-    }
+    selected_modules = select_modules(args)
+    task_map = build_task_map(args.target, cleaned_input, ip_address, scan_options_from_args(args))
 
     with Progress(
         SpinnerColumn(),
@@ -80,20 +449,38 @@ def main():
         TimeElapsedColumn(),
         transient=True
     ) as progress:
-        for key, enabled in selected_modules.items():
-            if not enabled:
-                continue
+        task_ids = {}
 
-            task_desc, task_func = task_map[key]
-            task_id = progress.add_task(task_desc, total=None)
+        def on_start(key, task_desc):
+            task_ids[key] = progress.add_task(task_desc, total=None)
 
-            try:
-                res = task_func()
-                results[key] = res
-            except Exception as e:
-                console.print(f"[red]❌ {key} scan failed: {e}[/red]")
-            finally:
-                progress.update(task_id, completed=1)
+        def on_done(key, res, error):
+            if error is not None:
+                console.print(f"[red]❌ {key} scan failed: {error}[/red]")
+            progress.update(task_ids[key], total=1, completed=1)
+
+        enabled = [key for key, on in selected_modules.items() if on]
+        with target_scope():
+            if args.rescan:
+                results, rescanned, changes = rescan_modules(
+                    args.target, cleaned_input, ip_address, enabled, args.workers,
+                    scan_options_from_args(args), args.max_ages, on_start=on_start, on_done=on_done)
+            else:
+                results = run_modules(task_map, enabled, args.workers, on_start, on_done,
+                                      journal=journal, journal_key=args.target)
+
+    store.add({"target": args.target, "input_type": input_type, "ip": ip_address, "results": results})
+
+    if args.rescan:
+        skipped = [key for key in enabled if key not in rescanned]
+        if skipped:
+            console.print(f"[bold cyan]🗂️  Reused snapshots:[/bold cyan] {', '.join(skipped)}")
+        print_changes(changes)
+        if changes:
+            os.makedirs(os.path.dirname(os.path.abspath(args.changes)), exist_ok=True)
+            with open(args.changes, "a", encoding="utf-8") as f:
+                f.write(change_set_line(args.target, ip_address, rescanned, changes))
+            console.print(f"[bold blue]📁 Change set appended to:[/bold blue] {args.changes}")
 
     # Generate HTML report
     try:
@@ -111,6 +498,12 @@ def main():
         except Exception as e:
             console.print(f"[red]❌ Failed to export JSON: {e}[/red]")
 
+    print_cache_stats(cache)
+    print_scheduler_stats(scheduler)
+    print_shared_stats(get_shared_work())
+    print_hedge_stats(hedger)
+    print_http_stats(http_client)
+    export_metrics(args, metrics)
     console.print("\n[bold green]🎯 Recon complete. Enjoy your insights![/bold green]")
 
 if __name__ == "__main__":
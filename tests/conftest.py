@@ -0,0 +1,35 @@
+# tests/conftest.py
+#
+# Tests run against the local stand-ins in benchmarks.fake_services, never
+# the network.
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_services import StubDNSServer, start_in_thread, write_fake_nmap  # noqa: E402
+
+
+@pytest.fixture
+def dns_server():
+    """Factory for stub DNS servers (StubDNSServer keyword arguments); all are shut down afterwards."""
+    servers = []
+
+    def start(**options):
+        server = start_in_thread(StubDNSServer(**options))
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def fake_nmap(tmp_path):
+    """Path of an executable that replays nmap XML (22, 80 and 443 open) for the hosts it is given."""
+    return write_fake_nmap(str(tmp_path))
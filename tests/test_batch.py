@@ -0,0 +1,30 @@
+# tests/test_batch.py
+
+import time
+
+from modules.batch import run_batch
+from utils.journal import Journal, configure_journal
+
+
+def slow_scanner(target, selected, module_workers, scan_options):
+    time.sleep(0.2)
+    return {"target": target, "input_type": "domain", "ip": None, "results": {}}
+
+
+def test_resumed_records_do_not_count_towards_throughput(tmp_path):
+    path = str(tmp_path / "journal.ndjson")
+    journal = Journal(path)
+    done = [f"host{i}.test" for i in range(50)]
+    for target in done:
+        journal.finish(target, {"target": target, "input_type": "domain", "ip": None})
+    journal.close()
+
+    configure_journal(path, resume=True)
+    try:
+        stats = run_batch(done + ["new.test"], [], str(tmp_path / "results.ndjson"), scanner=slow_scanner)
+    finally:
+        configure_journal(enabled=False)
+    assert (stats["targets"], stats["resumed"]) == (51, 50)
+    # One target scanned in about 0.2 s
+    assert stats["targets_per_sec"] < 10
+    assert len((tmp_path / "results.ndjson").read_text().splitlines()) == 51
@@ -0,0 +1,84 @@
+# tests/test_cache.py
+
+import time
+
+import modules.dns_lookup as dns_lookup
+from modules.dns_lookup import get_dns_records_with_ttl, NEGATIVE_TTL
+from utils.cache import ResultCache
+
+
+def counting(result):
+    calls = []
+
+    def func():
+        calls.append(1)
+        return result
+    return func, calls
+
+
+def test_results_are_served_from_cache_until_the_ttl(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache.sqlite"), ttls={"whois": 0.3})
+    func, calls = counting({"registrar": "R"})
+    assert cache.cached("whois", "a.test", func) == {"registrar": "R"}
+    assert cache.cached("whois", "a.test", func) == {"registrar": "R"}
+    assert len(calls) == 1
+    assert cache.stats["whois"] == {"hits": 1, "misses": 1}
+    time.sleep(0.35)
+    cache.cached("whois", "a.test", func)
+    assert len(calls) == 2
+
+
+def test_errors_are_not_cached(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache.sqlite"))
+    func, calls = counting({"domain": {"error": "WHOIS lookup failed"}})
+    cache.cached("whois", "a.test", func)
+    cache.cached("whois", "a.test", func)
+    assert len(calls) == 2
+
+
+def test_data_ttls_are_capped_by_the_module_ttl(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache.sqlite"), ttls={"dns": 0.3})
+    func, calls = counting(({"A": ["10.0.0.1"]}, 86400))
+    assert cache.cached("dns", "a.test", func, ttl_func=lambda res: res) == {"A": ["10.0.0.1"]}
+    time.sleep(0.35)
+    cache.cached("dns", "a.test", func, ttl_func=lambda res: res)
+    assert len(calls) == 2
+
+
+def test_refresh_skips_reads_but_stores(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    ResultCache(path).set("geoip", "10.0.0.1", {"country": "DE"})
+    refreshing = ResultCache(path, refresh=True)
+    assert refreshing.cached("geoip", "10.0.0.1", lambda: {"country": "FR"}) == {"country": "FR"}
+    assert ResultCache(path).get("geoip", "10.0.0.1") == {"country": "FR"}
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache.sqlite"), max_bytes=2000)
+    for i in range(20):
+        cache.set("http", f"host{i}", {"body": "x" * 200})
+        cache.get("http", "host0")
+    assert cache.get("http", "host0") is not None
+    assert cache.get("http", "host1") is None
+    assert cache._size <= 2000
+
+
+def test_nxdomain_is_cached_with_the_negative_ttl(tmp_path, dns_server):
+    server = dns_server()
+    dns_lookup.configure_resolver(["127.0.0.1"], server.port)
+    cache = ResultCache(str(tmp_path / "cache.sqlite"))
+
+    def lookup():
+        return get_dns_records_with_ttl("gone.nx.bench.test", timeout=2.0)
+
+    try:
+        records, ttl = lookup()
+        assert ttl == NEGATIVE_TTL
+        assert all(values == [] for values in records.values())
+        queries = server.queries
+        for _ in range(2):
+            assert cache.cached("dns", "gone.nx.bench.test", lookup, ttl_func=lambda res: res) == records
+        # Only the first cached() call went to the resolver
+        assert server.queries == queries + len(records)
+    finally:
+        dns_lookup.configure_resolver()
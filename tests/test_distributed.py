@@ -0,0 +1,27 @@
+# tests/test_distributed.py
+
+import socket
+import threading
+
+from modules.distributed import configure_queue, coordinate, run_worker
+from utils.job_queue import JobQueue
+
+
+def test_workers_started_before_queueing_use_the_run_settings(tmp_path):
+    queue = JobQueue(str(tmp_path / "queue.sqlite"))
+    with socket.socket() as listener:
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(16)
+        port = listener.getsockname()[1]
+        configure_queue(queue, {"mode": "connect", "ports": str(port), "timeout": 1.0})
+        # The worker reads its settings before any target is queued
+        worker = threading.Thread(target=run_worker, args=(queue,), kwargs={"threads": 2}, daemon=True)
+        worker.start()
+        records = []
+        stats = coordinate(queue, ["127.0.0.1"], ["ports"], str(tmp_path / "results.ndjson"),
+                           on_record=lambda record, done: records.append(record), poll=0.05)
+        worker.join(timeout=10)
+    queue.close()
+
+    assert stats["targets"] == 1
+    assert list(records[0]["results"]["ports"]["open_ports"]["tcp"]) == [str(port)]
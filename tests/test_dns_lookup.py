@@ -0,0 +1,44 @@
+# tests/test_dns_lookup.py
+
+import time
+import asyncio
+
+import modules.dns_lookup as dns_lookup
+from modules.dns_lookup import get_async_resolver, get_dns_records_async, resolve_many, RECORD_TYPES
+
+
+def test_record_types_are_queried_in_parallel(dns_server):
+    server = dns_server(latency=0.2)
+    resolver = get_async_resolver(["127.0.0.1"], server.port)
+    started = time.perf_counter()
+    records = asyncio.run(get_dns_records_async("host.bench.test", resolver, timeout=2.0))
+    elapsed = time.perf_counter() - started
+    assert records["A"] == ["127.0.0.1"]
+    assert records["MX"] == ["10 mail.host.bench.test."]
+    assert set(records) == set(RECORD_TYPES)
+    # Sequential queries would take len(RECORD_TYPES) * 0.2 s
+    assert elapsed < 0.2 * len(RECORD_TYPES) / 2
+
+
+def test_resolve_many_batches_domains(dns_server):
+    server = dns_server()
+    domains = [f"host{i}.bench.test" for i in range(50)] + ["gone.nx.bench.test", "host0.bench.test"]
+    results = resolve_many(domains, concurrency=20, timeout=2.0, nameservers=["127.0.0.1"], port=server.port)
+    assert len(results) == 51
+    assert all(results[f"host{i}.bench.test"]["A"] == ["127.0.0.1"] for i in range(50))
+    assert all(values == [] for values in results["gone.nx.bench.test"].values())
+
+
+def test_resolver_is_shared_across_timeouts(dns_server):
+    server = dns_server()
+    dns_lookup.configure_resolver(["127.0.0.1"], server.port)
+    try:
+        resolver = get_async_resolver()
+        cached = len(dns_lookup._resolvers)
+        # Deadline-clipped timeouts differ per call and must not create resolvers
+        for timeout in (0.31, 0.72, 1.5):
+            assert asyncio.run(get_dns_records_async("host.bench.test", timeout=timeout))["A"] == ["127.0.0.1"]
+        assert get_async_resolver() is resolver
+        assert len(dns_lookup._resolvers) == cached
+    finally:
+        dns_lookup.configure_resolver()
@@ -0,0 +1,72 @@
+# tests/test_geoip_offline.py
+
+import os
+import time
+
+import pytest
+
+from modules.geoip_lookup import get_geoip_info
+from modules.geoip_offline import GeoIPIndex, compile_csv, configure_offline_geoip, open_index
+
+RANGES = """network,start,end,country,city,org
+10.0.0.0/24,,,DE,Berlin,AS64500 Example
+,10.0.1.0,10.0.1.127,FR,Paris,AS64501 Other
+,10.0.1.200,10.0.2.10,DE,Berlin,AS64500 Example
+2001:db8::/32,,,NL,Amsterdam,AS64502 Six
+"""
+
+
+@pytest.fixture
+def ranges_csv(tmp_path):
+    path = tmp_path / "ranges.csv"
+    path.write_text(RANGES)
+    return str(path)
+
+
+def test_lookups_hit_range_edges_and_miss_gaps(ranges_csv):
+    index = GeoIPIndex(compile_csv(ranges_csv))
+    try:
+        assert index.lookup("10.0.0.0")["city"] == "Berlin"
+        assert index.lookup("10.0.0.255")["country"] == "DE"
+        assert index.lookup("10.0.1.127") == {"ip": "10.0.1.127", "country": "FR", "city": "Paris",
+                                              "org": "AS64501 Other"}
+        assert index.lookup("10.0.1.128") is None
+        assert index.lookup("10.0.2.10")["city"] == "Berlin"
+        assert index.lookup("9.255.255.255") is None
+        assert index.lookup("2001:db8::1")["country"] == "NL"
+        assert index.lookup("2001:db9::1") is None
+        assert index.lookup("not-an-ip") is None
+        # Identical records are stored once
+        assert len(index.records) == 3
+    finally:
+        index.close()
+
+
+def test_csv_is_recompiled_only_when_newer(ranges_csv):
+    open_index(ranges_csv).close()
+    index_path = os.path.splitext(ranges_csv)[0] + ".idx"
+    compiled_at = os.path.getmtime(index_path)
+    open_index(ranges_csv).close()
+    assert os.path.getmtime(index_path) == compiled_at
+
+    later = time.time() + 10
+    with open(ranges_csv, "a") as f:
+        f.write("192.0.2.0/24,,,US,Reston,AS64503 Doc\n")
+    os.utime(ranges_csv, (later, later))
+    index = open_index(ranges_csv)
+    try:
+        assert index.lookup("192.0.2.7")["country"] == "US"
+    finally:
+        index.close()
+
+
+def test_offline_database_answers_before_ipinfo(ranges_csv, monkeypatch):
+    monkeypatch.delenv("IPINFO_TOKEN", raising=False)
+    monkeypatch.setattr("modules.geoip_lookup._env_loaded", True)
+    configure_offline_geoip(ranges_csv)
+    try:
+        assert get_geoip_info("10.0.0.9")["city"] == "Berlin"
+        # Uncovered addresses fall back to ipinfo.io, which needs a token
+        assert "IPINFO_TOKEN" in get_geoip_info("172.16.0.1")["error"]
+    finally:
+        configure_offline_geoip(None)
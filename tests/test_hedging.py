@@ -0,0 +1,103 @@
+# tests/test_hedging.py
+
+import time
+import asyncio
+import threading
+
+import pytest
+
+from utils.deadline import deadline_scope, current_deadline
+from utils.hedging import Hedger
+
+
+def attempts(*behaviours):
+    """func() whose n-th call sleeps behaviours[n][0] then returns or raises behaviours[n][1]."""
+    calls = []
+    lock = threading.Lock()
+
+    def func():
+        with lock:
+            delay, outcome = behaviours[len(calls)]
+            calls.append(delay)
+        time.sleep(delay)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+    return func, calls
+
+
+def warmed(seconds=0.05):
+    hedger = Hedger(min_samples=1)
+    hedger.record("rdap", seconds)
+    return hedger
+
+
+def test_delay_is_the_latency_percentile():
+    hedger = Hedger(percentile=90, min_samples=10)
+    for ms in range(1, 10):
+        hedger.record("dns", ms / 1000)
+    assert hedger.delay("dns") is None
+    hedger.record("dns", 1.0)
+    assert hedger.delay("dns") == 1.0
+    assert hedger.delay("rdap") is None
+
+
+def test_calls_are_not_hedged_without_enough_samples():
+    func, calls = attempts((0.1, "slow"))
+    hedger = Hedger(min_samples=1)
+    assert hedger.call("rdap", func) == "slow"
+    assert len(calls) == 1
+    assert hedger.stats["rdap"] == {"calls": 1, "hedged": 0, "hedge_won": 0}
+
+
+def test_slow_attempts_are_hedged_and_the_faster_one_wins():
+    func, calls = attempts((1.0, "first"), (0.0, "second"))
+    hedger = warmed(0.05)
+    started = time.monotonic()
+    assert hedger.call("rdap", func) == "second"
+    assert 0.05 <= time.monotonic() - started < 0.5
+    assert hedger.stats["rdap"] == {"calls": 1, "hedged": 1, "hedge_won": 1}
+
+
+def test_a_failed_hedge_does_not_beat_a_slow_success():
+    func, calls = attempts((0.3, "first"), (0.0, OSError("reset")))
+    hedger = warmed(0.05)
+    assert hedger.call("rdap", func) == "first"
+    assert hedger.stats["rdap"]["hedge_won"] == 0
+
+
+def test_the_first_error_is_raised_when_both_attempts_fail():
+    func, calls = attempts((0.2, TimeoutError("first")), (0.0, OSError("second")))
+    with pytest.raises(TimeoutError, match="first"):
+        warmed(0.05).call("rdap", func)
+    assert len(calls) == 2
+
+
+def test_attempts_run_in_the_callers_deadline_scope():
+    seen = []
+    hedger = warmed(0.01)
+    with deadline_scope(5.0):
+        hedger.call("rdap", lambda: seen.append(current_deadline().remaining()))
+    assert seen[0] is not None and seen[0] <= 5.0
+
+
+def test_async_calls_are_hedged_too():
+    delays = [1.0, 0.0]
+
+    async def factory():
+        delay = delays.pop(0)
+        await asyncio.sleep(delay)
+        return delay
+
+    hedger = Hedger(min_samples=1)
+    hedger.record("dns", 0.05)
+    assert asyncio.run(hedger.call_async("dns", factory)) == 0.0
+    assert hedger.stats["dns"] == {"calls": 1, "hedged": 1, "hedge_won": 1}
+
+
+def test_disabled_hedger_calls_straight_through():
+    func, calls = attempts((0.2, "only"))
+    hedger = Hedger(enabled=False, min_samples=1)
+    hedger.record("rdap", 0.01)
+    assert hedger.call("rdap", func) == "only"
+    assert len(calls) == 1 and hedger.stats == {}
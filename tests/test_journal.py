@@ -0,0 +1,52 @@
+# tests/test_journal.py
+
+from modules.pipeline import run_modules
+from utils.journal import Journal
+
+
+def interrupted_journal(path):
+    journal = Journal(str(path))
+    journal.record_module("a.test", "dns", {"A": ["10.0.0.1"]})
+    journal.record_module("a.test", "whois", {"error": "WHOIS lookup failed"})
+    journal.record_module("a.test", "geoip", None)
+    journal.finish("a.test", {"target": "a.test", "ip": "10.0.0.1"})
+    journal.record_module("b.test", "dns", {"A": ["10.0.0.2"]})
+    journal.record_module("b.test", "whois", {"error": "WHOIS lookup failed"})
+    journal.close()
+
+
+def test_resume_rebuilds_finished_targets_with_failed_modules(tmp_path):
+    interrupted_journal(tmp_path / "journal.ndjson")
+    journal = Journal(str(tmp_path / "journal.ndjson"), resume=True)
+    assert journal.resumed and journal.is_finished("A.test")
+    assert list(journal.iter_records()) == [{
+        "target": "a.test", "ip": "10.0.0.1",
+        "results": {"dns": {"A": ["10.0.0.1"]}, "whois": {"error": "WHOIS lookup failed"}, "geoip": None},
+    }]
+
+
+def test_resume_retries_failed_modules_of_unfinished_targets(tmp_path):
+    interrupted_journal(tmp_path / "journal.ndjson")
+    journal = Journal(str(tmp_path / "journal.ndjson"), resume=True)
+    assert journal.completed("b.test") == {"dns": {"A": ["10.0.0.2"]}}
+
+    ran = []
+
+    def task(key, result):
+        return key, lambda: ran.append(key) or result
+
+    task_map = {"dns": task("dns", {"A": []}), "whois": task("whois", {"registrar": "R"})}
+    results = run_modules(task_map, ["dns", "whois"], journal=journal, journal_key="b.test")
+    assert ran == ["whois"]
+    assert results == {"dns": {"A": ["10.0.0.2"]}, "whois": {"registrar": "R"}}
+
+
+def test_half_written_line_is_dropped_on_resume(tmp_path):
+    path = tmp_path / "journal.ndjson"
+    interrupted_journal(path)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"t": "b.test", "m": "ge')
+    journal = Journal(str(path), resume=True)
+    journal.record_module("b.test", "geoip", {"country": "DE"})
+    journal.close()
+    assert Journal(str(path), resume=True).completed("b.test")["geoip"] == {"country": "DE"}
@@ -0,0 +1,69 @@
+# tests/test_json_export.py
+
+import csv
+import gzip
+
+import pytest
+
+from modules.json_export import (NDJSONWriter, export_ndjson, export_tables, iter_ndjson, open_text,
+                                 PORT_COLUMNS, DNS_COLUMNS)
+
+RECORDS = [
+    {"target": "a.test", "ip": "10.0.0.1", "results": {
+        "ports": {"open_ports": {"tcp": {"22": {"state": "open", "service": "ssh"},
+                                         "443": {"state": "open", "service": "https", "product": "nginx"}}}},
+        "dns": {"A": ["10.0.0.1"], "MX": ["10 mail.a.test"], "TXT": []}}},
+    {"target": "b.test", "ip": None, "results": {"ports": None, "dns": {"error": "timed out"}}},
+    {"target": "c.test", "error": "Invalid input."},
+]
+
+
+def read_table(path):
+    with open_text(str(path)) as f:
+        return list(csv.reader(f))
+
+
+@pytest.mark.parametrize("compress", [None, "gz"])
+def test_tables_hold_one_row_per_port_and_dns_value(tmp_path, compress):
+    counts = export_tables(iter(RECORDS), str(tmp_path), compress=compress)
+    assert counts == {"ports": 2, "dns": 2}
+    suffix = f".{compress}" if compress else ""
+    ports = read_table(tmp_path / f"ports.csv{suffix}")
+    assert ports[0] == PORT_COLUMNS
+    assert ports[1:] == [["a.test", "10.0.0.1", "tcp", "22", "open", "ssh", "", ""],
+                         ["a.test", "10.0.0.1", "tcp", "443", "open", "https", "nginx", ""]]
+    assert read_table(tmp_path / f"dns.csv{suffix}") == [
+        DNS_COLUMNS, ["a.test", "10.0.0.1", "A", "10.0.0.1"], ["a.test", "10.0.0.1", "MX", "10 mail.a.test"]]
+
+
+def test_unknown_table_formats_are_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        export_tables(iter(RECORDS), str(tmp_path), fmt="parquet")
+
+
+def test_writer_appends_unless_told_to_start_over(tmp_path):
+    path = str(tmp_path / "results.ndjson")
+    export_ndjson(RECORDS[:1], path)
+    with NDJSONWriter(path) as writer:
+        writer.write(RECORDS[1])
+    assert [record["target"] for record in iter_ndjson(path)] == ["a.test", "b.test"]
+    with NDJSONWriter(path, append=False) as writer:
+        writer.write(RECORDS[2])
+    assert list(iter_ndjson(path)) == [RECORDS[2]]
+
+
+def test_compressed_ndjson_round_trips_across_appends(tmp_path):
+    path = str(tmp_path / "results.ndjson.gz")
+    export_ndjson(RECORDS[:2], path)
+    export_ndjson(RECORDS[2:], path, append=True)
+    with gzip.open(path, "rb") as f:
+        assert f.read().count(b"\n") == 3
+    assert list(iter_ndjson(path)) == RECORDS
+
+
+def test_arrow_tables_keep_ports_numeric(tmp_path):
+    pyarrow = pytest.importorskip("pyarrow")
+    import pyarrow.ipc
+    export_tables(iter(RECORDS), str(tmp_path), fmt="arrow")
+    table = pyarrow.ipc.open_file(str(tmp_path / "ports.arrow")).read_all()
+    assert table.column("port").to_pylist() == [22, 443]
@@ -0,0 +1,78 @@
+# tests/test_metrics.py
+
+import asyncio
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.hedging import Hedger
+from utils.metrics import MetricsRecorder, count
+
+
+def recorded(func, module="mod"):
+    metrics = MetricsRecorder()
+    metrics.instrument("target", module, func)()
+    return metrics.records[-1]
+
+
+def test_counts_from_copied_contexts_are_attributed():
+    def work():
+        count("requests")
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(contextvars.copy_context().run, count, "requests") for _ in range(8)]
+            for future in futures:
+                future.result()
+
+    assert recorded(work)["requests"] == 9
+
+
+def test_hedged_attempts_are_attributed():
+    hedger = Hedger(min_samples=1)
+    hedger.record("op", 0.0)
+    assert recorded(lambda: hedger.call("op", lambda: count("bytes", 10)))["bytes"] == 10
+
+
+def test_event_loop_work_is_attributed():
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+
+    async def lookup():
+        count("requests", 3)
+
+    try:
+        assert recorded(lambda: asyncio.run_coroutine_threadsafe(lookup(), loop).result())["requests"] == 3
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+
+
+def test_counters_do_not_leak_between_calls():
+    first = recorded(lambda: count("retries", 2))
+    second = recorded(lambda: None)
+    assert first["retries"] == 2
+    assert second["retries"] == 0
+
+
+class _EndlessBody(BaseHTTPRequestHandler):
+    def do_GET(self):
+        # No Content-Length: the body runs until the connection closes
+        self.send_response(200)
+        self.end_headers()
+        for _ in range(64):
+            self.wfile.write(b"x" * 16384)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_streamed_bytes_are_counted_as_read():
+    from modules.http_info import fetch_bounded, CHUNK_SIZE
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _EndlessBody)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        record = recorded(lambda: fetch_bounded(f"http://127.0.0.1:{server.server_port}/", max_bytes=65536))
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert record["requests"] == 1
+    assert 65536 <= record["bytes"] <= 65536 + CHUNK_SIZE
@@ -0,0 +1,117 @@
+# tests/test_nmap_batch.py
+
+import os
+import time
+import threading
+
+from modules.port_scan import iter_nmap_batch, run_nmap_batch, NmapBatcher
+
+
+def test_batch_scan_parses_every_host(fake_nmap):
+    hosts = [f"10.0.0.{i}" for i in range(1, 11)]
+    results = run_nmap_batch(hosts, "1-1000", shards=3, nmap_path=fake_nmap)
+    assert sorted(results) == sorted(hosts)
+    for result in results.values():
+        assert sorted(result["open_ports"]["tcp"]) == [22, 80, 443]
+        assert result["open_ports"]["tcp"][22]["product"] == "OpenSSH"
+        assert result["os_detection"][0]["name"] == "Linux 5.X"
+
+
+def test_batch_scan_expands_cidrs(fake_nmap):
+    results = run_nmap_batch(["10.1.0.0/30", "10.1.0.1"], "22", nmap_path=fake_nmap)
+    assert sorted(results) == ["10.1.0.1", "10.1.0.2"]
+    assert list(results["10.1.0.1"]["open_ports"]["tcp"]) == [22]
+
+
+def test_batch_scan_yields_hosts_before_nmap_exits(tmp_path):
+    # One host, then a long pause: the pull parser must hand the host over right away
+    script = tmp_path / "slow-nmap"
+    script.write_text(
+        "#!/usr/bin/env python3\n"
+        "import sys, time\n"
+        "out = sys.stdout\n"
+        "out.write('<?xml version=\"1.0\"?><nmaprun>'\n"
+        "          '<host><status state=\"up\"/><address addr=\"10.0.0.1\" addrtype=\"ipv4\"/><ports>'\n"
+        "          '<port protocol=\"tcp\" portid=\"22\"><state state=\"open\"/><service name=\"ssh\"/></port>'\n"
+        "          '</ports></host>\\n')\n"
+        "out.flush()\n"
+        "time.sleep(2)\n"
+        "out.write('</nmaprun>\\n')\n")
+    os.chmod(script, 0o755)
+
+    started = time.perf_counter()
+    ip, result = next(iter_nmap_batch(["10.0.0.1"], "22", nmap_path=str(script)))
+    assert time.perf_counter() - started < 1.5
+    assert ip == "10.0.0.1"
+    assert list(result["open_ports"]["tcp"]) == [22]
+
+
+def test_malformed_output_does_not_hang(tmp_path):
+    script = tmp_path / "bad-nmap"
+    script.write_text(
+        "#!/usr/bin/env python3\n"
+        "import sys\n"
+        "sys.stdout.write('<nmaprun><<<')\n"
+        "sys.stdout.flush()\n"
+        "sys.stdout.write('x' * 10000000)\n")
+    os.chmod(script, 0o755)
+    results = run_nmap_batch(["10.0.0.1"], "22", nmap_path=str(script))
+    assert results["10.0.0.1"]["error"].startswith("Failed to parse nmap XML output")
+
+
+def test_batcher_groups_concurrent_hosts(fake_nmap, monkeypatch):
+    monkeypatch.setenv("NMAP_PATH", fake_nmap)
+    batcher = NmapBatcher(batch_size=8, linger=5.0)
+    hosts = [f"10.2.0.{i}" for i in range(1, 9)]
+    results = {}
+
+    def scan(ip):
+        results[ip] = batcher.scan(ip, "22,80")
+
+    threads = [threading.Thread(target=scan, args=(ip,)) for ip in hosts]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    assert batcher.stats == {"hosts": 8, "runs": 1}
+    assert all(list(results[ip]["open_ports"]["tcp"]) == [22, 80] for ip in hosts)
+
+
+def batch_scan(batcher, hosts, ports="22"):
+    results = {}
+    threads = [threading.Thread(target=lambda ip=ip: results.setdefault(ip, batcher.scan(ip, ports))) for ip in hosts]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    return results
+
+
+def test_batcher_reports_nmap_failures(tmp_path, monkeypatch):
+    script = tmp_path / "rootless-nmap"
+    script.write_text(
+        "#!/usr/bin/env python3\n"
+        "import sys\n"
+        "sys.stderr.write('You requested a scan type which requires root privileges.\\n')\n"
+        "sys.exit(1)\n")
+    os.chmod(script, 0o755)
+    monkeypatch.setenv("NMAP_PATH", str(script))
+    results = batch_scan(NmapBatcher(batch_size=2, linger=5.0), ["10.3.0.1", "10.3.0.2"])
+    assert all("requires root privileges" in result["error"] for result in results.values())
+
+
+def test_batcher_reports_unanswered_hosts_as_down(tmp_path, monkeypatch):
+    # nmap runs fine but only the first host answers
+    script = tmp_path / "partial-nmap"
+    script.write_text(
+        "#!/usr/bin/env python3\n"
+        "import sys\n"
+        "sys.stdout.write('<?xml version=\"1.0\"?><nmaprun>'\n"
+        "                 '<host><status state=\"up\"/><address addr=\"10.4.0.1\" addrtype=\"ipv4\"/><ports>'\n"
+        "                 '<port protocol=\"tcp\" portid=\"22\"><state state=\"open\"/><service name=\"ssh\"/></port>'\n"
+        "                 '</ports></host></nmaprun>\\n')\n")
+    os.chmod(script, 0o755)
+    monkeypatch.setenv("NMAP_PATH", str(script))
+    results = batch_scan(NmapBatcher(batch_size=2, linger=5.0, shards=1), ["10.4.0.1", "10.4.0.2"])
+    assert list(results["10.4.0.1"]["open_ports"]["tcp"]) == [22]
+    assert results["10.4.0.2"] == {"error": "No response from target or host is down."}
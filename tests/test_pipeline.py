@@ -0,0 +1,56 @@
+# tests/test_pipeline.py
+
+import time
+import threading
+from concurrent.futures import TimeoutError as FuturesTimeout
+
+import modules.pipeline as pipeline
+from modules.pipeline import run_modules
+from utils.deadline import deadline_scope, budget, current_deadline
+
+
+def task(result, delay=0.0):
+    def run():
+        time.sleep(delay)
+        return result
+    return "task", run
+
+
+def test_unfinished_modules_time_out_at_the_deadline():
+    done = []
+    task_map = {"fast": task({"ok": 1}), "slow": task({"ok": 2}, delay=2.0)}
+    started = time.perf_counter()
+    with deadline_scope(0.3):
+        results = run_modules(task_map, ["slow", "fast"], on_done=lambda key, res, error: done.append(key))
+    assert time.perf_counter() - started < 1.0
+    assert results == {"slow": {"error": "Deadline exceeded before slow finished", "timed_out": True},
+                       "fast": {"ok": 1}}
+    assert sorted(done) == ["fast", "slow"]
+
+
+def test_modules_finished_at_the_deadline_are_kept(monkeypatch):
+    def late_as_completed(futures, timeout=None):
+        # The deadline fires right after fast finished, before it was yielded
+        next(future for future, key in futures.items() if key == "fast").result()
+        raise FuturesTimeout()
+
+    monkeypatch.setattr(pipeline, "as_completed", late_as_completed)
+    release = threading.Event()
+    done = []
+    task_map = {"slow": ("task", lambda: release.wait(5)), "fast": task({"ok": 1})}
+    try:
+        results = run_modules(task_map, ["slow", "fast"], on_done=lambda key, res, error: done.append((key, res)))
+    finally:
+        release.set()
+    assert results["fast"] == {"ok": 1}
+    assert results["slow"]["timed_out"] is True
+    assert ("fast", {"ok": 1}) in done
+
+
+def test_module_timeouts_are_clipped_to_the_budget():
+    with deadline_scope(10.0):
+        assert budget(30.0) <= 10.0
+        with deadline_scope(60.0):
+            # A nested scope never outlives its parent
+            assert current_deadline().remaining() <= 10.0
+    assert budget(30.0) == 30.0
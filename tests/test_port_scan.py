@@ -0,0 +1,93 @@
+# tests/test_port_scan.py
+
+import os
+import socket
+import asyncio
+
+import pytest
+
+from modules.port_scan import AdaptiveLimiter, connect_scan_async
+
+
+def listening_sockets(count):
+    sockets = []
+    for _ in range(count):
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        sock.listen(16)
+        sockets.append(sock)
+    return sockets
+
+
+def closed_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_connect_scan_reports_open_ports_only():
+    sockets = listening_sockets(3)
+    try:
+        open_ports = sorted(s.getsockname()[1] for s in sockets)
+        spec = ",".join(str(p) for p in open_ports + [closed_port()])
+        results = asyncio.run(connect_scan_async(["127.0.0.1"], spec, concurrency=8, timeout=1.0))
+    finally:
+        for sock in sockets:
+            sock.close()
+    tcp = results["127.0.0.1"]["open_ports"]["tcp"]
+    assert list(tcp) == open_ports
+    assert all(entry["state"] == "open" for entry in tcp.values())
+    assert results["127.0.0.1"]["error"] is None
+
+
+def test_limiter_halves_on_timeouts_and_grows_on_success():
+    async def scenario():
+        limiter = AdaptiveLimiter(64, minimum=8)
+        for _ in range(40):
+            await limiter.acquire()
+            await limiter.release(timed_out=True)
+        backed_off = limiter.window
+        for _ in range(5):
+            await limiter.acquire()
+            await limiter.release(timed_out=False)
+        return backed_off, limiter.window
+
+    backed_off, recovered = asyncio.run(scenario())
+    assert backed_off == 32
+    assert recovered == backed_off + 5
+
+
+def test_limiter_never_exceeds_window():
+    async def scenario():
+        limiter = AdaptiveLimiter(4, minimum=1)
+        peak = 0
+
+        async def task():
+            nonlocal peak
+            await limiter.acquire()
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(0.01)
+            await limiter.release(timed_out=False)
+
+        await asyncio.gather(*(task() for _ in range(40)))
+        return peak
+
+    assert asyncio.run(scenario()) == 4
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="counts descriptors through /proc")
+def test_descriptor_exhaustion_is_retried_not_reported_closed():
+    resource = pytest.importorskip("resource")
+    sockets = listening_sockets(30)
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    try:
+        open_ports = sorted(s.getsockname()[1] for s in sockets)
+        # Room for the event loop and a handful of probes, far below the requested concurrency
+        resource.setrlimit(resource.RLIMIT_NOFILE, (len(os.listdir("/proc/self/fd")) + 12, hard))
+        results = asyncio.run(connect_scan_async(["127.0.0.1"], ",".join(map(str, open_ports)),
+                                                 concurrency=100, timeout=1.0))
+    finally:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
+        for sock in sockets:
+            sock.close()
+    assert list(results["127.0.0.1"]["open_ports"]["tcp"]) == open_ports
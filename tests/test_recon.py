@@ -0,0 +1,54 @@
+# tests/test_recon.py
+
+import csv
+import sys
+import socket
+
+import recon
+
+
+def run_recon(monkeypatch, tmp_path, *argv):
+    monkeypatch.setattr(sys, "argv", ["recon.py", *argv,
+                                      "--output", str(tmp_path / "report.html"),
+                                      "--ndjson", str(tmp_path / "results.ndjson"),
+                                      "--journal", str(tmp_path / "journal.ndjson"),
+                                      "--no-cache", "--no-store"])
+    recon.run(recon.parse_arguments())
+
+
+def table_rows(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def test_tables_cover_only_this_run(monkeypatch, tmp_path):
+    targets = tmp_path / "targets.txt"
+    targets.write_text("127.0.0.1\n")
+    with socket.socket() as listener:
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(16)
+        port = listener.getsockname()[1]
+        for _ in range(2):
+            run_recon(monkeypatch, tmp_path, "--targets", str(targets), "--scan-ports", "--scan-mode", "connect",
+                      "--ports", str(port), "--tables", str(tmp_path / "tables"))
+
+    # The NDJSON file accumulates both runs; the tables hold the last one only
+    assert len((tmp_path / "results.ndjson").read_text().splitlines()) == 2
+    rows = table_rows(tmp_path / "tables" / "ports.csv")
+    assert [row["port"] for row in rows] == [str(port)]
+    assert not [p for p in tmp_path.iterdir() if p.name.startswith(".run-")]
+
+
+def test_batch_report_covers_only_this_run(monkeypatch, tmp_path):
+    targets = tmp_path / "targets.txt"
+    targets.write_text("127.0.0.1\n")
+    with socket.socket() as listener:
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(16)
+        port = listener.getsockname()[1]
+        for _ in range(2):
+            run_recon(monkeypatch, tmp_path, "--targets", str(targets), "--scan-ports", "--scan-mode", "connect",
+                      "--ports", str(port), "--batch-report", str(tmp_path / "report"))
+
+    assert len(list((tmp_path / "report" / "targets").iterdir())) == 1
+    assert (tmp_path / "report" / "index.html").read_text().count("127.0.0.1</a>") == 1
@@ -0,0 +1,54 @@
+# tests/test_registry.py
+
+import sys
+
+import pytest
+
+import modules.registry as registry
+import recon
+from modules.pipeline import select_modules, build_task_map, run_modules
+
+
+@pytest.fixture
+def plugins(monkeypatch):
+    """Registrations made by a test are dropped afterwards."""
+    monkeypatch.setattr(registry, "_plugins", dict(registry._plugins))
+    monkeypatch.setattr(registry, "_entry_points_loaded", True)
+    return registry._plugins
+
+
+def parse(monkeypatch, *argv):
+    monkeypatch.setattr(sys, "argv", ["recon.py", "a.test", *argv])
+    return recon.parse_arguments()
+
+
+def test_builtins_keep_report_order(plugins):
+    assert list(registry.get_plugins()) == ["whois", "dns", "ports", "http", "tech", "geoip", "builtwith"]
+
+
+def test_string_runners_are_imported_on_first_run(plugins, monkeypatch, tmp_path):
+    (tmp_path / "recon_echo_plugin.py").write_text("def run(ctx):\n    return {'seen': ctx.cleaned_input}\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    registry.register("echo", "Echo", "recon_echo_plugin:run")
+    task_map = build_task_map("a.test", "a.test", None)
+    assert "recon_echo_plugin" not in sys.modules
+    try:
+        assert run_modules(task_map, ["echo"]) == {"echo": {"seen": "a.test"}}
+    finally:
+        sys.modules.pop("recon_echo_plugin", None)
+
+
+def test_ip_only_plugins_skip_targets_without_an_address(plugins):
+    calls = []
+    registry.register("rev", "Reverse", lambda ctx: calls.append(ctx) or {"ok": True}, requires_ip=True)
+    assert run_modules(build_task_map("a.test", "a.test", None), ["rev"]) == {"rev": None}
+    assert run_modules(build_task_map("a.test", "a.test", "10.0.0.1"), ["rev"]) == {"rev": {"ok": True}}
+    assert len(calls) == 1
+
+
+def test_plugins_are_opt_in_with_module(plugins, monkeypatch):
+    registry.register("echo", "Echo", lambda ctx: {})
+    assert select_modules(parse(monkeypatch, "--all"))["echo"] is False
+    selected = select_modules(parse(monkeypatch, "--module", "echo"))
+    assert [key for key, on in selected.items() if on] == ["echo"]
+    assert select_modules(parse(monkeypatch, "--dns", "--module", "builtwith"))["builtwith"] is True
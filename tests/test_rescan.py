@@ -0,0 +1,59 @@
+# tests/test_rescan.py
+
+import time
+
+import pytest
+
+import modules.registry as registry
+from modules.rescan import rescan_modules, stale_modules, HOUR
+from utils.cache import ResultCache, normalize_key
+from utils.snapshots import SnapshotStore
+
+TARGET = "host.test"
+
+
+@pytest.fixture
+def ports_plugin(monkeypatch, tmp_path):
+    """Replaces the ports scanner with one that reports the next port list from `scans`, through a real cache."""
+    cache = ResultCache(str(tmp_path / "cache.sqlite"))
+    monkeypatch.setattr("modules.pipeline.get_cache", lambda: cache)
+    scans = []
+
+    def run(ctx):
+        return ctx.cache.cached("ports", normalize_key(ctx.ip_address), lambda: {
+            "open_ports": {"tcp": {port: {"state": "open", "service": "svc"} for port in scans.pop(0)}}})
+
+    monkeypatch.setitem(registry._plugins, "ports", registry.Plugin("ports", "ports", run))
+    yield scans
+    cache.close()
+
+
+def rescan(store, max_hours):
+    return rescan_modules(TARGET, TARGET, "10.0.0.1", ["ports"], store=store, max_ages={"ports": max_hours * HOUR})
+
+
+def test_stale_modules_follow_max_ages():
+    now = time.time()
+    snapshot = {"dns": {"taken_at": now - 2 * HOUR}, "whois": {"taken_at": now - 2 * HOUR}}
+    assert stale_modules(snapshot, ["dns", "whois", "ports"], {"dns": HOUR, "whois": 3 * HOUR}, now) == ["dns", "ports"]
+
+
+def test_fresh_snapshots_are_reused(ports_plugin, tmp_path):
+    store = SnapshotStore(str(tmp_path / "snapshots.sqlite"))
+    ports_plugin.extend([[22]])
+    rescan(store, 20)
+    results, rescanned, changes = rescan(store, 20)
+    assert rescanned == [] and changes == []
+    assert list(results["ports"]["open_ports"]["tcp"]) == ["22"]
+
+
+def test_stale_modules_bypass_the_result_cache(ports_plugin, tmp_path):
+    store = SnapshotStore(str(tmp_path / "snapshots.sqlite"))
+    ports_plugin.extend([[22], [22, 443]])
+    rescan(store, 0)
+    # A max age shorter than the cache TTL must still run the scanner again
+    results, rescanned, changes = rescan(store, 0)
+    assert ports_plugin == []
+    assert rescanned == ["ports"]
+    assert list(results["ports"]["open_ports"]["tcp"]) == [22, 443]
+    assert changes == [{"module": "ports", "change": "opened", "value": "tcp/443", "service": "svc"}]
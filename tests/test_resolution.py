@@ -0,0 +1,70 @@
+# tests/test_resolution.py
+
+import time
+import threading
+
+import pytest
+
+import modules.dns_lookup as dns_lookup
+from modules.dns_lookup import get_dns_records_with_ttl, RECORD_TYPES
+from modules.input_handler import detect_input_type
+from modules.resolution import HostResolver, configure_host_resolver
+
+
+@pytest.fixture
+def stub_resolver(dns_server):
+    """Points dnspython at a fresh stub server; returns a factory for it."""
+    def start(**options):
+        server = dns_server(**options)
+        dns_lookup.configure_resolver(["127.0.0.1"], server.port)
+        return server
+
+    yield start
+    dns_lookup.configure_resolver()
+
+
+def test_each_name_is_resolved_once(stub_resolver):
+    server = stub_resolver()
+    resolver = HostResolver(timeout=2.0)
+    assert resolver.addresses("www.a.test") == ["127.0.0.1", "::1"]
+    assert resolver.addresses("WWW.a.test.") == ["127.0.0.1", "::1"]
+    assert server.queries == 2
+    assert resolver.stats == {"queries": 1, "shared": 1}
+
+
+def test_concurrent_lookups_share_one_query(stub_resolver):
+    server = stub_resolver(latency=0.2)
+    resolver = HostResolver(timeout=2.0)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(resolver.records("a.test"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert server.queries == 2
+    assert results == [{"A": ["127.0.0.1"], "AAAA": ["::1"]}] * 8
+
+
+def test_answers_expire_with_their_ttl(stub_resolver):
+    server = stub_resolver(ttl=1)
+    resolver = HostResolver(timeout=2.0)
+    resolver.records("a.test")
+    assert resolver.peek("a.test") == ({"A": ["127.0.0.1"], "AAAA": ["::1"]}, 1)
+    time.sleep(1.1)
+    assert resolver.peek("a.test") is None
+    resolver.records("a.test")
+    assert server.queries == 4
+
+
+def test_dns_module_reuses_the_detection_answer(stub_resolver):
+    server = stub_resolver()
+    resolver = configure_host_resolver(timeout=2.0)
+    try:
+        assert detect_input_type("https://a.test/login") == ("url", "a.test", "127.0.0.1")
+        assert resolver.peek("b.test") is None
+        records, ttl = get_dns_records_with_ttl("a.test", timeout=2.0, known=resolver.peek("a.test"))
+    finally:
+        configure_host_resolver()
+    assert records["A"] == ["127.0.0.1"] and records["AAAA"] == ["::1"]
+    # Only the record types input detection did not already ask for
+    assert server.queries == len(RECORD_TYPES)
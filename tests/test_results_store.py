@@ -0,0 +1,21 @@
+# tests/test_results_store.py
+
+from utils.results_store import ResultsStore, query_targets
+
+
+def ports_record(target, ports):
+    return {"target": target, "ip": "192.0.2.1",
+            "results": {"ports": {"open_ports": {"tcp": {port: {"state": "open"} for port in ports}}}}}
+
+
+def test_bad_records_are_skipped_without_losing_the_batch(tmp_path):
+    path = str(tmp_path / "results.sqlite")
+    store = ResultsStore(path)
+    store.add(ports_record("a.test", ["22"]))
+    store.add(ports_record("bad.test", ["not-a-port"]))
+    store.add({"target": "unbindable.test", "ip": object(), "results": {}})
+    store.add(ports_record("c.test", ["22"]))
+    store.close()
+
+    assert store.written == 2
+    assert [row[0] for row in query_targets(path, port=22)] == ["a.test", "c.test"]
@@ -0,0 +1,118 @@
+# tests/test_scheduler.py
+
+import time
+import threading
+from email.utils import formatdate
+
+import pytest
+
+from utils.deadline import deadline_scope, DeadlineExceeded
+from utils.scheduler import (RequestScheduler, ProviderPolicy, TokenBucket, Throttled,
+                             parse_retry_after, parse_rates, DEFAULT_POLICIES)
+
+
+def raising(error):
+    def func():
+        raise error
+    return func
+
+
+def test_token_bucket_allows_a_burst_then_paces():
+    bucket = TokenBucket(rate=20, burst=5)
+    started = time.monotonic()
+    waits = [bucket.acquire() for _ in range(7)]
+    assert waits[:5] == [0.0] * 5
+    assert waits[5] == pytest.approx(0.05, abs=0.02)
+    assert time.monotonic() - started == pytest.approx(0.1, abs=0.05)
+
+
+def test_token_bucket_refuses_waits_past_the_deadline():
+    bucket = TokenBucket(rate=1, burst=1)
+    bucket.acquire()
+    with deadline_scope(0.1):
+        with pytest.raises(DeadlineExceeded):
+            bucket.acquire()
+    # The refused caller gave its reservation back
+    assert bucket.acquire() < 1.0
+
+
+def test_retry_after_accepts_seconds_and_http_dates():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("-5") == 0.0
+    assert parse_retry_after(formatdate(time.time() + 30, usegmt=True)) == pytest.approx(30, abs=2)
+    assert parse_retry_after(formatdate(time.time() - 30, usegmt=True)) == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_rate_overrides_keep_the_default_concurrency():
+    policies = parse_rates(["ipinfo=50:100", "rdap=0.5"])
+    assert (policies["ipinfo"].rate, policies["ipinfo"].burst) == (50.0, 100)
+    assert policies["ipinfo"].max_concurrency == DEFAULT_POLICIES["ipinfo"].max_concurrency
+    assert policies["rdap"].burst == 1
+    with pytest.raises(ValueError):
+        parse_rates(["ipinfo"])
+
+
+def test_throttled_calls_wait_out_retry_after():
+    scheduler = RequestScheduler({"api": ProviderPolicy(rate=0, max_concurrency=4)})
+    attempts = []
+
+    def lookup():
+        attempts.append(time.monotonic())
+        if len(attempts) == 1:
+            raise Throttled("HTTP 429", retry_after=0.2)
+        return "ok"
+
+    assert scheduler.call("api", lookup) == "ok"
+    assert attempts[1] - attempts[0] >= 0.2
+    stats = scheduler.stats()["api"]
+    assert (stats["calls"], stats["throttled"]) == (2, 1)
+    # The AIMD window halved on the throttle
+    assert stats["window"] < 4
+
+
+def test_persistent_throttling_returns_the_last_response():
+    scheduler = RequestScheduler({"api": ProviderPolicy(rate=0)}, retries=1)
+
+    assert scheduler.call("api", raising(Throttled("HTTP 429", retry_after=0, response="429 response"))) == "429 response"
+    with pytest.raises(Throttled):
+        scheduler.call("api", raising(Throttled(retry_after=0)))
+
+
+def test_library_exceptions_can_mean_throttled():
+    scheduler = RequestScheduler({"api": ProviderPolicy(rate=0)}, retries=0)
+    with pytest.raises(Throttled, match="rate limited"):
+        scheduler.call("api", raising(ConnectionRefusedError("rate limited")), throttle_on=(ConnectionRefusedError,))
+    assert scheduler.stats()["api"]["throttled"] == 1
+
+
+def test_identical_calls_in_flight_are_coalesced():
+    scheduler = RequestScheduler({"api": ProviderPolicy(rate=0, max_concurrency=4)})
+    release = threading.Event()
+    runs = []
+    results = []
+
+    def lookup():
+        runs.append(1)
+        release.wait(5)
+        return {"country": "DE"}
+
+    threads = [threading.Thread(target=lambda: results.append(scheduler.call("api", lookup, key="10.0.0.1")))
+               for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    while scheduler.stats().get("api", {}).get("coalesced", 0) < 2 and len(runs) < 3:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert len(runs) == 1
+    assert results == [{"country": "DE"}] * 3
+    assert scheduler.stats()["api"]["coalesced"] == 2
+
+
+def test_worker_share_splits_provider_limits():
+    scheduler = RequestScheduler({"api": ProviderPolicy(rate=10, burst=10, max_concurrency=8)}, share=0.25)
+    provider = scheduler.provider("api:com")
+    assert (provider.bucket.rate, provider.bucket.burst, provider.limiter.maximum) == (2.5, 2, 2)
@@ -0,0 +1,50 @@
+# tests/test_subdomains.py
+
+import asyncio
+
+from modules.subdomains import enumerate_subdomains_async, iter_subdomains
+
+DOMAIN = "example.test"
+
+
+def enumerate_hosts(server, words, **options):
+    found = {}
+    stats = asyncio.run(enumerate_subdomains_async(
+        DOMAIN, words, lambda host, addresses: found.setdefault(host, addresses),
+        nameservers=["127.0.0.1"], port=server.port, timeout=1.0, **options))
+    return found, stats
+
+
+def test_finds_only_existing_names(dns_server):
+    server = dns_server(zone=[f"www.{DOMAIN}", f"mail.{DOMAIN}"])
+    found, stats = enumerate_hosts(server, ["www", "ftp", "mail", "dev", "www"])
+    assert sorted(found) == [f"mail.{DOMAIN}", f"www.{DOMAIN}"]
+    assert stats["wildcard"] is False
+    # Duplicate words are queried once
+    assert stats["queried"] == 4
+
+
+def test_wildcard_answers_are_filtered(dns_server):
+    # Every name resolves to the wildcard address except one real host
+    server = dns_server(records={f"vpn.{DOMAIN}": ["10.0.0.5"]})
+    found, stats = enumerate_hosts(server, ["www", "vpn", "mail", "dev"])
+    assert found == {f"vpn.{DOMAIN}": ["10.0.0.5"]}
+    assert stats["wildcard"] is True
+    assert stats["filtered"] == 3
+
+
+def test_query_rate_is_capped(dns_server):
+    server = dns_server(zone=[])
+    words = [f"w{i}" for i in range(60)]
+    _, stats = enumerate_hosts(server, words, qps=100, concurrency=50)
+    assert stats["queried"] == 60
+    # 60 evenly spaced slots at 100/s take at least 0.59 s
+    assert stats["elapsed"] >= 0.55
+    assert stats["qps"] <= 110
+
+
+def test_iter_subdomains_streams_apex_then_hosts(dns_server):
+    server = dns_server(zone=[f"www.{DOMAIN}"])
+    hosts = list(iter_subdomains([DOMAIN], lambda: iter(["www", "nope"]),
+                                 nameservers=["127.0.0.1"], port=server.port, timeout=1.0))
+    assert hosts == [DOMAIN, f"www.{DOMAIN}"]
@@ -0,0 +1,62 @@
+# tests/test_tech_stack.py
+
+import re
+
+from benchmarks.fake_services import FakeHTTPServer, start_in_thread
+from modules.tech_signatures import SIGNATURES
+from modules.tech_stack import TechMatcher, detect_tech_stack, get_matcher
+
+HEADERS = {"Server": "nginx/1.25 (Ubuntu)", "X-Powered-By": "Express", "CF-RAY": "8a1b2c", "Via": "1.1 varnish"}
+COOKIES = ["PHPSESSID", "csrftoken"]
+BODY = """<html><head><meta name="generator" content="WordPress 6.4">
+<script src="/_next/static/chunks/main.js"></script><script src="jquery-3.7.1.min.js"></script>
+<script src="https://www.googletagmanager.com/gtm.js?id=GTM-X"></script></head>
+<body data-reactroot><div ng-version="17"></div></body></html>"""
+
+
+def naive_match(headers, cookies, body):
+    # One search per signature: what the union matcher must reproduce
+    found = {}
+    lowered = {name.lower(): str(value).lower() for name, value in headers.items()}
+    for category, name, source, pattern in SIGNATURES:
+        if source.startswith("header:"):
+            text = lowered.get(source.split(":", 1)[1], "")
+        else:
+            text = "\n".join(cookies).lower() if source == "cookie" else body.lower()
+        if text and re.search(pattern, text):
+            names = found.setdefault(category, [])
+            if name not in names:
+                names.append(name)
+    return found
+
+
+def as_sets(found):
+    return {category: set(names) for category, names in found.items()}
+
+
+def test_union_matcher_agrees_with_one_search_per_signature():
+    assert as_sets(get_matcher().match(HEADERS, COOKIES, BODY)) == as_sets(naive_match(HEADERS, COOKIES, BODY))
+
+
+def test_one_position_can_name_several_technologies():
+    found = get_matcher().match({"X-Powered-By": "Express"}, [], "")
+    assert found == {"programming-languages": ["Node.js"], "web-frameworks": ["Express"]}
+
+
+def test_patterns_only_apply_to_their_own_source():
+    matcher = TechMatcher([("cms", "Drupal", "header:x-generator", r"drupal")])
+    assert matcher.match({"Server": "drupal"}, ["drupal"], "drupal") == {}
+    assert matcher.match({"X-Generator": "Drupal 10"}, [], "") == {"cms": ["Drupal"]}
+
+
+def test_detect_tech_stack_fingerprints_the_page():
+    server = start_in_thread(FakeHTTPServer())
+    try:
+        tech = detect_tech_stack(f"http://127.0.0.1:{server.port}/")
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert "WordPress" in tech["cms"]
+    assert "jQuery" in tech["javascript-frameworks"]
+    assert "Nginx" in tech["web-servers"]
+    assert "PHP" in tech["programming-languages"]
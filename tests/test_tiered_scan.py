@@ -0,0 +1,50 @@
+# tests/test_tiered_scan.py
+
+import os
+import sys
+
+import pytest
+
+from modules.port_scan import run_tiered_scan
+
+pytest.importorskip("nmap")
+
+
+@pytest.fixture
+def logged_nmap(tmp_path, fake_nmap, monkeypatch):
+    """An `nmap` on PATH that records each invocation's arguments before replaying the fake nmap."""
+    log = tmp_path / "nmap.log"
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    wrapper = bin_dir / "nmap"
+    wrapper.write_text(
+        f"#!{sys.executable}\n"
+        "import os, sys\n"
+        f"with open({str(log)!r}, 'a') as f:\n"
+        "    f.write(' '.join(sys.argv[1:]) + '\\n')\n"
+        f"os.execv({fake_nmap!r}, [{fake_nmap!r}] + sys.argv[1:])\n")
+    os.chmod(wrapper, 0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+    def scans():
+        # The version probe python-nmap runs on start-up is not a scan
+        return [line.split() for line in log.read_text().splitlines() if line != "-V"]
+    return scans
+
+
+def test_detection_only_runs_on_discovered_ports(logged_nmap):
+    result = run_tiered_scan("10.0.0.1", "1-1000")
+    discovery, detection = logged_nmap()
+    assert "-sV" not in discovery and "-O" not in discovery
+    assert detection[detection.index("-p") + 1] == "22,80,443"
+    assert {"-sV", "-sC", "-O"} <= set(detection)
+    assert sorted(result["open_ports"]["tcp"]) == [22, 80, 443]
+    assert result["open_ports"]["tcp"][22]["product"] == "OpenSSH"
+    assert result["os_detection"]
+    assert result["error"] is None
+
+
+def test_no_open_ports_skips_detection(logged_nmap):
+    result = run_tiered_scan("10.0.0.1", "1000-1010")
+    assert len(logged_nmap()) == 1
+    assert result["open_ports"] == {} and result["error"] is None
@@ -0,0 +1,55 @@
+# tests/test_whois_lookup.py
+
+import pytest
+
+import modules.whois_lookup as whois_lookup
+from modules.whois_lookup import PrefixCache, lookup_ip_rdap
+
+
+def test_prefix_cache_prefers_the_longest_match():
+    cache = PrefixCache()
+    cache.add("10.0.0.0/8", {"network_name": "WIDE"})
+    cache.add("10.1.2.0/24", {"network_name": "NARROW"})
+    cache.add("2001:db8::/32", {"network_name": "SIX"})
+    assert cache.lookup("10.1.2.3") == {"network_name": "NARROW"}
+    assert cache.lookup("10.1.3.3") == {"network_name": "WIDE"}
+    assert cache.lookup("2001:db8:1::1") == {"network_name": "SIX"}
+    assert cache.lookup("11.0.0.1") is None
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+@pytest.fixture
+def rdap(monkeypatch):
+    """Fake IPWhois answering for a few networks; returns the list of queried IPs."""
+    monkeypatch.setattr(whois_lookup, "_rdap_cache", PrefixCache())
+    queried = []
+    networks = {
+        "192.0.2": {"asn": "64500", "asn_description": "DOC-NET", "asn_cidr": "192.0.2.0/24",
+                    "network": {"name": "DOC", "country": "ZZ", "cidr": "192.0.2.0/25, 192.0.2.128/25"}},
+        "198.51.100": {"asn": "64501", "asn_cidr": "198.51.100.0/24", "network": {"name": "DOC2"}},
+    }
+
+    class FakeIPWhois:
+        def __init__(self, ip_address, timeout=5):
+            self.ip_address = ip_address
+
+        def lookup_rdap(self):
+            queried.append(self.ip_address)
+            return networks[self.ip_address.rsplit(".", 1)[0]]
+
+    monkeypatch.setattr(whois_lookup, "IPWhois", FakeIPWhois)
+    return queried
+
+
+def test_addresses_in_a_known_network_reuse_one_lookup(rdap):
+    first = lookup_ip_rdap("192.0.2.10")
+    assert first == {"asn": "64500", "asn_description": "DOC-NET", "network_name": "DOC", "country": "ZZ"}
+    # Both CIDRs of the allocation were cached
+    assert lookup_ip_rdap("192.0.2.200") == first
+    assert rdap == ["192.0.2.10"]
+
+
+def test_asn_cidr_is_used_without_a_network_cidr(rdap):
+    lookup_ip_rdap("198.51.100.1")
+    lookup_ip_rdap("198.51.100.254")
+    assert rdap == ["198.51.100.1"]
@@ -0,0 +1,216 @@
+# utils/cache.py
+
+import os
+import json
+import time
+import sqlite3
+import threading
+import contextvars
+from contextlib import contextmanager
+from utils.logger import logger
+from utils.metrics import count as count_metric
+
+DEFAULT_CACHE_PATH = "output/cache.sqlite"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Seconds each module's result stays fresh. DNS entries use the record TTL
+# returned by the resolver; this value is only the ceiling for them.
+DEFAULT_TTLS = {
+    "whois": 3 * 24 * 3600,
+    "rdap": 7 * 24 * 3600,
+    "geoip": 7 * 24 * 3600,
+    "tech": 24 * 3600,
+    "builtwith": 24 * 3600,
+    "dns": 3600,
+    "ports": 3600,
+    "http": 10 * 60,
+}
+
+
+# Set by refreshing(); copied into module threads along with the rest of the context
+_refreshing = contextvars.ContextVar("recon_cache_refreshing", default=False)
+
+
+@contextmanager
+def refreshing():
+    """
+    Within this block every cache read misses but fresh results are still
+    stored, like --refresh for just these calls (e.g. rescans of stale modules).
+    """
+    token = _refreshing.set(True)
+    try:
+        yield
+    finally:
+        _refreshing.reset(token)
+
+
+def normalize_key(*parts) -> str:
+    """Builds a cache key from target parts: lower-cased, stripped, None-safe."""
+    return "|".join("" if p is None else str(p).strip().lower().rstrip("/") for p in parts)
+
+
+def is_cacheable(result) -> bool:
+    """Results carrying an error (at top level or one level down) are not cached."""
+    if result is None:
+        return False
+    if isinstance(result, dict):
+        if result.get("error"):
+            return False
+        return not any(isinstance(v, dict) and v.get("error") for v in result.values())
+    return True
+
+
+class ResultCache:
+    """
+    SQLite-backed result cache keyed by (module, normalized target), with
+    per-module TTLs, size-bounded LRU eviction and hit/miss counters.
+    Safe to share between threads.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttls: dict | None = None,
+                 max_bytes: int = DEFAULT_MAX_BYTES, enabled: bool = True, refresh: bool = False):
+        self.path = path
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.refresh = refresh
+        self.stats = {}
+        self._lock = threading.Lock()
+        self._conn = None
+        self._size = 0
+
+        if not enabled:
+            return
+        try:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    module TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    PRIMARY KEY (module, key)
+                )""")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_results_accessed ON results (accessed_at)")
+            self._size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        except sqlite3.Error as e:
+            logger.error(f"[!] Result cache disabled, could not open {path}: {e}")
+            self.enabled = False
+            self._conn = None
+
+    def _count(self, module: str, field: str) -> None:
+        counters = self.stats.setdefault(module, {"hits": 0, "misses": 0})
+        counters[field] += 1
+        count_metric(f"cache_{field}")
+
+    def get(self, module: str, key: str):
+        """Returns the cached value, or None on a miss or expired entry."""
+        if not self.enabled or self.refresh or _refreshing.get():
+            return None
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM results WHERE module = ? AND key = ?", (module, key)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                self._count(module, "misses")
+                return None
+            self._conn.execute(
+                "UPDATE results SET accessed_at = ? WHERE module = ? AND key = ?", (now, module, key)
+            )
+            self._count(module, "hits")
+        return json.loads(row[0])
+
+    def set(self, module: str, key: str, value, ttl: float | None = None) -> None:
+        """Stores a value; ttl defaults to the module's configured TTL."""
+        if not self.enabled:
+            return
+        ttl = self.ttls.get(module, 3600) if ttl is None else min(ttl, self.ttls.get(module, ttl))
+        if ttl <= 0:
+            return
+        payload = json.dumps(value, ensure_ascii=False, default=str)
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute(
+                "SELECT size FROM results WHERE module = ? AND key = ?", (module, key)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                (module, key, payload, len(payload), now + ttl, now),
+            )
+            self._size += len(payload) - (old[0] if old else 0)
+            if self._size > self.max_bytes:
+                self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        # Drop expired rows first, then least recently used until 90% full
+        self._conn.execute("DELETE FROM results WHERE expires_at <= ?", (now,))
+        self._size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        target = int(self.max_bytes * 0.9)
+        while self._size > target:
+            rows = self._conn.execute(
+                "SELECT module, key, size FROM results ORDER BY accessed_at LIMIT 100"
+            ).fetchall()
+            if not rows:
+                break
+            victims = []
+            for module, key, size in rows:
+                victims.append((module, key))
+                self._size -= size
+                if self._size <= target:
+                    break
+            self._conn.executemany("DELETE FROM results WHERE module = ? AND key = ?", victims)
+
+    def cached(self, module: str, key: str, func, ttl_func=None):
+        """
+        Returns the cached value for (module, key) or calls func() and stores
+        its result when it carries no error.
+
+        Args:
+            module (str): Module name (selects the TTL).
+            key (str): Normalized target key.
+            func (callable): Produces the value on a miss.
+            ttl_func (callable): Optional; maps the fresh value to (value, ttl)
+                for modules whose freshness comes from the data (e.g. DNS TTLs).
+        """
+        value = self.get(module, key)
+        if value is not None:
+            return value
+        if self.enabled and (self.refresh or _refreshing.get()):
+            self._count(module, "misses")
+
+        value = func()
+        ttl = None
+        if ttl_func is not None:
+            value, ttl = ttl_func(value)
+        if is_cacheable(value):
+            self.set(module, key, value, ttl)
+        return value
+
+    def close(self) -> None:
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+                self._conn = None
+            self.enabled = False
+
+
+_cache = ResultCache(enabled=False)
+
+
+def configure_cache(path: str = DEFAULT_CACHE_PATH, enabled: bool = True, refresh: bool = False,
+                    max_bytes: int = DEFAULT_MAX_BYTES) -> ResultCache:
+    """Replaces the process-wide cache used by the pipeline."""
+    global _cache
+    _cache.close()
+    _cache = ResultCache(path, max_bytes=max_bytes, enabled=enabled, refresh=refresh)
+    return _cache
+
+
+def get_cache() -> ResultCache:
+    return _cache
@@ -0,0 +1,99 @@
+# utils/deadline.py
+
+import time
+import contextvars
+from contextlib import contextmanager
+
+# Lower bound for a clipped timeout, so a nearly spent budget still lets a
+# lookup fail fast instead of being passed 0 (which some libraries treat as "no timeout")
+MIN_TIMEOUT = 0.05
+
+
+class DeadlineExceeded(Exception):
+    """Raised when work cannot even start because the time budget is spent."""
+
+
+class Deadline:
+    """
+    Point in time by which work must finish. Nested deadlines never outlive
+    their parent, so a per-target budget inside a per-run budget ends at
+    whichever comes first.
+    """
+
+    def __init__(self, seconds: float | None = None, parent: "Deadline | None" = None):
+        expires_at = time.monotonic() + seconds if seconds is not None else None
+        if parent is not None and parent.expires_at is not None:
+            expires_at = parent.expires_at if expires_at is None else min(expires_at, parent.expires_at)
+        self.expires_at = expires_at
+
+    def remaining(self) -> float | None:
+        """Seconds left, or None without a limit."""
+        return None if self.expires_at is None else max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def clip(self, timeout: float | None) -> float | None:
+        """A module's own timeout, shortened to what is left of the budget."""
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+        remaining = max(MIN_TIMEOUT, remaining)
+        return remaining if timeout is None else min(timeout, remaining)
+
+
+_current = contextvars.ContextVar("recon_deadline", default=None)
+_run_deadline = Deadline()
+_target_budget = None
+
+
+def configure_budgets(target_seconds: float | None = None, run_seconds: float | None = None) -> None:
+    """Sets the per-target budget and starts the per-run clock (None = unlimited)."""
+    global _run_deadline, _target_budget
+    _run_deadline = Deadline(run_seconds)
+    _target_budget = target_seconds
+
+
+def get_run_deadline() -> Deadline:
+    return _run_deadline
+
+
+def get_target_budget() -> float | None:
+    return _target_budget
+
+
+def current_deadline() -> Deadline:
+    """Deadline of the work running in this context (the run deadline outside any scope)."""
+    return _current.get() or _run_deadline
+
+
+@contextmanager
+def deadline_scope(seconds: float | None = None):
+    """
+    Runs the enclosed work under a budget of `seconds` (bounded by any
+    enclosing deadline). Threads started with a copied context, like the
+    module pool in pipeline.run_modules, inherit it.
+    """
+    deadline = Deadline(seconds, parent=current_deadline())
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def target_scope():
+    """deadline_scope() with the configured per-target budget."""
+    return deadline_scope(_target_budget)
+
+
+def budget(timeout: float | None) -> float | None:
+    """Shortens a module timeout to the current deadline; use it wherever a timeout is passed down."""
+    return current_deadline().clip(timeout)
+
+
+def check_deadline(what: str = "work") -> None:
+    """Raises DeadlineExceeded when the current budget is already spent."""
+    if current_deadline().expired:
+        raise DeadlineExceeded(f"Deadline exceeded before {what} started")
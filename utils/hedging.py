@@ -0,0 +1,160 @@
+# utils/hedging.py
+
+import time
+import asyncio
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from utils.logger import logger
+
+DEFAULT_PERCENTILE = 95.0
+# Latencies needed before an operation is hedged, and how many recent ones count
+MIN_SAMPLES = 20
+WINDOW = 512
+HEDGE_WORKERS = 32
+
+
+class Hedger:
+    """
+    Hedged requests for idempotent lookups (DNS, RDAP): when an attempt has
+    not answered after the operation's recent latency percentile, an
+    identical second attempt is started and the first to succeed wins; the
+    call only fails when both attempts do. The loser is cancelled when it
+    can be and ignored otherwise.
+
+    With the 95th percentile only about one call in twenty sends a
+    duplicate, which is what cuts the tail. Disabled instances call straight
+    through. Safe to share between threads.
+    """
+
+    def __init__(self, percentile: float = DEFAULT_PERCENTILE, enabled: bool = True,
+                 min_samples: int = MIN_SAMPLES):
+        self.percentile = percentile
+        self.enabled = enabled
+        self.min_samples = min_samples
+        self.stats = {}
+        self._latencies = {}
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def _count(self, op: str, field: str) -> None:
+        with self._lock:
+            counters = self.stats.setdefault(op, {"calls": 0, "hedged": 0, "hedge_won": 0})
+            counters[field] += 1
+
+    def record(self, op: str, seconds: float) -> None:
+        with self._lock:
+            self._latencies.setdefault(op, deque(maxlen=WINDOW)).append(seconds)
+
+    def delay(self, op: str) -> float | None:
+        """Seconds to wait before hedging op; None while there are too few samples."""
+        with self._lock:
+            samples = sorted(self._latencies.get(op, ()))
+        if len(samples) < self.min_samples:
+            return None
+        index = min(len(samples) - 1, int(len(samples) * self.percentile / 100))
+        return samples[index]
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=HEDGE_WORKERS, thread_name_prefix="hedge")
+            return self._pool
+
+    def call(self, op: str, func):
+        """Runs func() (blocking), hedging it once if it is slower than usual."""
+        if not self.enabled:
+            return func()
+        self._count(op, "calls")
+        delay = self.delay(op)
+        started = time.monotonic()
+        if delay is None:
+            try:
+                return func()
+            finally:
+                self.record(op, time.monotonic() - started)
+
+        pool = self._executor()
+        # Attempts run on pool threads; give them the caller's context (deadline scope)
+        first = pool.submit(contextvars.copy_context().run, func)
+        done, _ = wait([first], timeout=delay)
+        if done:
+            self.record(op, time.monotonic() - started)
+            return first.result()
+
+        self._count(op, "hedged")
+        second = pool.submit(contextvars.copy_context().run, func)
+        pending = {first, second}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            winner = next((f for f in (first, second) if f in done and f.exception() is None), None)
+            if winner is not None:
+                break
+        else:
+            # Both attempts failed; report the original one's error
+            self.record(op, time.monotonic() - started)
+            return first.result()
+        if winner is second:
+            self._count(op, "hedge_won")
+        for future in pending:
+            future.cancel()
+        self.record(op, time.monotonic() - started)
+        return winner.result()
+
+    async def call_async(self, op: str, factory):
+        """Awaits factory() (a coroutine function), hedging it once if it is slower than usual."""
+        if not self.enabled:
+            return await factory()
+        self._count(op, "calls")
+        delay = self.delay(op)
+        started = time.monotonic()
+        if delay is None:
+            try:
+                return await factory()
+            finally:
+                self.record(op, time.monotonic() - started)
+
+        first = asyncio.ensure_future(factory())
+        done, _ = await asyncio.wait([first], timeout=delay)
+        if done:
+            self.record(op, time.monotonic() - started)
+            return first.result()
+
+        self._count(op, "hedged")
+        second = asyncio.ensure_future(factory())
+        pending = {first, second}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = next((t for t in (first, second)
+                               if t in done and not t.cancelled() and t.exception() is None), None)
+                if winner is not None:
+                    break
+            else:
+                # Both attempts failed; report the original one's error
+                self.record(op, time.monotonic() - started)
+                return first.result()
+        finally:
+            for task in pending:
+                task.cancel()
+        if winner is second:
+            self._count(op, "hedge_won")
+        self.record(op, time.monotonic() - started)
+        return winner.result()
+
+
+_hedger = Hedger(enabled=False)
+
+
+def configure_hedging(percentile: float | None = DEFAULT_PERCENTILE) -> Hedger:
+    """Replaces the process-wide hedger; percentile None disables hedging."""
+    global _hedger
+    _hedger = Hedger(percentile or DEFAULT_PERCENTILE, enabled=percentile is not None)
+    if percentile is not None:
+        logger.debug(f"Hedging idempotent lookups after their p{percentile:g} latency")
+    return _hedger
+
+
+def get_hedger() -> Hedger:
+    return _hedger
@@ -0,0 +1,121 @@
+# utils/http_client.py
+
+try:
+    import threading
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    from utils.metrics import count as count_metric
+except ImportError as e:
+    from utils.logger import logger
+    logger.error(f"Missing dependency: {e}. Please install required modules.")
+    raise
+from utils.logger import logger
+
+USER_AGENT = "ReconTool/1.0"
+DEFAULT_TIMEOUT = 10
+DEFAULT_POOL_HOSTS = 100
+DEFAULT_PER_HOST = 10
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF = 0.5
+
+
+class HttpClient:
+    """
+    Shared, thread-safe HTTP client used by every HTTP-based module.
+    Keeps connections alive per host (bounded by per_host), retries idempotent
+    requests on 5xx with exponential backoff (honouring Retry-After) and sends a
+    common User-Agent.
+    """
+
+    def __init__(self, pool_hosts: int = DEFAULT_POOL_HOSTS, per_host: int = DEFAULT_PER_HOST,
+                 retries: int = DEFAULT_RETRIES, backoff: float = DEFAULT_BACKOFF,
+                 user_agent: str = USER_AGENT, timeout: float = DEFAULT_TIMEOUT):
+        self.timeout = timeout
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            backoff_factor=backoff,
+            # 429 is left to utils.scheduler, which slows the whole provider down
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset({"GET", "HEAD", "OPTIONS"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        # pool_block makes per_host a hard cap on simultaneous connections to one host
+        self._adapter = HTTPAdapter(pool_connections=pool_hosts, pool_maxsize=per_host,
+                                    max_retries=retry, pool_block=True)
+        self.session = requests.Session()
+        self.session.headers.update({"User-Agent": user_agent})
+        self.session.mount("http://", self._adapter)
+        self.session.mount("https://", self._adapter)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        response = self.session.request(method, url, **kwargs)
+
+        # Attribute traffic to the instrumented module call (see utils.metrics)
+        count_metric("requests")
+        retries = getattr(getattr(response.raw, "retries", None), "history", None)
+        if retries:
+            count_metric("retries", len(retries))
+        # Streamed bodies are counted by whoever reads them (see http_info.fetch_bounded)
+        if method.upper() != "HEAD" and not kwargs.get("stream"):
+            count_metric("bytes", len(response.content))
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def head(self, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("allow_redirects", False)
+        return self.request("HEAD", url, **kwargs)
+
+    def stats(self) -> dict:
+        """
+        Returns connection reuse statistics across all live host pools:
+        requests sent, TCP/TLS connections opened and requests that reused
+        an existing connection.
+        """
+        pools = self._adapter.poolmanager.pools
+        requests_sent = connections = 0
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            requests_sent += pool.num_requests
+            connections += pool.num_connections
+        return {
+            "requests": requests_sent,
+            "connections": connections,
+            "reused": max(0, requests_sent - connections),
+        }
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def configure_http_client(**kwargs) -> HttpClient:
+    """Replaces the process-wide client (see HttpClient for options)."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = HttpClient(**kwargs)
+    return _client
+
+
+def get_http_client() -> HttpClient:
+    """Returns the process-wide client, creating it with defaults on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HttpClient()
+                logger.debug("Created shared HTTP client")
+    return _client
@@ -0,0 +1,72 @@
+# utils/importtime.py
+#
+# Startup-time check for recon.py based on `python -X importtime`.
+#
+#   python -m utils.importtime                 # report
+#   python -m utils.importtime --max-ms 150    # fail if importing recon is slower
+#
+# Scanner dependencies must stay lazy: importing recon must not pull in any
+# module listed in LAZY_DEPENDENCIES, otherwise the check fails.
+
+import os
+import sys
+import argparse
+import subprocess
+
+LAZY_DEPENDENCIES = ["nmap", "builtwith", "whois", "ipwhois", "dns", "requests", "dotenv", "maxminddb"]
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(statement: str = "import recon") -> list:
+    """
+    Runs `statement` in a fresh interpreter with -X importtime.
+
+    Returns:
+        list: (module, self_us, cumulative_us, depth) tuples in import order.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if proc.returncode:
+        raise RuntimeError(f"'{statement}' failed:\n{proc.stderr[-2000:]}")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure recon.py import (startup) time")
+    parser.add_argument("--statement", default="import recon", help="Python statement to time (default: import recon)")
+    parser.add_argument("--max-ms", type=float, help="Fail when total import time exceeds this many milliseconds")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest top-level imports to list")
+    args = parser.parse_args()
+
+    rows = measure(args.statement)
+    top_level = [row for row in rows if row[3] <= 1]
+    total_ms = sum(row[2] for row in rows if row[3] == 0) / 1000
+
+    print(f"{args.statement}: {total_ms:.1f} ms across {len(rows)} modules")
+    for name, _, cumulative, _ in sorted(top_level, key=lambda row: -row[2])[:args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    failed = False
+    imported = {row[0].split(".")[0] for row in rows}
+    eager = [dep for dep in LAZY_DEPENDENCIES if dep in imported]
+    if eager:
+        print(f"FAIL: scanner dependencies imported eagerly: {', '.join(eager)}")
+        failed = True
+    if args.max_ms is not None and total_ms > args.max_ms:
+        print(f"FAIL: {total_ms:.1f} ms exceeds budget of {args.max_ms:.1f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,365 @@
+# utils/job_queue.py
+
+import os
+import json
+import time
+import socket
+import sqlite3
+import threading
+import ipaddress
+import socketserver
+from utils.logger import logger
+
+DEFAULT_QUEUE_PATH = "output/queue.sqlite"
+DEFAULT_LEASE = 60.0
+MAX_ATTEMPTS = 3
+
+# Lower runs first: the slowest modules are handed out before the quick ones
+# so a long port scan never starts last and leaves every other worker idle.
+MODULE_PRIORITY = {"ports": 0, "whois": 1, "tech": 2, "http": 2, "geoip": 3, "dns": 3}
+DEFAULT_PRIORITY = 2
+
+# Job states: pending -> reserved (prefetched by a worker) -> running -> done | failed.
+# Reserved and running jobs carry a lease that the owner renews with
+# heartbeat(); when it lapses the job goes back to pending for someone else.
+
+
+class JobQueue:
+    """
+    SQLite-backed (target, module) job queue shared by a coordinator and any
+    number of worker processes on the same machine. Workers prefetch a few
+    jobs at a time; a worker that runs dry steals jobs other workers have
+    prefetched but not started yet.
+    """
+
+    def __init__(self, path: str = DEFAULT_QUEUE_PATH):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=60, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS settings (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS targets (
+                id INTEGER PRIMARY KEY,
+                target TEXT NOT NULL,
+                meta TEXT,
+                emitted INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY,
+                target_id INTEGER NOT NULL,
+                module TEXT NOT NULL,
+                priority INTEGER NOT NULL,
+                state TEXT NOT NULL DEFAULT 'pending',
+                owner TEXT,
+                lease_until REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                result TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_state ON jobs (state, priority, id);
+            CREATE INDEX IF NOT EXISTS idx_jobs_target ON jobs (target_id);
+        """)
+
+    def _transaction(self, func):
+        # BEGIN IMMEDIATE takes the write lock up front so concurrent claims never interleave
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = func(self._conn)
+                self._conn.execute("COMMIT")
+                return result
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    # --- Coordinator side ------------------------------------------------------
+
+    def put(self, targets, modules: list, chunk: int = 1000) -> int:
+        """Enqueues one job per (target, module); returns the number of targets added."""
+        added = 0
+        batch = []
+
+        def flush(conn):
+            for target in batch:
+                target_id = conn.execute("INSERT INTO targets (target) VALUES (?)", (target,)).lastrowid
+                conn.executemany(
+                    "INSERT INTO jobs (target_id, module, priority) VALUES (?, ?, ?)",
+                    [(target_id, module, MODULE_PRIORITY.get(module, DEFAULT_PRIORITY)) for module in modules],
+                )
+
+        for target in targets:
+            batch.append(target)
+            if len(batch) >= chunk:
+                self._transaction(flush)
+                added += len(batch)
+                batch = []
+        if batch:
+            self._transaction(flush)
+            added += len(batch)
+        return added
+
+    def set_setting(self, key: str, value) -> None:
+        self._transaction(lambda conn: conn.execute(
+            "INSERT OR REPLACE INTO settings VALUES (?, ?)", (key, json.dumps(value))))
+
+    def get_setting(self, key: str, default=None):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def pop_finished(self, limit: int = 500) -> list:
+        """
+        Returns targets whose jobs are all done or failed and marks them
+        emitted, as (target, meta, {module: result}) tuples in target order.
+        """
+        def pop(conn):
+            rows = conn.execute("""
+                SELECT t.id, t.target, t.meta FROM targets t
+                WHERE t.emitted = 0 AND NOT EXISTS (
+                    SELECT 1 FROM jobs j WHERE j.target_id = t.id AND j.state NOT IN ('done', 'failed'))
+                ORDER BY t.id LIMIT ?""", (limit,)).fetchall()
+            finished = []
+            for target_id, target, meta in rows:
+                results = {
+                    module: json.loads(result) if result else None
+                    for module, result in conn.execute(
+                        "SELECT module, result FROM jobs WHERE target_id = ? ORDER BY id", (target_id,))
+                }
+                finished.append((target, json.loads(meta) if meta else {}, results))
+            conn.executemany("UPDATE targets SET emitted = 1 WHERE id = ?", [(row[0],) for row in rows])
+            return finished
+
+        return self._transaction(pop)
+
+    def counts(self) -> dict:
+        with self._lock:
+            rows = self._conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        return dict(rows)
+
+    def requeue_running(self) -> int:
+        """Returns every reserved/running job to pending (e.g. when resuming after a crash)."""
+        return self._transaction(lambda conn: conn.execute(
+            "UPDATE jobs SET state = 'pending', owner = NULL WHERE state IN ('reserved', 'running')").rowcount)
+
+    # --- Worker side -------------------------------------------------------------
+
+    def _expire(self, conn, now: float) -> None:
+        conn.execute("""
+            UPDATE jobs SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                            owner = NULL,
+                            result = CASE WHEN attempts >= ? THEN ? ELSE result END
+            WHERE state IN ('reserved', 'running') AND lease_until < ?""",
+            (MAX_ATTEMPTS, MAX_ATTEMPTS, json.dumps({"error": "Worker lease expired too many times"}), now))
+
+    def _jobs(self, conn, ids: list) -> list:
+        if not ids:
+            return []
+        marks = ",".join("?" * len(ids))
+        rows = conn.execute(f"""
+            SELECT j.id, t.target, j.module FROM jobs j JOIN targets t ON t.id = j.target_id
+            WHERE j.id IN ({marks}) ORDER BY j.priority, j.id""", ids).fetchall()
+        return [{"id": job_id, "target": target, "module": module} for job_id, target, module in rows]
+
+    def claim(self, worker: str, count: int = 4, lease: float = DEFAULT_LEASE) -> list:
+        """Reserves up to count pending jobs for worker (slowest modules first)."""
+        def claim(conn):
+            now = time.time()
+            self._expire(conn, now)
+            ids = [row[0] for row in conn.execute(
+                "SELECT id FROM jobs WHERE state = 'pending' ORDER BY priority, id LIMIT ?", (count,))]
+            conn.executemany("UPDATE jobs SET state = 'reserved', owner = ?, lease_until = ? WHERE id = ?",
+                             [(worker, now + lease, job_id) for job_id in ids])
+            return self._jobs(conn, ids)
+
+        return self._transaction(claim)
+
+    def steal(self, worker: str, count: int = 4, lease: float = DEFAULT_LEASE) -> list:
+        """Takes up to count jobs other workers reserved but have not started, newest first."""
+        def steal(conn):
+            now = time.time()
+            ids = [row[0] for row in conn.execute(
+                "SELECT id FROM jobs WHERE state = 'reserved' AND owner != ? ORDER BY id DESC LIMIT ?",
+                (worker, count))]
+            conn.executemany("UPDATE jobs SET owner = ?, lease_until = ? WHERE id = ?",
+                             [(worker, now + lease, job_id) for job_id in ids])
+            return self._jobs(conn, ids)
+
+        return self._transaction(steal)
+
+    def start(self, job_id: int, worker: str, lease: float = DEFAULT_LEASE) -> bool:
+        """Moves a reserved job to running; False when another worker stole it meanwhile."""
+        return self._transaction(lambda conn: conn.execute(
+            "UPDATE jobs SET state = 'running', lease_until = ?, attempts = attempts + 1 "
+            "WHERE id = ? AND owner = ? AND state = 'reserved'",
+            (time.time() + lease, job_id, worker)).rowcount == 1)
+
+    def heartbeat(self, worker: str, lease: float = DEFAULT_LEASE) -> None:
+        self._transaction(lambda conn: conn.execute(
+            "UPDATE jobs SET lease_until = ? WHERE owner = ? AND state IN ('reserved', 'running')",
+            (time.time() + lease, worker)))
+
+    def complete(self, job_id: int, worker: str, result, meta: dict | None = None, failed: bool = False) -> None:
+        def complete(conn):
+            conn.execute(
+                "UPDATE jobs SET state = ?, result = ?, owner = NULL WHERE id = ? AND owner = ?",
+                ("failed" if failed else "done", json.dumps(result, ensure_ascii=False, default=str), job_id, worker))
+            if meta is not None:
+                conn.execute(
+                    "UPDATE targets SET meta = ? WHERE id = (SELECT target_id FROM jobs WHERE id = ?) AND meta IS NULL",
+                    (json.dumps(meta, default=str), job_id))
+
+        self._transaction(complete)
+
+    def drained(self) -> bool:
+        """True once the coordinator sealed the queue and no job is left to run."""
+        if not self.get_setting("sealed", False):
+            return False
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM jobs WHERE state IN ('pending', 'reserved', 'running') LIMIT 1").fetchone()
+        return row is None
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# --- TCP broker ------------------------------------------------------------------
+# One JSON object per line in each direction: {"op", "args", "token"} -> {"ok"} or {"error"}.
+
+WORKER_OPS = {"get_setting", "claim", "steal", "start", "heartbeat", "complete", "drained"}
+
+
+class _BrokerHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                if self.server.token and request.get("token") != self.server.token:
+                    reply = {"error": "invalid broker token"}
+                elif request.get("op") not in WORKER_OPS:
+                    reply = {"error": f"unsupported operation {request.get('op')!r}"}
+                else:
+                    reply = {"ok": getattr(self.server.queue, request["op"])(**request.get("args", {}))}
+            except Exception as e:
+                reply = {"error": str(e)}
+            self.wfile.write((json.dumps(reply, default=str) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+
+def is_loopback(host: str) -> bool:
+    """True when host only accepts connections from this machine."""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class BrokerServer(socketserver.ThreadingTCPServer):
+    """
+    Exposes a JobQueue's worker operations to workers on other machines.
+    Anyone who can connect may claim and complete jobs, so binding anything
+    but a loopback address requires a token.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, queue: JobQueue, host: str = "127.0.0.1", port: int = 7878, token: str | None = None):
+        if not token and not is_loopback(host):
+            raise ValueError(f"a broker token is required to listen on {host or 'all interfaces'}")
+        super().__init__((host, port), _BrokerHandler)
+        self.queue = queue
+        self.token = token
+
+    def start(self) -> "BrokerServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        logger.info(f"[✓] Job broker listening on {self.server_address[0]}:{self.server_address[1]}")
+        return self
+
+
+class RemoteJobQueue:
+    """Worker-side client for BrokerServer with the same worker methods as JobQueue."""
+
+    def __init__(self, host: str, port: int, token: str | None = None, timeout: float = 60.0):
+        self.address = (host, port)
+        self.token = token
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._sock = None
+        self._file = None
+
+    def _call(self, op: str, **args):
+        payload = (json.dumps({"op": op, "args": args, "token": self.token}, default=str) + "\n").encode("utf-8")
+        with self._lock:
+            for attempt in (1, 2):
+                try:
+                    if self._sock is None:
+                        self._sock = socket.create_connection(self.address, timeout=self.timeout)
+                        self._file = self._sock.makefile("rb")
+                    self._sock.sendall(payload)
+                    line = self._file.readline()
+                    if not line:
+                        raise ConnectionError("broker closed the connection")
+                    break
+                except OSError:
+                    self._close()
+                    if attempt == 2:
+                        raise
+        reply = json.loads(line)
+        if "error" in reply:
+            raise RuntimeError(f"Broker error: {reply['error']}")
+        return reply["ok"]
+
+    def get_setting(self, key: str, default=None):
+        return self._call("get_setting", key=key, default=default)
+
+    def claim(self, worker: str, count: int = 4, lease: float = DEFAULT_LEASE) -> list:
+        return self._call("claim", worker=worker, count=count, lease=lease)
+
+    def steal(self, worker: str, count: int = 4, lease: float = DEFAULT_LEASE) -> list:
+        return self._call("steal", worker=worker, count=count, lease=lease)
+
+    def start(self, job_id: int, worker: str, lease: float = DEFAULT_LEASE) -> bool:
+        return self._call("start", job_id=job_id, worker=worker, lease=lease)
+
+    def heartbeat(self, worker: str, lease: float = DEFAULT_LEASE) -> None:
+        return self._call("heartbeat", worker=worker, lease=lease)
+
+    def complete(self, job_id: int, worker: str, result, meta: dict | None = None, failed: bool = False) -> None:
+        return self._call("complete", job_id=job_id, worker=worker, result=result, meta=meta, failed=failed)
+
+    def drained(self) -> bool:
+        return self._call("drained")
+
+    def _close(self) -> None:
+        if self._sock is not None:
+            try:
+                self._file.close()
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+        self._file = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+
+def open_queue(location: str, token: str | None = None):
+    """
+    Opens a queue from a location string: "tcp://host:port" connects to a
+    broker, anything else is a SQLite file path.
+    """
+    if location.startswith("tcp://"):
+        host, _, port = location[len("tcp://"):].rpartition(":")
+        return RemoteJobQueue(host or "127.0.0.1", int(port), token)
+    return JobQueue(location)
@@ -0,0 +1,143 @@
+# utils/journal.py
+
+import os
+import json
+import threading
+from utils.logger import logger
+from utils.cache import normalize_key, is_cacheable
+
+DEFAULT_JOURNAL_PATH = "output/journal.ndjson"
+
+
+class Journal:
+    """
+    Write-ahead journal of finished work, one JSON line per event:
+        {"t": target, "m": module, "r": result}   a module finished for a target
+        {"t": target, "done": record}             every module of a target finished
+    Lines are flushed as they are written, so a crash, Ctrl-C or OOM kill
+    loses at most the line being written. With resume=True the existing
+    journal is replayed: modules that already succeeded are not run again
+    and finished targets are skipped entirely. Safe to share between threads.
+    """
+
+    def __init__(self, path: str = DEFAULT_JOURNAL_PATH, resume: bool = False, enabled: bool = True):
+        self.path = path
+        self.enabled = enabled
+        self.resumed = False
+        self._pending = {}
+        self._finished = set()
+        self._lock = threading.Lock()
+        self._file = None
+
+        if not enabled:
+            return
+        try:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            if resume and os.path.exists(path):
+                self._replay()
+                self.resumed = True
+            self._file = open(path, "a" if self.resumed else "w", encoding="utf-8")
+        except OSError as e:
+            logger.error(f"[!] Journal disabled, could not open {path}: {e}")
+            self.enabled = False
+            self._file = None
+
+    def _replay(self) -> None:
+        # A crash can leave a half-written last line; cut it off so new lines start clean
+        with open(self.path, "rb+") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+
+        for entry in self._entries():
+            target = entry["t"]
+            if "done" in entry:
+                self._finished.add(target)
+                self._pending.pop(target, None)
+            elif target not in self._finished:
+                self._pending.setdefault(target, {})[entry["m"]] = entry["r"]
+        logger.info(f"[✓] Journal replayed: {len(self._finished)} finished targets, "
+                    f"{len(self._pending)} partially scanned")
+
+    def _entries(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+    def _append(self, entry: dict) -> None:
+        line = json.dumps(entry, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            if self._file is not None:
+                self._file.write(line)
+                self._file.flush()
+
+    def completed(self, target: str) -> dict:
+        """
+        Module results journaled for an unfinished target by the interrupted
+        run; failed results are left out so the resumed run retries them.
+        """
+        return {module: result for module, result in self._pending.get(normalize_key(target), {}).items()
+                if is_cacheable(result)}
+
+    def is_finished(self, target: str) -> bool:
+        """True when the interrupted run already finished every module of target."""
+        return normalize_key(target) in self._finished
+
+    def record_module(self, target: str, module: str, result) -> None:
+        # Failed results are journaled too: iter_records() must rebuild what the run emitted
+        if self.enabled:
+            self._append({"t": normalize_key(target), "m": module, "r": result})
+
+    def finish(self, target: str, record: dict) -> None:
+        """Marks a target finished; record holds its metadata (results come from the module lines)."""
+        if self.enabled:
+            self._append({"t": normalize_key(target), "done": {k: v for k, v in record.items() if k != "results"}})
+
+    def iter_records(self):
+        """
+        Rebuilds the records of every finished target in completion order.
+        Only targets still in flight are held in memory while streaming.
+        """
+        if not self.enabled or not os.path.exists(self.path):
+            return
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+        partial = {}
+        for entry in self._entries():
+            target = entry["t"]
+            if "done" in entry:
+                record = dict(entry["done"])
+                if "error" not in record:
+                    record["results"] = partial.pop(target, {})
+                else:
+                    partial.pop(target, None)
+                yield record
+            else:
+                partial.setdefault(target, {})[entry["m"]] = entry["r"]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        self.enabled = False
+
+
+_journal = Journal(enabled=False)
+
+
+def configure_journal(path: str = DEFAULT_JOURNAL_PATH, resume: bool = False, enabled: bool = True) -> Journal:
+    """Replaces the process-wide journal used by the pipeline."""
+    global _journal
+    _journal.close()
+    _journal = Journal(path, resume=resume, enabled=enabled)
+    return _journal
+
+
+def get_journal() -> Journal:
+    return _journal
@@ -0,0 +1,167 @@
+# utils/metrics.py
+
+import os
+import json
+import time
+import cProfile
+import threading
+import contextvars
+from utils.logger import logger
+
+# Counters modules can bump while they run; they are attributed to the
+# (target, module) call whose context the code runs in. Work handed to
+# other threads counts too, as long as they run a copy of that context
+# (contextvars.copy_context().run), as run_modules, probe_many and the
+# hedger do; the resolver loop inherits it through its scheduled callbacks.
+COUNTERS = ("retries", "bytes", "cache_hits", "cache_misses", "requests", "throttled")
+
+_counters = contextvars.ContextVar("recon_metric_counters", default=None)
+_counters_lock = threading.Lock()
+
+
+def count(name: str, value: int = 1) -> None:
+    """Adds to a counter of the instrumented call this code runs for (no-op otherwise)."""
+    counters = _counters.get()
+    if counters is not None:
+        with _counters_lock:
+            counters[name] = counters.get(name, 0) + value
+
+
+def _percentile(sorted_values: list, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _is_error(result) -> bool:
+    return isinstance(result, dict) and bool(result.get("error"))
+
+
+class MetricsRecorder:
+    """
+    Records wall time, CPU time, retries, bytes transferred, cache hits and
+    errors for every (target, module) call, and exports them as JSON or in
+    the Prometheus text exposition format. With profile=True every call also
+    runs under its own cProfile.Profile (cProfile only sees the thread it was
+    started on, and modules run on worker threads).
+    """
+
+    def __init__(self, enabled: bool = True, profile: bool = False):
+        self.enabled = enabled or profile
+        self.profile = profile
+        self.profiles = []
+        self.records = []
+        self._lock = threading.Lock()
+
+    def instrument(self, target: str, module: str, func):
+        """Wraps func so each call is timed and recorded."""
+        if not self.enabled:
+            return func
+
+        def wrapper():
+            counters = {}
+            token = _counters.set(counters)
+            wall_start = time.perf_counter()
+            cpu_start = time.thread_time()
+            result = None
+            error = None
+            profiler = cProfile.Profile() if self.profile else None
+            try:
+                result = profiler.runcall(func) if profiler else func()
+                return result
+            except Exception as e:
+                error = str(e)
+                raise
+            finally:
+                record = {
+                    "target": target,
+                    "module": module,
+                    "wall_s": round(time.perf_counter() - wall_start, 6),
+                    "cpu_s": round(time.thread_time() - cpu_start, 6),
+                    "error": error or (result.get("error") if _is_error(result) else None),
+                }
+                _counters.reset(token)
+                with _counters_lock:
+                    for name in COUNTERS:
+                        record[name] = counters.get(name, 0)
+                logger.debug(f"{module} for {target} took {record['wall_s']:.3f}s")
+                with self._lock:
+                    self.records.append(record)
+                    if profiler:
+                        self.profiles.append(profiler)
+
+        return wrapper
+
+    def summary(self) -> dict:
+        """Aggregates records per module."""
+        with self._lock:
+            records = list(self.records)
+        modules = {}
+        for record in records:
+            modules.setdefault(record["module"], []).append(record)
+
+        summary = {}
+        for module, rows in modules.items():
+            walls = sorted(row["wall_s"] for row in rows)
+            summary[module] = {
+                "calls": len(rows),
+                "errors": sum(1 for row in rows if row["error"]),
+                "wall_s_total": round(sum(walls), 6),
+                "wall_s_p50": _percentile(walls, 0.50),
+                "wall_s_p99": _percentile(walls, 0.99),
+                "wall_s_max": walls[-1],
+                "cpu_s_total": round(sum(row["cpu_s"] for row in rows), 6),
+            }
+            for name in COUNTERS:
+                summary[module][name] = sum(row[name] for row in rows)
+        return summary
+
+    def export_json(self, path: str) -> None:
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            records = list(self.records)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"summary": self.summary(), "calls": records}, f, indent=4, ensure_ascii=False)
+        logger.info(f"[✓] Metrics saved to {path}")
+
+    def export_prometheus(self, path: str) -> None:
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        summary = self.summary()
+        metrics = [
+            ("recon_module_calls_total", "counter", "Module invocations", "calls"),
+            ("recon_module_errors_total", "counter", "Module invocations that failed", "errors"),
+            ("recon_module_wall_seconds_total", "counter", "Wall-clock seconds spent in the module", "wall_s_total"),
+            ("recon_module_cpu_seconds_total", "counter", "CPU seconds spent in the module thread", "cpu_s_total"),
+            ("recon_module_wall_seconds_p99", "gauge", "99th percentile wall-clock seconds per call", "wall_s_p99"),
+            ("recon_module_retries_total", "counter", "HTTP retries performed", "retries"),
+            ("recon_module_bytes_total", "counter", "Response bytes received", "bytes"),
+            ("recon_module_cache_hits_total", "counter", "Result cache hits", "cache_hits"),
+            ("recon_module_cache_misses_total", "counter", "Result cache misses", "cache_misses"),
+            ("recon_module_throttled_total", "counter", "Calls a provider rejected for rate limiting", "throttled"),
+        ]
+        lines = []
+        for name, kind, help_text, field in metrics:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for module, values in summary.items():
+                lines.append(f'{name}{{module="{module}"}} {values[field]}')
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        logger.info(f"[✓] Prometheus metrics saved to {path}")
+
+
+_metrics = MetricsRecorder(enabled=False)
+
+
+def configure_metrics(enabled: bool = True, profile: bool = False) -> MetricsRecorder:
+    """Replaces the process-wide recorder used by the pipeline."""
+    global _metrics
+    _metrics = MetricsRecorder(enabled=enabled, profile=profile)
+    return _metrics
+
+
+def get_metrics() -> MetricsRecorder:
+    return _metrics
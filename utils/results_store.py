@@ -0,0 +1,331 @@
+# utils/results_store.py
+
+import os
+import re
+import time
+import queue
+import sqlite3
+import threading
+from utils.logger import logger
+
+DEFAULT_RESULTS_PATH = "output/results.sqlite"
+# Records per write transaction, and the longest a record waits for one
+BATCH_SIZE = 500
+FLUSH_INTERVAL = 2.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS targets (
+    id INTEGER PRIMARY KEY,
+    target TEXT NOT NULL UNIQUE,
+    input_type TEXT,
+    ip TEXT,
+    scanned_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_targets_ip ON targets (ip);
+
+CREATE TABLE IF NOT EXISTS ports (
+    target_id INTEGER NOT NULL REFERENCES targets (id),
+    protocol TEXT NOT NULL,
+    port INTEGER NOT NULL,
+    state TEXT,
+    service TEXT,
+    product TEXT,
+    version TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_ports_port ON ports (port, state, target_id);
+CREATE INDEX IF NOT EXISTS idx_ports_service ON ports (service COLLATE NOCASE, target_id);
+CREATE INDEX IF NOT EXISTS idx_ports_target ON ports (target_id);
+
+CREATE TABLE IF NOT EXISTS dns (
+    target_id INTEGER NOT NULL REFERENCES targets (id),
+    type TEXT NOT NULL,
+    value TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_dns_value ON dns (value COLLATE NOCASE, type, target_id);
+CREATE INDEX IF NOT EXISTS idx_dns_target ON dns (target_id);
+
+CREATE TABLE IF NOT EXISTS tech (
+    target_id INTEGER NOT NULL REFERENCES targets (id),
+    category TEXT,
+    name TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tech_name ON tech (name COLLATE NOCASE, target_id);
+CREATE INDEX IF NOT EXISTS idx_tech_target ON tech (target_id);
+
+CREATE TABLE IF NOT EXISTS network (
+    target_id INTEGER PRIMARY KEY REFERENCES targets (id),
+    ip TEXT,
+    asn TEXT,
+    asn_description TEXT,
+    network_name TEXT,
+    country TEXT,
+    region TEXT,
+    city TEXT,
+    org TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_network_asn ON network (asn);
+CREATE INDEX IF NOT EXISTS idx_network_country ON network (country COLLATE NOCASE);
+
+CREATE TABLE IF NOT EXISTS whois (
+    target_id INTEGER PRIMARY KEY REFERENCES targets (id),
+    registrar TEXT,
+    creation_date TEXT,
+    expiration_date TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_whois_expiration ON whois (expiration_date);
+CREATE INDEX IF NOT EXISTS idx_whois_registrar ON whois (registrar COLLATE NOCASE);
+"""
+
+# Child tables rebuilt when a record carries the module's result
+MODULE_TABLES = {
+    "ports": ("ports",),
+    "dns": ("dns",),
+    "tech": ("tech",),
+    "geoip": ("network",),
+    "whois": ("network", "whois"),
+}
+
+_ASN = re.compile(r"^AS(\d+)", re.IGNORECASE)
+
+
+def _ok(result) -> bool:
+    return isinstance(result, dict) and not result.get("error")
+
+
+def _port_rows(result: dict) -> list:
+    return [
+        (proto, int(port), info.get("state"), info.get("service"), info.get("product"), info.get("version"))
+        for proto, entries in (result.get("open_ports") or {}).items()
+        for port, info in ((p, i or {}) for p, i in (entries or {}).items())
+    ]
+
+
+def _dns_rows(result: dict) -> list:
+    return [(rtype, str(value)) for rtype, values in result.items() if isinstance(values, list) for value in values]
+
+
+def _tech_rows(result: dict) -> list:
+    return [(category, str(name)) for category, names in result.items() if isinstance(names, list) for name in names]
+
+
+def _network_row(ip: str | None, geoip, whois) -> tuple | None:
+    geo = geoip if _ok(geoip) else {}
+    rdap = (whois or {}).get("ip") if _ok(whois) else None
+    rdap = rdap if _ok(rdap) else {}
+    if not geo and not rdap:
+        return None
+    org = geo.get("org") or geo.get("as_org")
+    asn = rdap.get("asn") or geo.get("asn")
+    if not asn and org:
+        match = _ASN.match(str(org))
+        asn = match.group(1) if match else None
+    asn = _ASN.sub(r"\1", str(asn)) if asn else None
+    return (ip, asn, rdap.get("asn_description"), rdap.get("network_name"),
+            geo.get("country") or rdap.get("country"), geo.get("region"), geo.get("city"), org)
+
+
+def _whois_row(result) -> tuple | None:
+    domain = (result or {}).get("domain") if _ok(result) else None
+    if not _ok(domain) or not domain:
+        return None
+    return domain.get("registrar"), domain.get("creation_date"), domain.get("expiration_date")
+
+
+class ResultsStore:
+    """
+    Normalized, indexed SQLite copy of every scanned record: one row per
+    open port, DNS value and technology plus network (ASN/geo) and WHOIS
+    registration data per target, so questions across a large inventory are
+    index lookups instead of JSON greps.
+
+    add() only queues a record; a writer thread inserts queued records in
+    batched transactions (BATCH_SIZE records or every FLUSH_INTERVAL
+    seconds), so scans never wait for the disk.
+    """
+
+    def __init__(self, path: str = DEFAULT_RESULTS_PATH, enabled: bool = True):
+        self.path = path
+        self.enabled = enabled
+        self.written = 0
+        self._queue = queue.Queue()
+        self._conn = None
+        self._writer = None
+
+        if not enabled:
+            return
+        try:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+        except sqlite3.Error as e:
+            logger.error(f"[!] Results store disabled, could not open {path}: {e}")
+            self.enabled = False
+            self._conn = None
+            return
+        self._writer = threading.Thread(target=self._write_loop, name="results-store", daemon=True)
+        self._writer.start()
+
+    def add(self, record: dict) -> None:
+        """Queues a batch-style record (target, input_type, ip, results) for storage."""
+        if self.enabled and record.get("results") is not None:
+            self._queue.put((record, time.time()))
+
+    def _write_loop(self) -> None:
+        stop = False
+        while not stop:
+            batch = []
+            deadline = time.monotonic() + FLUSH_INTERVAL
+            while len(batch) < BATCH_SIZE:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            if batch:
+                try:
+                    self._write(batch)
+                except Exception as e:
+                    # Never let the writer die: every later add() would be lost
+                    logger.error(f"[!] Could not store {len(batch)} results: {e}")
+
+    def _write(self, batch: list) -> None:
+        conn = self._conn
+        conn.execute("BEGIN")
+        try:
+            for record, scanned_at in batch:
+                # A savepoint per record, so one bad record does not roll back the batch
+                conn.execute("SAVEPOINT record")
+                try:
+                    self._write_record(conn, record, scanned_at)
+                except Exception as e:
+                    conn.execute("ROLLBACK TO record")
+                    logger.error(f"[!] Could not store results for {record.get('target')!r}: {e}")
+                else:
+                    self.written += 1
+                finally:
+                    conn.execute("RELEASE record")
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def _write_record(conn, record: dict, scanned_at: float) -> None:
+        results = record["results"]
+        conn.execute(
+            "INSERT INTO targets (target, input_type, ip, scanned_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (target) DO UPDATE SET input_type = excluded.input_type, ip = excluded.ip, "
+            "scanned_at = excluded.scanned_at",
+            (record["target"], record.get("input_type"), record.get("ip"), scanned_at))
+        target_id = conn.execute("SELECT id FROM targets WHERE target = ?", (record["target"],)).fetchone()[0]
+
+        # A rescan replaces only what this record has results for
+        for table in {table for module in results if module in MODULE_TABLES for table in MODULE_TABLES[module]}:
+            conn.execute(f"DELETE FROM {table} WHERE target_id = ?", (target_id,))
+
+        if _ok(results.get("ports")):
+            conn.executemany("INSERT INTO ports VALUES (?, ?, ?, ?, ?, ?, ?)",
+                             [(target_id, *row) for row in _port_rows(results["ports"])])
+        if _ok(results.get("dns")):
+            conn.executemany("INSERT INTO dns VALUES (?, ?, ?)",
+                             [(target_id, *row) for row in _dns_rows(results["dns"])])
+        if _ok(results.get("tech")):
+            conn.executemany("INSERT INTO tech VALUES (?, ?, ?)",
+                             [(target_id, *row) for row in _tech_rows(results["tech"])])
+        network = _network_row(record.get("ip"), results.get("geoip"), results.get("whois"))
+        if network:
+            conn.execute("INSERT OR REPLACE INTO network VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", (target_id, *network))
+        whois = _whois_row(results.get("whois"))
+        if whois:
+            conn.execute("INSERT OR REPLACE INTO whois VALUES (?, ?, ?, ?)", (target_id, *whois))
+
+    def close(self) -> None:
+        """Writes everything still queued and closes the database."""
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        self.enabled = False
+
+
+# --- Queries -------------------------------------------------------------------
+# Each filter narrows the targets through one indexed subquery; filters combine with AND.
+
+FILTERS = {
+    "port": ("SELECT target_id FROM ports WHERE port = ? AND state = 'open'", int),
+    "service": ("SELECT target_id FROM ports WHERE service = ? COLLATE NOCASE AND state = 'open'", str),
+    "tech": ("SELECT target_id FROM tech WHERE name = ? COLLATE NOCASE", str),
+    "asn": ("SELECT target_id FROM network WHERE asn = ?", lambda v: _ASN.sub(r"\1", str(v))),
+    "country": ("SELECT target_id FROM network WHERE country = ? COLLATE NOCASE", str),
+    "dns": ("SELECT target_id FROM dns WHERE value = ? COLLATE NOCASE", str),
+    "registrar": ("SELECT target_id FROM whois WHERE registrar LIKE '%' || ? || '%'", str),
+    "expires_before": ("SELECT target_id FROM whois WHERE expiration_date < ?", str),
+}
+
+
+def query_targets(path: str = DEFAULT_RESULTS_PATH, limit: int | None = None, **filters) -> list:
+    """
+    Targets matching every given filter, e.g. query_targets(port=3389) or
+    query_targets(asn="AS13335", tech="WordPress").
+
+    Args:
+        path (str): Results store database.
+        limit (int): Maximum rows returned.
+        **filters: Any of FILTERS; None values are ignored.
+
+    Returns:
+        list: (target, ip, scanned_at) tuples ordered by target.
+    """
+    clauses, params = [], []
+    for name, value in filters.items():
+        if value is None:
+            continue
+        if name not in FILTERS:
+            raise ValueError(f"unknown filter {name!r}")
+        sql, convert = FILTERS[name]
+        clauses.append(f"id IN ({sql})")
+        params.append(convert(value))
+    sql = "SELECT target, ip, scanned_at FROM targets"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY target"
+    if limit:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return run_query(path, sql, params)
+
+
+def run_query(path: str, sql: str, params=()) -> list:
+    """Runs a read-only SQL query against the store (writes are rejected)."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No results store at {path}; run a scan first")
+    conn = sqlite3.connect(f"file:{os.path.abspath(path)}?mode=ro", uri=True)
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+_store = ResultsStore(enabled=False)
+
+
+def configure_results_store(path: str = DEFAULT_RESULTS_PATH, enabled: bool = True) -> ResultsStore:
+    """Replaces the process-wide results store every run writes into."""
+    global _store
+    _store.close()
+    _store = ResultsStore(path, enabled=enabled)
+    return _store
+
+
+def get_results_store() -> ResultsStore:
+    return _store
@@ -0,0 +1,316 @@
+# utils/scheduler.py
+
+import time
+import threading
+from email.utils import parsedate_to_datetime
+from concurrent.futures import Future
+from utils.logger import logger
+from utils.metrics import count as count_metric
+from utils.deadline import current_deadline, check_deadline, DeadlineExceeded
+
+
+class ProviderPolicy:
+    """Rate and concurrency limits for one external provider."""
+
+    def __init__(self, rate: float, burst: int = 1, max_concurrency: int = 4, min_concurrency: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+
+
+# Conservative starting points; AIMD finds the real ceiling below max_concurrency
+# and --rate PROVIDER=RPS[:BURST] overrides the token bucket.
+DEFAULT_POLICIES = {
+    "ipinfo": ProviderPolicy(rate=20, burst=20, max_concurrency=16),
+    "rdap": ProviderPolicy(rate=2, burst=5, max_concurrency=4),
+    "whois": ProviderPolicy(rate=1, burst=3, max_concurrency=2),
+    "builtwith": ProviderPolicy(rate=1, burst=1, max_concurrency=1),
+}
+DEFAULT_POLICY = ProviderPolicy(rate=10, burst=10, max_concurrency=8)
+DEFAULT_RETRIES = 3
+# Cooldown after a throttle without Retry-After: BASE_BACKOFF * 2**attempt seconds
+BASE_BACKOFF = 1.0
+MAX_BACKOFF = 60.0
+
+
+class Throttled(Exception):
+    """Raised by a scheduled call when the provider rejected it for rate reasons."""
+
+    def __init__(self, message: str = "throttled", retry_after: float | None = None, response=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.response = response
+
+
+def parse_retry_after(value) -> float | None:
+    """Retry-After as seconds from now; accepts delta-seconds or an HTTP date."""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(str(value)).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+class TokenBucket:
+    """
+    Classic token bucket. Callers reserve a token even when the bucket is
+    empty and sleep off their own deficit, so waiters are served in order.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Takes one token, blocking as long as needed; returns the seconds
+        waited. Raises DeadlineExceeded (without taking the token) when the
+        wait would outlast the current deadline.
+        """
+        if self.rate <= 0:
+            return 0.0
+        remaining = current_deadline().remaining()
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            if remaining is not None and wait > remaining:
+                self._tokens += 1
+                raise DeadlineExceeded("rate limit wait outlasts the deadline")
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+class AIMDLimiter:
+    """
+    Thread counterpart of port_scan.AdaptiveLimiter for API providers: the
+    concurrency window grows by one slot per window of successful calls and
+    halves when the provider throttles us.
+    """
+
+    def __init__(self, maximum: int, minimum: int = 1):
+        self.maximum = maximum
+        self.minimum = minimum
+        self.window = float(maximum)
+        self.in_flight = 0
+        self._condition = threading.Condition()
+
+    def acquire(self) -> None:
+        """Takes a slot in the window; raises DeadlineExceeded if none frees up in time."""
+        with self._condition:
+            if not self._condition.wait_for(lambda: self.in_flight < int(self.window),
+                                            timeout=current_deadline().remaining()):
+                raise DeadlineExceeded("no concurrency slot before the deadline")
+            self.in_flight += 1
+
+    def release(self, throttled: bool = False, success: bool = True) -> None:
+        with self._condition:
+            self.in_flight -= 1
+            if throttled:
+                self.window = max(self.minimum, self.window / 2)
+            elif success and self.window < self.maximum:
+                self.window = min(self.maximum, self.window + 1 / self.window)
+            self._condition.notify_all()
+
+
+class Provider:
+    """Token bucket, AIMD window and Retry-After cooldown of one provider."""
+
+    def __init__(self, name: str, policy: ProviderPolicy):
+        self.name = name
+        self.bucket = TokenBucket(policy.rate, policy.burst)
+        self.limiter = AIMDLimiter(policy.max_concurrency, policy.min_concurrency)
+        self.cooldown_until = 0.0
+        self.stats = {"calls": 0, "throttled": 0, "coalesced": 0, "waited_s": 0.0}
+        self._lock = threading.Lock()
+
+    def wait_turn(self) -> None:
+        delay = self.cooldown_until - time.monotonic()
+        remaining = current_deadline().remaining()
+        if delay > 0 and remaining is not None and delay >= remaining:
+            raise DeadlineExceeded(f"{self.name} cooldown outlasts the deadline")
+        if delay > 0:
+            time.sleep(delay)
+        waited = self.bucket.acquire()
+        self.limiter.acquire()
+        with self._lock:
+            self.stats["calls"] += 1
+            self.stats["waited_s"] += max(0.0, delay) + waited
+
+    def throttled(self, retry_after: float | None, attempt: int) -> None:
+        pause = retry_after if retry_after is not None else min(MAX_BACKOFF, BASE_BACKOFF * 2 ** attempt)
+        with self._lock:
+            self.stats["throttled"] += 1
+            # Every caller of this provider waits out the cooldown, not just the one that was refused
+            self.cooldown_until = max(self.cooldown_until, time.monotonic() + pause)
+        count_metric("throttled")
+        logger.warning(f"{self.name} throttled us; pausing {pause:.1f}s "
+                       f"(concurrency window {self.limiter.window:.1f})")
+
+
+class RequestScheduler:
+    """
+    Single choke point for calls to rate-limited providers (ipinfo, RDAP,
+    WHOIS, BuiltWith). Each provider gets a token bucket, an AIMD concurrency
+    window and a shared Retry-After cooldown; identical calls that are already
+    in flight are coalesced into one. Safe to share between threads.
+    """
+
+    def __init__(self, policies: dict | None = None, retries: int = DEFAULT_RETRIES, share: float = 1.0):
+        self.policies = dict(DEFAULT_POLICIES, **(policies or {}))
+        self.retries = retries
+        # Fraction of every provider's rate this process may use (local worker processes split it)
+        self.share = share
+        self._providers = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def provider(self, name: str) -> Provider:
+        """Provider state; "whois:com" style names share the "whois" policy but not its limits."""
+        with self._lock:
+            provider = self._providers.get(name)
+            if provider is None:
+                policy = self.policies.get(name) or self.policies.get(name.split(":", 1)[0], DEFAULT_POLICY)
+                if self.share != 1.0:
+                    policy = ProviderPolicy(policy.rate * self.share, max(1, int(policy.burst * self.share)),
+                                            max(1, int(policy.max_concurrency * self.share)), policy.min_concurrency)
+                provider = self._providers[name] = Provider(name, policy)
+            return provider
+
+    def call(self, provider: str, func, key=None, throttle_on: tuple = ()):
+        """
+        Runs func() under the provider's limits and returns its result.
+
+        Args:
+            provider (str): Provider name (selects the policy).
+            func (callable): The lookup. It signals rate limiting by raising
+                Throttled or one of the throttle_on exception types.
+            key: Optional identity of the request; concurrent calls with the
+                same (provider, key) share one execution and its outcome.
+            throttle_on (tuple): Library exceptions that mean "slow down".
+
+        Returns:
+            The result of func(). After the retries are used up the last
+            Throttled is re-raised (or its response returned, see http()).
+        """
+        if key is None:
+            return self._run(provider, func, throttle_on)
+
+        inflight_key = (provider, key)
+        with self._lock:
+            future = self._inflight.get(inflight_key)
+            leader = future is None
+            if leader:
+                future = self._inflight[inflight_key] = Future()
+        if not leader:
+            state = self.provider(provider)
+            with state._lock:
+                state.stats["coalesced"] += 1
+            return future.result()
+
+        try:
+            result = self._run(provider, func, throttle_on)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(inflight_key, None)
+
+    def _run(self, name: str, func, throttle_on: tuple):
+        provider = self.provider(name)
+        last = None
+        for attempt in range(self.retries + 1):
+            check_deadline(f"{name} call")
+            provider.wait_turn()
+            throttled = False
+            success = False
+            try:
+                result = func()
+                success = True
+                return result
+            except Throttled as e:
+                throttled, last = True, e
+                provider.throttled(e.retry_after, attempt)
+            except throttle_on as e:
+                throttled, last = True, Throttled(str(e))
+                provider.throttled(None, attempt)
+            finally:
+                provider.limiter.release(throttled=throttled, success=success)
+        logger.error(f"[!] {name} still throttling after {self.retries + 1} attempts")
+        if last.response is not None:
+            return last.response
+        raise last
+
+    def http(self, provider: str, method: str, url: str, key=None, **kwargs):
+        """
+        Sends a request through utils.http_client under the provider's limits.
+        429 (and 503 with Retry-After) responses are retried after the
+        provider cooldown; the last response is returned if they persist.
+        """
+        from utils.http_client import get_http_client
+
+        def send():
+            response = get_http_client().request(method, url, **kwargs)
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if response.status_code == 429 or (response.status_code == 503 and retry_after is not None):
+                raise Throttled(f"HTTP {response.status_code}", retry_after, response)
+            return response
+
+        return self.call(provider, send, key=key if key is not None else (method, url))
+
+    def stats(self) -> dict:
+        with self._lock:
+            providers = dict(self._providers)
+        return {
+            name: dict(p.stats, window=round(p.limiter.window, 1), waited_s=round(p.stats["waited_s"], 3))
+            for name, p in providers.items()
+        }
+
+
+def parse_rates(values) -> dict:
+    """
+    Parses repeated PROVIDER=RPS[:BURST] overrides (e.g. ["ipinfo=50:100"]).
+
+    Returns:
+        dict: Provider -> ProviderPolicy, keeping the default concurrency limits.
+    """
+    policies = {}
+    for value in values or []:
+        name, sep, spec = value.partition("=")
+        if not sep or not name.strip():
+            raise ValueError(f"expected PROVIDER=RPS[:BURST], got {value!r}")
+        rate, _, burst = spec.partition(":")
+        base = DEFAULT_POLICIES.get(name.strip(), DEFAULT_POLICY)
+        policies[name.strip()] = ProviderPolicy(float(rate), int(burst) if burst else max(1, int(float(rate))),
+                                                base.max_concurrency, base.min_concurrency)
+    return policies
+
+
+_scheduler = RequestScheduler()
+
+
+def configure_scheduler(policies: dict | None = None, retries: int = DEFAULT_RETRIES,
+                        share: float = 1.0) -> RequestScheduler:
+    """Replaces the process-wide scheduler used by the lookup modules."""
+    global _scheduler
+    _scheduler = RequestScheduler(policies, retries, share)
+    return _scheduler
+
+
+def get_scheduler() -> RequestScheduler:
+    return _scheduler
@@ -0,0 +1,85 @@
+# utils/shared_work.py
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from utils.cache import is_cacheable
+
+DEFAULT_SIZE = 4096
+
+
+class SharedWork:
+    """
+    Runs each (module, key) at most once per process and hands the result to
+    every caller, e.g. one port scan per IP address however many hostnames
+    point at it. Calls that arrive while the first is still running wait for
+    it. Failed results are handed to those waiters but not kept, so a later
+    caller tries again. Completed entries are kept in a bounded LRU.
+    Safe to share between threads.
+    """
+
+    def __init__(self, size: int = DEFAULT_SIZE, enabled: bool = True):
+        self.size = size
+        self.enabled = enabled
+        self.stats = {}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _count(self, module: str, field: str) -> None:
+        counters = self.stats.setdefault(module, {"runs": 0, "shared": 0})
+        counters[field] += 1
+
+    def run(self, module: str, key: str, func):
+        """
+        Returns func()'s result for (module, key), running it only if no
+        earlier or in-flight call for the same pair exists.
+        """
+        if not self.enabled or key is None:
+            return func()
+
+        entry_key = (module, key)
+        with self._lock:
+            future = self._entries.get(entry_key)
+            leader = future is None
+            if leader:
+                future = self._entries[entry_key] = Future()
+                self._count(module, "runs")
+            else:
+                self._entries.move_to_end(entry_key)
+                self._count(module, "shared")
+        if not leader:
+            return future.result()
+
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            with self._lock:
+                self._entries.pop(entry_key, None)
+            raise
+        future.set_result(result)
+        with self._lock:
+            if not is_cacheable(result):
+                self._entries.pop(entry_key, None)
+            while len(self._entries) > self.size:
+                oldest_key, oldest = next(iter(self._entries.items()))
+                if not oldest.done():
+                    # Never evict a running entry; its waiters still need it
+                    self._entries.move_to_end(oldest_key)
+                    break
+                self._entries.popitem(last=False)
+        return result
+
+
+_shared = SharedWork()
+
+
+def configure_shared_work(size: int = DEFAULT_SIZE, enabled: bool = True) -> SharedWork:
+    """Replaces the process-wide instance used by the IP-level scanners."""
+    global _shared
+    _shared = SharedWork(size, enabled)
+    return _shared
+
+
+def get_shared_work() -> SharedWork:
+    return _shared
@@ -0,0 +1,95 @@
+# utils/snapshots.py
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from utils.logger import logger
+from utils.cache import normalize_key, is_cacheable
+
+DEFAULT_SNAPSHOT_PATH = "output/snapshots.sqlite"
+
+
+class SnapshotStore:
+    """
+    Latest known result per (target, module), with the time it was taken.
+    Unlike the result cache nothing here expires or is evicted: the store is
+    the baseline rescans are compared against. Safe to share between threads.
+    """
+
+    def __init__(self, path: str = DEFAULT_SNAPSHOT_PATH, enabled: bool = True):
+        self.path = path
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._conn = None
+
+        if not enabled:
+            return
+        try:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    target TEXT NOT NULL,
+                    module TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    taken_at REAL NOT NULL,
+                    PRIMARY KEY (target, module)
+                )""")
+        except sqlite3.Error as e:
+            logger.error(f"[!] Snapshot store disabled, could not open {path}: {e}")
+            self.enabled = False
+            self._conn = None
+
+    def load(self, target: str) -> dict:
+        """
+        Returns:
+            dict: module -> {"value": result, "taken_at": epoch seconds} for the target.
+        """
+        if not self.enabled:
+            return {}
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT module, value, taken_at FROM snapshots WHERE target = ?", (normalize_key(target),)
+            ).fetchall()
+        return {module: {"value": json.loads(value), "taken_at": taken_at} for module, value, taken_at in rows}
+
+    def save(self, target: str, results: dict, taken_at: float | None = None) -> None:
+        """Replaces the snapshot of every module in results; failed results keep the old one."""
+        if not self.enabled:
+            return
+        taken_at = time.time() if taken_at is None else taken_at
+        key = normalize_key(target)
+        rows = [
+            (key, module, json.dumps(value, ensure_ascii=False, default=str), taken_at)
+            for module, value in results.items() if is_cacheable(value)
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?)", rows)
+
+    def close(self) -> None:
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+                self._conn = None
+            self.enabled = False
+
+
+_store = SnapshotStore(enabled=False)
+
+
+def configure_snapshots(path: str = DEFAULT_SNAPSHOT_PATH, enabled: bool = True) -> SnapshotStore:
+    """Replaces the process-wide snapshot store used by rescans."""
+    global _store
+    _store.close()
+    _store = SnapshotStore(path, enabled=enabled)
+    return _store
+
+
+def get_snapshots() -> SnapshotStore:
+    return _store